@@ -1,7 +1,8 @@
-from modules.scraper.linkedin_scraper import LinkedinScraper
-from modules.image_builder.image_builder import ImageBuilder
+import argparse
 import os, webbrowser
-import yaml
+
+# Os módulos de scraping (Selenium, trio, BeautifulSoup) e de imagem (Pillow) são importados
+# dentro das funções que os usam, para que execuções apenas de renderização iniciem rápido.
 
 
 def cli():
@@ -40,14 +41,29 @@ def cli():
 
 
 def build_controller(multiple: bool, configs: dict):
+    from modules.metrics.metrics import BatchMetrics
+
     print()
     urls = request_multiple_urls() if multiple else request_single_url()
 
-    scraped_data_paths = scrap_data(urls)
-
-    for data_path in scraped_data_paths:
-        build_images(data_path, configs=configs)
-        open_output(data_path)
+    metrics = BatchMetrics()
+    scraped_data_paths = scrap_data(urls, configs, metrics=metrics)
+
+    batch_archive = open_batch_archive(configs)
+    try:
+        for data_path in scraped_data_paths:
+            rendered = build_images(
+                data_path,
+                configs=configs,
+                archive_writer=batch_archive,
+                metrics=metrics,
+                raise_errors=not multiple,
+            )
+            if rendered:
+                open_output(data_path)
+    finally:
+        close_batch_archive(batch_archive)
+        report_batch(metrics, configs)
 
 
 def request_multiple_urls() -> list:
@@ -85,35 +101,124 @@ def request_single_url() -> list:
             return [url]
 
 
-def scrap_data(urls: list):
+def scraper_options(configs: dict) -> dict:
+    """
+    Converte as configurações (config.yaml) nos parâmetros do LinkedinScraper.
+    """
+    from modules.scraper.fetch_plan import FetchPlan
+
+    return {
+        "capture_network": configs.get("capture_network_images", False),
+        "max_comments": configs.get("scrape_max_comments"),
+        "catalog_path": configs.get("catalog_path"),
+        "allowed_hosts": configs.get("scrape_allowed_hosts") or ("linkedin.com",),
+        "extraction": configs.get("scrape_extraction", "script"),
+        "page_timeout": configs.get("scrape_page_timeout", 5),
+        "fetch_plan": (
+            FetchPlan.from_config(configs)
+            if configs.get("scrape_skip_unused_images", True)
+            else None
+        ),
+    }
+
+
+def scrap_data(urls: list, configs: dict, metrics=None, record_path=None):
+    from modules.scraper.linkedin_scraper import LinkedinScraper
+
     print("Coletando dados...")
-    
+
     output_paths = []
-    scraper = LinkedinScraper()
+    scraper = LinkedinScraper(
+        **scraper_options(configs), metrics=metrics, record_path=record_path
+    )
     for url in urls:
-        scraper.scrape_data(url=url, debug=True)
-        output_paths.append(scraper.output_path)
+        output_path = scraper.scrape_data(url=url, debug=True)
+        if output_path:
+            output_paths.append(output_path)
     scraper.close()
 
     return output_paths
 
 
-def build_images(output_path, configs):
-    print("Iniciando processamento de imagens")
-    image_builder = ImageBuilder(path=output_path)
+def build_images(output_path, configs, archive_writer=None, metrics=None, raise_errors=False) -> bool:
+    """
+    Renderiza as imagens de uma pasta coletada. Uma falha é registrada nas métricas (causa "render") e no
+    catálogo; nos lotes, a renderização segue para a próxima pasta.
 
-    print(" " * 6, "Autor:", image_builder.data["author"]["name"])
-    print(
-        " " * 6, "Texto:", image_builder.data["content"]["text"][:50].replace("\n", " ")
-    )
-    print(" " * 6, "Comentários:", len(image_builder.data["comments"]))
-    print(" " * 6, "Imagens:", len(image_builder.data["content"]["img_filenames"]))
+    Parâmetros:
+        output_path (str): A pasta do post (com data.json).
+        configs (dict): As configurações (config.yaml).
+        archive_writer (ArchiveWriter, opcional): O arquivo compartilhado pelo lote. O padrão é None.
+        metrics (BatchMetrics, opcional): As métricas do lote. O padrão é None.
+        raise_errors (bool, opcional): Se True, a falha é relançada (renderização de um único post). O padrão é False.
 
-    image_builder.build(
-        anonymous=configs["anom_users"],
-        background_carrossel=configs["background_carrossel"],
-        background=configs["background"],
-    )
+    Retorna:
+        bool: True se o post foi renderizado.
+    """
+    from modules.image_builder.image_builder import ImageBuilder
+
+    print("Iniciando processamento de imagens")
+    ImageBuilder.configure_process(configs)
+
+    catalog = None
+    if configs.get("catalog_path"):
+        from modules.catalog.catalog import Catalog
+
+        catalog = Catalog(configs["catalog_path"])
+
+    image_builder = None
+    try:
+        image_builder = ImageBuilder(path=output_path, metrics=metrics)
+
+        print(" " * 6, "Autor:", image_builder.data["author"]["name"])
+        print(
+            " " * 6, "Texto:", image_builder.data["content"]["text"][:50].replace("\n", " ")
+        )
+        print(" " * 6, "Comentários:", len(image_builder.data["comments"]))
+        print(" " * 6, "Imagens:", len(image_builder.data["content"]["img_filenames"]))
+
+        image_builder.build(
+            **ImageBuilder.build_options(configs), archive_writer=archive_writer
+        )
+    except Exception as e:
+        print(f"Falha ao renderizar {output_path}: {e!r}")
+        if metrics is not None:
+            metrics.failure("render")
+        elif image_builder is not None:
+            image_builder.metrics.failure("render")
+        if catalog:
+            catalog.set_render_status(output_path, "failed", error=str(e))
+        if raise_errors:
+            raise
+        return False
+
+    image_builder.metrics.count("posts_rendered")
+    if catalog:
+        catalog.set_render_status(
+            output_path, "rendered", output_files=image_builder.output_files
+        )
+    return True
+
+
+def report_batch(metrics, configs):
+    """
+    Imprime o resumo de desempenho do lote e grava o relatório (JSON e texto) em metrics_report_dir.
+    """
+    from modules.image_builder.image_builder import ImageBuilder
+    from modules.image_builder.image_processor import ImageProcessor
+
+    caches = {
+        "assets": ImageProcessor.assets.stats(),
+        "tiles": ImageBuilder.tiles.stats(),
+        "fallback": ImageProcessor.fallback.stats(),
+    }
+    report_dir = configs.get("metrics_report_dir")
+    if report_dir:
+        report, json_path, _ = metrics.write(report_dir, caches)
+        print(metrics.format_report(report))
+        print("Relatório gravado em", json_path)
+    else:
+        print(metrics.format_report(metrics.report(caches)))
 
 
 def open_output(output_path):
@@ -121,18 +226,160 @@ def open_output(output_path):
     webbrowser.open(os.path.realpath(output_path))
 
 
+def config_path(default=False):
+    return "assets/default_config.yaml" if default else "config.yaml"
+
+
 def read_config(default=False):
-    if default:
-        path = "assets/default_config.yaml"
-    else:
-        path = "config.yaml"
+    import yaml
 
-    with open(path, "r") as file:
+    with open(config_path(default), "r") as file:
         return yaml.load(file, Loader=yaml.FullLoader)
 
 
+def render_controller(paths: list, configs: dict, open_folder=True):
+    """
+    Renderiza pastas já coletadas (com data.json), sem carregar o navegador nem o scraper.
+    """
+    from modules.metrics.metrics import BatchMetrics
+
+    metrics = BatchMetrics()
+    batch_archive = open_batch_archive(configs)
+    try:
+        for data_path in paths:
+            rendered = build_images(
+                data_path,
+                configs=configs,
+                archive_writer=batch_archive,
+                metrics=metrics,
+                raise_errors=len(paths) == 1,
+            )
+            if rendered and open_folder and batch_archive is None:
+                open_output(data_path)
+    finally:
+        close_batch_archive(batch_archive)
+        report_batch(metrics, configs)
+
+
+def open_batch_archive(configs: dict):
+    """
+    Abre o arquivo compartilhado pelo lote quando output_archive está ativo com archive_scope "batch".
+    """
+    if not configs.get("output_archive") or configs.get("archive_scope", "post") != "batch":
+        return None
+
+    from datetime import datetime
+    from modules.image_builder.archive_writer import ArchiveWriter
+
+    archive_format = configs["output_archive"]
+    path = os.path.join(
+        configs.get("archive_batch_dir") or "scraped/batches",
+        datetime.now().strftime("%Y-%m-%d_%H%M%S") + "." + archive_format,
+    )
+    return ArchiveWriter(path, archive_format, stored=configs.get("archive_stored", True))
+
+
+def close_batch_archive(batch_archive):
+    if batch_archive is not None:
+        batch_archive.close()
+        print("Páginas do lote gravadas em", batch_archive.path)
+
+
+def queue_controller(args, configs: dict):
+    """
+    Executa as ações do subcomando queue: add (enfileira URLs), run (coleta os jobs vencidos), status e
+    retry-dead (devolve os jobs mortos para a fila). Os posts coletados podem ser renderizados pelo modo watch.
+    """
+    from modules.scraper.job_queue import (
+        AdaptiveConcurrency,
+        HostRateLimiter,
+        JobQueue,
+        ScrapeRunner,
+    )
+
+    queue = JobQueue(
+        configs.get("job_queue_path") or "scraped/jobs.sqlite3",
+        max_attempts=configs.get("scrape_max_attempts", 5),
+    )
+
+    if args.action == "add":
+        print(queue.enqueue(args.urls), "jobs adicionados")
+    elif args.action == "retry-dead":
+        print(queue.requeue_dead(), "jobs devolvidos para a fila")
+    elif args.action == "run":
+        from modules.scraper.linkedin_scraper import LinkedinScraper
+
+        runner = ScrapeRunner(
+            queue,
+            scraper_factory=lambda: LinkedinScraper(**scraper_options(configs)),
+            limiter=HostRateLimiter(
+                configs.get("scrape_rate_per_minute", 6), configs.get("scrape_burst", 2)
+            ),
+            concurrency=AdaptiveConcurrency(maximum=configs.get("scrape_max_workers", 3)),
+        )
+        print(len(runner.run(until_empty=not args.forever)), "posts coletados")
+
+    for status, count in queue.stats().items():
+        print(" " * 6, f"{status}:", count)
+    for job in queue.dead_letters() if args.action == "status" else []:
+        print(" " * 6, "morto:", job["url"], "-", job["last_error"])
+
+
+def catalog_controller(args, configs: dict):
+    """
+    Executa as ações do subcomando catalog: rebuild (percorre as pastas coletadas), list (imprime as pastas
+    selecionadas, uma por linha, para uso com "render") e report (resumo do catálogo).
+    """
+    from modules.catalog.catalog import Catalog
+
+    catalog = Catalog(configs.get("catalog_path") or "scraped/catalog.sqlite3")
+
+    if args.action == "rebuild":
+        print(catalog.rebuild(args.root), "posts catalogados em", catalog.path)
+    elif args.action == "list":
+        for post in catalog.select(
+            author=args.author,
+            min_comments=args.min_comments,
+            status=args.status,
+            date=args.date,
+        ):
+            print(post["path"])
+    else:
+        report = catalog.report()
+        print("Posts:", report["posts"])
+        print("Comentários:", report["comments"])
+        print("Mídias:", report["media"])
+        for status, count in sorted(report["render_status"].items()):
+            print(" " * 6, f"{status}:", count)
+
+
+def fixtures_controller(args, configs: dict):
+    """
+    Executa as ações do subcomando fixtures: record (coleta as URLs gravando uma fixture de cada post) e
+    serve (servidor local que substitui o LinkedIn, reproduzindo as fixtures com latência configurável).
+    """
+    if args.action == "record":
+        paths = scrap_data(args.targets, configs, record_path=args.output)
+        print(len(paths), "posts gravados em", args.output)
+        return
+
+    from modules.scraper.fixtures import ReplayServer
+
+    ReplayServer(
+        args.targets,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        resource_latency=args.resource_latency,
+        jitter=args.jitter,
+    ).serve_forever()
+
+
 def debug_builder():
-    image_builder = ImageBuilder(path="last_scrap")
+    from modules.image_builder.image_builder import ImageBuilder
+    from modules.scraper.output_layout import resolve_link
+
+    image_builder = ImageBuilder(path=resolve_link("last_scrap"))
     image_builder.build(
         anonymous=True,
         background_carrossel=True,
@@ -141,6 +388,190 @@ def debug_builder():
     open_output(image_builder.path)
 
 
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Python Post Maker")
+    subparsers = parser.add_subparsers(dest="command")
+
+    render_parser = subparsers.add_parser(
+        "render", help="Renderiza pastas já coletadas (contendo data.json)"
+    )
+    render_parser.add_argument("paths", nargs="+", help="Pastas com data.json")
+    render_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+    render_parser.add_argument(
+        "--no-open", action="store_true", help="Não abre a pasta de saída ao final"
+    )
+
+    serve_parser = subparsers.add_parser(
+        "serve", help="Inicia o serviço local de renderização (fontes e assets em memória)"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--unix", help="Escuta em um Unix socket em vez de TCP")
+    serve_parser.add_argument("--workers", type=int, default=2)
+    serve_parser.add_argument("--queue", type=int, default=16)
+    serve_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    pack_parser = subparsers.add_parser(
+        "pack",
+        help="Gera o pacote de assets pré-decodificados (backgrounds e elementos) para os workers",
+    )
+    pack_parser.add_argument("--output", default="assets/asset_pack.bin")
+
+    shard_parser = subparsers.add_parser(
+        "shard",
+        help="Renderização distribuída: vários processos ou máquinas dividem as pastas de um scraped/ compartilhado",
+    )
+    shard_parser.add_argument("--root", default="scraped", help="Pasta compartilhada com os posts")
+    shard_parser.add_argument(
+        "--processes", type=int, default=1, help="Quantidade de workers nesta máquina"
+    )
+    shard_parser.add_argument(
+        "--lease", type=float, default=60, help="Segundos sem heartbeat até a reserva expirar"
+    )
+    shard_parser.add_argument(
+        "--include-unmarked",
+        action="store_true",
+        help="Renderiza também pastas sem o marcador .scrape_complete (coletas antigas)",
+    )
+    shard_parser.add_argument(
+        "--forever", action="store_true", help="Continua aguardando novas pastas"
+    )
+    shard_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    queue_parser = subparsers.add_parser(
+        "queue", help="Fila persistente de coletas, com novas tentativas e limite de taxa por host"
+    )
+    queue_parser.add_argument("action", choices=("add", "run", "status", "retry-dead"))
+    queue_parser.add_argument("urls", nargs="*", help="URLs adicionadas com 'add'")
+    queue_parser.add_argument(
+        "--forever", action="store_true", help="Com 'run', continua aguardando novos jobs"
+    )
+    queue_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Renderiza automaticamente cada post coletado assim que a coleta termina"
+    )
+    watch_parser.add_argument("--root", default="scraped", help="Pasta monitorada")
+    watch_parser.add_argument("--workers", type=int, default=2)
+    watch_parser.add_argument("--interval", type=float, default=1.0, help="Segundos entre varreduras")
+    watch_parser.add_argument(
+        "--debounce", type=float, default=2.0, help="Segundos de estabilidade antes de renderizar"
+    )
+    watch_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    catalog_parser = subparsers.add_parser(
+        "catalog", help="Consulta ou reconstrói o catálogo SQLite dos posts coletados"
+    )
+    catalog_parser.add_argument("action", choices=("rebuild", "list", "report"))
+    catalog_parser.add_argument("--root", default="scraped", help="Pasta percorrida por rebuild")
+    catalog_parser.add_argument("--author")
+    catalog_parser.add_argument("--min-comments", type=int)
+    catalog_parser.add_argument("--status", choices=("pending", "rendered", "failed"))
+    catalog_parser.add_argument("--date", help="Data da coleta (YYYY-MM-DD)")
+    catalog_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    fixtures_parser = subparsers.add_parser(
+        "fixtures",
+        help="Grava fixtures de posts ou as reproduz em um servidor local (benchmarks sem rede)",
+    )
+    fixtures_parser.add_argument("action", choices=("record", "serve"))
+    fixtures_parser.add_argument(
+        "targets", nargs="+", help="URLs dos posts (record) ou arquivos .zip de fixture (serve)"
+    )
+    fixtures_parser.add_argument("--output", default="fixtures", help="Pasta das fixtures gravadas")
+    fixtures_parser.add_argument("--host", default="127.0.0.1")
+    fixtures_parser.add_argument("--port", type=int, default=8766)
+    fixtures_parser.add_argument(
+        "--latency", type=float, default=0, help="Atraso de cada página, em ms"
+    )
+    fixtures_parser.add_argument(
+        "--resource-latency", type=float, default=0, help="Atraso de cada imagem, em ms"
+    )
+    fixtures_parser.add_argument(
+        "--jitter", type=float, default=0, help="Variação aleatória dos atrasos, em ms"
+    )
+    fixtures_parser.add_argument(
+        "--default-config",
+        action="store_true",
+        help="Usa assets/default_config.yaml em vez de config.yaml",
+    )
+
+    args = parser.parse_args(argv)
+
+    if args.command == "render":
+        configs = read_config(default=args.default_config)
+        render_controller(args.paths, configs=configs, open_folder=not args.no_open)
+    elif args.command == "pack":
+        from modules.image_builder.asset_pack import AssetPack
+
+        index = AssetPack.build(args.output)
+        print(len(index["images"]), "imagens empacotadas em", args.output)
+        print("Carrosséis:", index["carousels"])
+    elif args.command == "shard":
+        from modules.service.sharding import run_local
+
+        run_local(
+            args.processes,
+            root=args.root,
+            config_path=config_path(default=args.default_config),
+            lease=args.lease,
+            include_unmarked=args.include_unmarked,
+            until_empty=not args.forever,
+        )
+    elif args.command == "queue":
+        queue_controller(args, read_config(default=args.default_config))
+    elif args.command == "watch":
+        from modules.service.watcher import FolderWatcher
+
+        FolderWatcher(
+            root=args.root,
+            config_path=config_path(default=args.default_config),
+            workers=args.workers,
+            interval=args.interval,
+            debounce=args.debounce,
+        ).run()
+    elif args.command == "catalog":
+        catalog_controller(args, read_config(default=args.default_config))
+    elif args.command == "fixtures":
+        fixtures_controller(args, read_config(default=args.default_config))
+    elif args.command == "serve":
+        import asyncio
+        from modules.service.render_server import RenderServer
+
+        server = RenderServer(
+            config_path=config_path(default=args.default_config),
+            workers=args.workers,
+            queue_size=args.queue,
+        )
+        asyncio.run(server.serve(host=args.host, port=args.port, unix_path=args.unix))
+    else:
+        cli()
+
+
 if __name__ == "__main__":
     # debug_builder() # exemplo de uso para testes
-    cli()
\ No newline at end of file
+    main()
\ No newline at end of file
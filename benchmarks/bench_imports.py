@@ -0,0 +1,87 @@
+"""
+Mede o tempo de importação dos pontos de entrada em processos novos.
+
+Cada alvo é importado em um interpretador limpo (python -c), repetido algumas vezes, e o
+resultado exibido é a mediana. Também verifica que o caminho de renderização não carrega
+o stack de scraping (selenium, trio, websocket, bs4).
+
+Uso:
+    python benchmarks/bench_imports.py [--runs 7]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = {
+    "python (vazio)": "pass",
+    "app": "import app",
+    "app render (builder)": "import app; from modules.image_builder.image_builder import ImageBuilder",
+    "scraper": "from modules.scraper.linkedin_scraper import LinkedinScraper",
+}
+
+SCRAPER_MODULES = ("selenium", "trio", "websocket", "bs4")
+
+
+def time_import(code, runs) -> float:
+    """
+    Retorna a mediana, em milissegundos, do tempo de execução de um interpretador que roda `code`.
+    """
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=ROOT, capture_output=True
+        )
+        samples.append((time.perf_counter() - start) * 1000)
+        if result.returncode != 0:
+            return None
+    return statistics.median(samples)
+
+
+def render_path_modules() -> list:
+    """
+    Retorna os módulos de scraping carregados após importar o caminho de renderização. Encerra o benchmark
+    com erro se a importação falhar (uma lista vazia não pode ser confundida com sucesso).
+    """
+    code = (
+        "import sys, app\n"
+        "from modules.image_builder.image_builder import ImageBuilder\n"
+        f"print(' '.join(m for m in {SCRAPER_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        print("Falha ao importar o caminho de renderização:", file=sys.stderr)
+        print(result.stderr, file=sys.stderr)
+        sys.exit(result.returncode)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    for name, code in TARGETS.items():
+        elapsed = time_import(code, args.runs)
+        if elapsed is None:
+            print(f"{name:<24} indisponível (dependência não instalada)")
+        else:
+            print(f"{name:<24} {elapsed:8.1f} ms")
+
+    leaked = render_path_modules()
+    if leaked:
+        print("Caminho de renderização importa módulos de scraping:", ", ".join(leaked))
+        sys.exit(1)
+    print("Caminho de renderização não importa módulos de scraping")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Mede o scraper contra o servidor de replay de fixtures, sem acessar a rede.
+
+As fixtures gravadas com "python app.py fixtures record <url>" são servidas localmente com a latência
+informada; cada fixture é coletada --runs vezes, em série (um navegador) ou, com --workers > 1, pela fila
+de coletas (ScrapeRunner) com vários navegadores. Ao final é exibido o relatório do lote: posts por
+minuto e p50/p95/p99 de cada etapa (navegação, esperas, leitura do HTML e download das imagens).
+
+Uso:
+    python benchmarks/bench_scraper.py fixtures/*.zip [--runs 3] [--workers 1] [--latency 150]
+    [--resource-latency 40] [--jitter 20] [--capture-network] [--extraction script|soup|check]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from modules.metrics.metrics import BatchMetrics  # noqa: E402
+from modules.scraper.fixtures import FixtureArchive, ReplayServer  # noqa: E402
+
+
+def make_scraper(output_folder, metrics, options):
+    from modules.scraper.linkedin_scraper import LinkedinScraper
+
+    scraper = LinkedinScraper(
+        **options,
+        metrics=metrics,
+        allowed_hosts=("127.0.0.1", "localhost"),
+    )
+    # uma pasta por navegador: coletas simultâneas da mesma fixture não disputam os arquivos
+    scraper.base_path = tempfile.mkdtemp(dir=output_folder)
+    return scraper
+
+
+def run_serial(urls, output_folder, metrics, options) -> int:
+    scraper = make_scraper(output_folder, metrics, options)
+    completed = 0
+    try:
+        for url in urls:
+            if scraper.scrape_data(url):
+                completed += 1
+    finally:
+        scraper.close()
+    return completed
+
+
+def run_parallel(urls, output_folder, metrics, options, workers) -> int:
+    from modules.scraper.job_queue import (
+        AdaptiveConcurrency,
+        HostRateLimiter,
+        JobQueue,
+        ScrapeRunner,
+    )
+
+    queue = JobQueue(os.path.join(output_folder, "jobs.sqlite3"), max_attempts=1)
+    # a fila ignora URLs já pendentes: cada rodada tem uma query própria (ver main)
+    queue.enqueue(urls)
+    runner = ScrapeRunner(
+        queue,
+        scraper_factory=lambda: make_scraper(output_folder, metrics, options),
+        limiter=HostRateLimiter(60_000, burst=workers),
+        concurrency=AdaptiveConcurrency(maximum=workers),
+    )
+    return len(runner.run(until_empty=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures", nargs="+", help="Arquivos .zip de fixture")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=150, help="Atraso de cada página, em ms")
+    parser.add_argument(
+        "--resource-latency", type=float, default=40, help="Atraso de cada imagem, em ms"
+    )
+    parser.add_argument("--jitter", type=float, default=20, help="Variação dos atrasos, em ms")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capture-network", action="store_true")
+    parser.add_argument("--extraction", choices=("script", "soup", "check"), default="script")
+    args = parser.parse_args()
+
+    try:
+        import selenium  # noqa: F401
+    except ImportError:
+        print("Selenium não instalado: benchmark do scraper indisponível")
+        sys.exit(1)
+
+    server = ReplayServer(
+        args.fixtures,
+        latency=args.latency,
+        resource_latency=args.resource_latency,
+        jitter=args.jitter,
+        seed=args.seed,
+    ).start()
+
+    urls = []
+    for path in args.fixtures:
+        url = server.url_for(FixtureArchive.load(path)["url"])
+        urls += [f"{url}?run={run}" for run in range(args.runs)]
+
+    options = {"capture_network": args.capture_network, "extraction": args.extraction}
+    metrics = BatchMetrics()
+    with tempfile.TemporaryDirectory() as output_folder:
+        if args.workers > 1:
+            completed = run_parallel(urls, output_folder, metrics, options, args.workers)
+        else:
+            completed = run_serial(urls, output_folder, metrics, options)
+    server.stop()
+
+    print(f"Fixtures: {len(args.fixtures)}, coletas: {len(urls)}, workers: {args.workers}")
+    print(f"Requisições ao servidor de replay: {server.requests}")
+    print(metrics.format_report(metrics.report()))
+
+
+if __name__ == "__main__":
+    main()
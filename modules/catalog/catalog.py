@@ -0,0 +1,297 @@
+import json
+import os
+import re
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+
+from modules.scraper.output_layout import POSTS_FOLDER, alias_slugs, resolve_link
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    path TEXT PRIMARY KEY,
+    url TEXT,
+    author TEXT,
+    author_slug TEXT,
+    post_slug TEXT,
+    date TEXT,
+    text_length INTEGER,
+    comments INTEGER,
+    media INTEGER,
+    author_image TEXT,
+    media_paths TEXT,
+    comment_images TEXT,
+    render_status TEXT NOT NULL DEFAULT 'pending',
+    render_error TEXT,
+    rendered_at TEXT,
+    output_files TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_author ON posts (author);
+CREATE INDEX IF NOT EXISTS posts_date ON posts (date);
+CREATE INDEX IF NOT EXISTS posts_comments ON posts (comments);
+CREATE INDEX IF NOT EXISTS posts_render_status ON posts (render_status);
+"""
+
+RENDER_STATUSES = ("pending", "rendered", "failed")
+
+
+class Catalog:
+    """
+    Catálogo SQLite dos posts coletados, para selecionar lotes e gerar relatórios sem percorrer e
+    ler cada "scraped/<data>/posts/<id>/data.json".
+
+    Cada post é identificado pela sua pasta e registra URL, autor, slugs, data, tamanho do texto,
+    quantidade de comentários e mídias, caminhos dos assets e o estado da renderização.
+
+    Parâmetros:
+        path (str, opcional): O arquivo do banco. O padrão é "scraped/catalog.sqlite3".
+    """
+
+    def __init__(self, path="scraped/catalog.sqlite3"):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Abre uma conexão com o banco (uma por operação, para uso a partir de várias threads e processos).
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @staticmethod
+    def normalize_path(path) -> str:
+        """
+        Normaliza o caminho da pasta do post, usado como chave. Um link para a pasta do post (o nome legível
+        "<autor>/<início do texto>_<id>" ou "last_scrap", inclusive na forma de arquivo ".link.txt") é resolvido
+        para a pasta real.
+        """
+        path = resolve_link(path)
+        return os.path.normpath(path).replace("\\", "/")
+
+    @staticmethod
+    def post_row(path, data, url=None) -> dict:
+        """
+        Monta o registro de um post a partir dos dados coletados. O autor e o post legíveis (author_slug,
+        post_slug) são os nomes do link "<autor>/<início do texto>_<id>" criado na coleta; pastas no formato
+        antigo "scraped/<data>/<autor>/<post>" usam os nomes das próprias pastas.
+
+        Parâmetros:
+            path (str): A pasta do post ("scraped/<data>/posts/<id>").
+            data (dict): O conteúdo do data.json.
+            url (str, opcional): A URL do post. O padrão é a chave "url" do data.json, se existir.
+
+        Retorna:
+            dict: As colunas do registro.
+        """
+        path = Catalog.normalize_path(path)
+        parts = path.split("/")
+        date, author_slug, post_slug = ([None] * 3 + parts)[-3:]
+        if not re.fullmatch(r"\d{4}-\d{2}-\d{2}", date or ""):
+            date = None
+        if author_slug == POSTS_FOLDER or "post_id" in data:
+            author_slug, post_slug = alias_slugs(data, data.get("post_id") or post_slug)
+
+        comment_images = [
+            f"{path}/{comment['img_filename']}"
+            for comment in data["comments"]
+            if comment.get("img_filename")
+        ]
+        return {
+            "path": path,
+            "url": url or data.get("url"),
+            "author": data["author"]["name"],
+            "author_slug": author_slug,
+            "post_slug": post_slug,
+            "date": date,
+            "text_length": len(data["content"]["text"]),
+            "comments": len(data["comments"]),
+            "media": len(data["content"]["img_filenames"]),
+            "author_image": f"{path}/{data['author']['img_filename']}",
+            "media_paths": json.dumps(
+                [f"{path}/{filename}" for filename in data["content"]["img_filenames"]]
+            ),
+            "comment_images": json.dumps(comment_images),
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def add_post(self, path, data, url=None) -> None:
+        """
+        Insere ou atualiza um post. O estado da renderização volta a "pending", pois os dados mudaram.
+
+        Parâmetros:
+            path (str): A pasta do post.
+            data (dict): O conteúdo do data.json.
+            url (str, opcional): A URL do post.
+        """
+        self.upsert(self.post_row(path, data, url), reset_status=True)
+
+    def upsert(self, row, reset_status=False) -> None:
+        """
+        Insere ou atualiza o registro de um post, sem apagar uma URL já conhecida.
+
+        Parâmetros:
+            row (dict): As colunas do registro (post_row).
+            reset_status (bool, opcional): Se True, o estado da renderização volta a "pending". O padrão é False.
+        """
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{column}" for column in row)
+        updates = [
+            f"{column} = excluded.{column}"
+            for column in row
+            if column not in ("path", "url")
+        ]
+        updates.append("url = COALESCE(excluded.url, posts.url)")
+        if reset_status:
+            updates.append("render_status = 'pending', render_error = NULL")
+
+        with closing(self.connect()) as connection, connection:
+            connection.execute(
+                f"INSERT INTO posts ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT(path) DO UPDATE SET {', '.join(updates)}",
+                row,
+            )
+
+    def set_render_status(self, path, status, output_files=None, error=None) -> None:
+        """
+        Registra o resultado da renderização de um post. Se a pasta ainda não estiver no catálogo,
+        ela é adicionada a partir do seu data.json.
+
+        Parâmetros:
+            path (str): A pasta do post.
+            status (str): "pending", "rendered" ou "failed".
+            output_files (list, opcional): Os arquivos gerados.
+            error (str, opcional): A mensagem de erro, se a renderização falhou.
+        """
+        if status not in RENDER_STATUSES:
+            raise ValueError(f"Estado de renderização inválido: {status}")
+
+        path = self.normalize_path(path)
+        values = {
+            "path": path,
+            "status": status,
+            "error": error,
+            "output_files": json.dumps(output_files) if output_files is not None else None,
+            "rendered_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        query = (
+            "UPDATE posts SET render_status = :status, render_error = :error, "
+            "output_files = COALESCE(:output_files, output_files), rendered_at = :rendered_at "
+            "WHERE path = :path"
+        )
+
+        with closing(self.connect()) as connection, connection:
+            updated = connection.execute(query, values).rowcount
+
+        if not updated and self.add_folder(path):
+            with closing(self.connect()) as connection, connection:
+                connection.execute(query, values)
+
+    def add_folder(self, path) -> bool:
+        """
+        Adiciona ao catálogo a pasta de um post a partir do seu data.json.
+
+        Retorna:
+            bool: True se o data.json foi lido.
+        """
+        try:
+            with open(os.path.join(path, "data.json"), "r", encoding="utf-8") as file:
+                data = json.load(file)
+            self.add_post(path, data)
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Não foi possível catalogar {path}: {e}")
+            return False
+
+    def rebuild(self, root="scraped") -> int:
+        """
+        Reconstrói o catálogo a partir das pastas existentes: adiciona os posts encontrados (mantendo URL e
+        estado de renderização já registrados) e remove os que não existem mais.
+
+        Parâmetros:
+            root (str, opcional): A pasta raiz dos posts coletados. O padrão é "scraped".
+
+        Retorna:
+            int: A quantidade de posts catalogados.
+        """
+        found = set()
+        for folder, _, filenames in os.walk(root):
+            if "data.json" not in filenames or "processed_images" in folder.split(os.sep):
+                continue
+            try:
+                with open(os.path.join(folder, "data.json"), "r", encoding="utf-8") as file:
+                    data = json.load(file)
+                row = self.post_row(folder, data)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Não foi possível catalogar {folder}: {e}")
+                continue
+            found.add(row["path"])
+            self.upsert(row)
+
+        root_prefix = self.normalize_path(root) + "/"
+        with closing(self.connect()) as connection, connection:
+            for (path,) in connection.execute(
+                "SELECT path FROM posts WHERE path LIKE ? ESCAPE '\\'",
+                (root_prefix.replace("_", "\\_").replace("%", "\\%") + "%",),
+            ).fetchall():
+                if path not in found:
+                    connection.execute("DELETE FROM posts WHERE path = ?", (path,))
+
+        return len(found)
+
+    def select(self, author=None, min_comments=None, status=None, date=None) -> list:
+        """
+        Seleciona posts pelos filtros informados (consultas indexadas).
+
+        Parâmetros:
+            author (str, opcional): O nome do autor.
+            min_comments (int, opcional): A quantidade mínima de comentários.
+            status (str, opcional): O estado da renderização.
+            date (str, opcional): A data da coleta (YYYY-MM-DD).
+
+        Retorna:
+            list: Os posts, como dicionários, do mais recente para o mais antigo.
+        """
+        conditions, params = [], []
+        for column, operator, value in (
+            ("author", "=", author),
+            ("comments", ">=", min_comments),
+            ("render_status", "=", status),
+            ("date", "=", date),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                params.append(value)
+
+        query = "SELECT * FROM posts"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date DESC, path"
+
+        with closing(self.connect()) as connection:
+            return [dict(row) for row in connection.execute(query, params)]
+
+    def report(self) -> dict:
+        """
+        Resume o catálogo: total de posts, comentários e mídias, e posts por estado de renderização.
+
+        Retorna:
+            dict: O resumo.
+        """
+        with closing(self.connect()) as connection:
+            total, comments, media = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(comments), 0), COALESCE(SUM(media), 0) FROM posts"
+            ).fetchone()
+            statuses = dict(
+                connection.execute(
+                    "SELECT render_status, COUNT(*) FROM posts GROUP BY render_status"
+                ).fetchall()
+            )
+        return {"posts": total, "comments": comments, "media": media, "render_status": statuses}
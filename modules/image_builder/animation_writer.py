@@ -0,0 +1,195 @@
+import os
+
+from PIL import GifImagePlugin, Image
+
+try:
+    from PIL import _webp
+
+    WEBP_ANIMATION = hasattr(_webp, "WebPAnimEncoder")
+except ImportError:
+    _webp = None
+    WEBP_ANIMATION = False
+
+ANIMATION_FORMATS = ("webp", "gif")
+
+
+def frame_durations(durations, plan) -> list:
+    """
+    Calcula a duração de cada quadro da animação a partir da configuração.
+
+    Parâmetros:
+        durations (int | list | dict): Uma duração única, uma lista por página (a última vale para as páginas
+        seguintes) ou um dicionário por tipo de página ("post", "content_media", "comments", com "default" para
+        os tipos não informados), em milissegundos.
+        plan (list): O plano de páginas.
+
+    Retorna:
+        list: A duração de cada página, em milissegundos.
+    """
+    if isinstance(durations, dict):
+        default = durations.get("default", 3000)
+        return [int(durations.get(page["type"], default)) for page in plan]
+    if isinstance(durations, (list, tuple)):
+        return [int(durations[min(index, len(durations) - 1)]) for index in range(len(plan))]
+    return [int(durations)] * len(plan)
+
+
+class AnimationWriter:
+    """
+    Escreve as páginas como quadros de uma imagem animada (WebP ou GIF), de forma incremental: cada página é
+    codificada assim que é adicionada e a imagem decodificada é descartada, então a memória não cresce com a
+    quantidade de páginas. Sem suporte a WebP animado no Pillow (ou com uma API interna incompatível), o GIF é
+    usado no lugar.
+
+    No GIF, cada quadro tem a sua própria paleta (tabela de cores local), calculada a partir da própria página,
+    e é gravado no arquivo assim que adicionado. No WebP, o WebPAnimEncoder guarda apenas os quadros já
+    comprimidos até o fechamento.
+
+    Parâmetros:
+        path (str): O caminho da animação, sem a extensão (".webp" ou ".gif" é acrescentado).
+        format (str, opcional): "webp" ou "gif". O padrão é "webp".
+        durations (int | list, opcional): A duração de cada quadro, em milissegundos: única ou uma lista por página
+        (ver frame_durations). O padrão é 3000.
+        loop (int, opcional): Quantidade de repetições (0 = infinitas). O padrão é 0.
+        quality (int, opcional): A qualidade dos quadros WebP (0-100). O padrão é 80.
+        lossless (bool, opcional): Se True, os quadros WebP são gravados sem perdas. O padrão é False.
+        dither (bool, opcional): Se True, os quadros do GIF são convertidos para a paleta com pontilhado
+        (Floyd-Steinberg). O padrão é True.
+
+    A API do WebPAnimEncoder é interna ao Pillow (assinatura posicional da série 10.x); se ela não aceitar os
+    argumentos no primeiro quadro, a animação é gerada em GIF.
+    """
+
+    def __init__(
+        self,
+        path,
+        format="webp",
+        durations=3000,
+        loop=0,
+        quality=80,
+        lossless=False,
+        dither=True,
+    ):
+        if format not in ANIMATION_FORMATS:
+            raise ValueError(f"Formato de animação inválido: {format}")
+        if format == "webp" and not WEBP_ANIMATION:
+            print("WebP animado indisponível no Pillow: gerando GIF")
+            format = "gif"
+
+        self.format = format
+        self.path = f"{path}.{format}"
+        self.durations = durations
+        self.loop = loop
+        self.quality = quality
+        self.lossless = lossless
+        self.dither = Image.Dither.FLOYDSTEINBERG if dither else Image.Dither.NONE
+        self.frames = 0
+        self.timestamp = 0
+        self.encoder = None
+        self.file = None
+
+    def add_page(self, image) -> None:
+        """
+        Codifica a página como o próximo quadro.
+
+        Parâmetros:
+            image (Image.Image): A imagem da página.
+        """
+        if isinstance(self.durations, (list, tuple)):
+            duration = int(self.durations[min(self.frames, len(self.durations) - 1)])
+        else:
+            duration = int(self.durations)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if self.format == "webp":
+            try:
+                self.add_webp_frame(image, duration)
+            except TypeError as e:
+                if self.frames > 0:
+                    raise
+                print(f"WebPAnimEncoder incompatível com esta versão do Pillow ({e}): gerando GIF")
+                self.encoder = None
+                self.format = "gif"
+                self.path = self.path[: -len(".webp")] + ".gif"
+
+        if self.format == "gif":
+            self.add_gif_frame(image, duration)
+        self.frames += 1
+
+    def add_webp_frame(self, image, duration) -> None:
+        if self.encoder is None:
+            self.size = image.size
+            # fundo branco opaco, repetições, minimize_size, kmin, kmax, allow_mixed, verbose
+            self.encoder = _webp.WebPAnimEncoder(
+                image.size[0], image.size[1], 0xFFFFFFFF, self.loop, False, 3, 5, False, False
+            )
+        elif image.size != self.size:
+            raise ValueError("Todas as páginas da animação devem ter o mesmo tamanho")
+
+        self.encoder.add(
+            image.tobytes("raw", "RGBX"),
+            self.timestamp,
+            image.size[0],
+            image.size[1],
+            "RGBX",
+            self.lossless,
+            self.quality,
+            100,
+            0,
+        )
+        self.timestamp += duration
+
+    def add_gif_frame(self, image, duration) -> None:
+        # paleta própria de cada página: cores que só aparecem em páginas seguintes não se perdem
+        frame = image.quantize(256, method=Image.Quantize.MEDIANCUT, dither=self.dither)
+
+        if self.file is None:
+            self.size = image.size
+            header, _ = GifImagePlugin.getheader(
+                frame, info={"loop": self.loop, "duration": duration, "optimize": False}
+            )
+            self.file = open(self.path + ".tmp", "wb")
+            for block in header:
+                self.file.write(block)
+        elif image.size != self.size:
+            raise ValueError("Todas as páginas da animação devem ter o mesmo tamanho")
+
+        for block in GifImagePlugin.getdata(
+            frame, duration=duration, include_color_table=True
+        ):
+            self.file.write(block)
+
+    def close(self) -> None:
+        """
+        Finaliza a animação e move o arquivo para o destino final.
+        """
+        if self.frames == 0:
+            raise ValueError("Animação sem páginas")
+
+        if self.format == "webp":
+            self.encoder.add(None, self.timestamp, 0, 0, "", self.lossless, self.quality, 100, 0)
+            data = self.encoder.assemble(b"", b"", b"")
+            self.encoder = None
+            if data is None:
+                raise OSError("Falha ao codificar o WebP animado")
+            with open(self.path + ".tmp", "wb") as file:
+                file.write(data)
+        else:
+            self.file.write(b";")
+            self.file.close()
+            self.file = None
+
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self) -> None:
+        """
+        Descarta a animação incompleta (após uma falha na renderização): libera o codificador, fecha o
+        arquivo e remove o ".tmp".
+        """
+        self.encoder = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        if os.path.exists(self.path + ".tmp"):
+            os.remove(self.path + ".tmp")
@@ -0,0 +1,122 @@
+import io
+import json
+import os
+import tarfile
+import time
+import zipfile
+
+from modules.image_builder.image_processor import ImageProcessor
+
+ARCHIVE_FORMATS = ("zip", "tar")
+
+
+class ArchiveWriter:
+    """
+    Grava as páginas codificadas diretamente em um arquivo zip ou tar, à medida que são renderizadas, em
+    vez de criar um arquivo solto por página.
+
+    O zip guarda o índice no diretório central (acesso direto a qualquer página); o tar, que não tem
+    índice, ganha um "<arquivo>.index.json" com o deslocamento e o tamanho de cada página. Os dois são
+    escritos em "<arquivo>.tmp" e movidos para o destino ao fechar.
+
+    Parâmetros:
+        path (str): O caminho do arquivo de saída (".zip" ou ".tar").
+        archive_format (str, opcional): "zip" ou "tar". O padrão é "zip".
+        stored (bool, opcional): Se True, o zip guarda as páginas sem recomprimir (PNG e JPEG já são
+        comprimidos); se False, usa deflate. O tar é sempre sem compressão. O padrão é True.
+    """
+
+    def __init__(self, path, archive_format="zip", stored=True):
+        if archive_format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Formato de arquivo inválido: {archive_format}")
+
+        self.path = path
+        self.archive_format = archive_format
+        self.index = {}
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        if archive_format == "zip":
+            self.archive = zipfile.ZipFile(
+                path + ".tmp",
+                "w",
+                compression=zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED,
+            )
+        else:
+            self.archive = tarfile.open(path + ".tmp", "w", format=tarfile.PAX_FORMAT)
+
+    def add_bytes(self, name, data) -> None:
+        """
+        Adiciona um arquivo já codificado.
+
+        Parâmetros:
+            name (str): O nome do arquivo dentro do pacote.
+            data (bytes): O conteúdo.
+        """
+        if self.archive_format == "zip":
+            self.archive.writestr(name, data)
+            return
+
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.archive.addfile(info, io.BytesIO(data))
+        # depois do addfile, o deslocamento aponta para o fim dos dados (com preenchimento até 512 bytes)
+        data_offset = self.archive.offset - -(-len(data) // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+        self.index[name] = [data_offset, len(data)]
+
+    def add_image(self, name, image, **params) -> None:
+        """
+        Codifica uma página (no formato indicado pela extensão do nome) e a adiciona.
+
+        Parâmetros:
+            name (str): O nome do arquivo dentro do pacote (ex.: "01_feed_post_1.png").
+            image (Image.Image): A página.
+            **params: Opções do codificador (ex.: quality para JPEG).
+        """
+        self.add_bytes(name, ImageProcessor.encode_image(image, os.path.splitext(name)[1], **params))
+
+    def close(self) -> None:
+        """
+        Finaliza o arquivo (e o índice do tar) e o move para o destino final.
+        """
+        self.archive.close()
+        if self.archive_format == "tar":
+            with open(self.path + ".index.json.tmp", "w", encoding="utf-8") as file:
+                json.dump(self.index, file)
+            os.replace(self.path + ".index.json.tmp", self.path + ".index.json")
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self) -> None:
+        """
+        Descarta o arquivo incompleto (após uma falha na renderização): fecha-o e remove o ".tmp".
+        """
+        try:
+            self.archive.close()
+        finally:
+            if os.path.exists(self.path + ".tmp"):
+                os.remove(self.path + ".tmp")
+
+    @staticmethod
+    def read(path, name) -> bytes:
+        """
+        Lê um arquivo do pacote com acesso direto (diretório central do zip ou índice do tar).
+
+        Parâmetros:
+            path (str): O caminho do pacote.
+            name (str): O nome do arquivo dentro do pacote.
+
+        Retorna:
+            bytes: O conteúdo.
+        """
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                return archive.read(name)
+
+        with open(path + ".index.json", "r", encoding="utf-8") as file:
+            offset, size = json.load(file)[name]
+        with open(path, "rb") as file:
+            file.seek(offset)
+            return file.read(size)
@@ -0,0 +1,186 @@
+import os
+import threading
+
+from PIL import Image, ImageFont
+
+from modules.image_builder.asset_pack import AssetPack
+
+
+class AssetCache:
+    """
+    Cache em memória de imagens e fontes decodificadas, invalidado pelo mtime do arquivo.
+
+    As imagens retornadas são compartilhadas: quem precisar alterá-las deve trabalhar em uma cópia
+    (resize, copy, convert...). Se um pacote de assets (AssetPack) estiver carregado, as imagens
+    dele ainda atualizadas são servidas diretamente da memória mapeada, sem decodificação.
+
+    Atributos:
+        hits (int): Quantidade de acessos atendidos pelo cache.
+        misses (int): Quantidade de acessos que precisaram decodificar o arquivo.
+        pack_hits (int): Quantidade de imagens servidas pelo pacote de assets, sem decodificação.
+    """
+
+    def __init__(self):
+        self.images = {}
+        self.fonts = {}
+        self.pack = None
+        self.pack_key = None
+        self.carousels = None
+        self.hits = 0
+        self.misses = 0
+        self.pack_hits = 0
+        self.lock = threading.Lock()
+
+    def get_image(self, path) -> Image.Image:
+        """
+        Retorna a imagem do caminho informado, decodificando-a apenas se não estiver em cache
+        ou se o arquivo tiver sido modificado.
+
+        Parâmetros:
+            path (str): O caminho para a imagem.
+
+        Retorna:
+            Image.Image: A imagem carregada (compartilhada, somente leitura).
+        """
+        mtime = os.stat(path).st_mtime_ns
+        with self.lock:
+            cached = self.images.get(path)
+            if cached is not None and cached[0] == mtime:
+                self.hits += 1
+                return cached[1]
+
+        image = self.pack.get_image(path, mtime) if self.pack else None
+        from_pack = image is not None
+        if not from_pack:
+            with Image.open(path) as source:
+                source.load()
+                image = source.copy()
+
+        with self.lock:
+            if from_pack:
+                self.pack_hits += 1
+            else:
+                self.misses += 1
+            self.images[path] = (mtime, image)
+        return image
+
+    def load_pack(self, path) -> bool:
+        """
+        Mapeia um pacote de assets gerado por AssetPack.build, se o arquivo existir. Se o mesmo pacote (caminho
+        e mtime) já estiver carregado, nada é feito, preservando as imagens já em cache.
+
+        Parâmetros:
+            path (str): O caminho do pacote.
+
+        Retorna:
+            bool: True se o pacote está carregado.
+        """
+        if not path or not os.path.exists(path):
+            return False
+
+        key = (os.path.abspath(path), os.stat(path).st_mtime_ns)
+        with self.lock:
+            if self.pack_key == key:
+                return True
+
+        pack = AssetPack(path)
+        with self.lock:
+            self.pack = pack
+            self.pack_key = key
+            self.carousels = dict(pack.carousels)
+            self.images.clear()
+        return True
+
+    def carousel_length(self, name) -> int:
+        """
+        Retorna a quantidade de imagens de um carrossel, a partir do índice do pacote ou, sem pacote,
+        de uma única leitura validada da pasta de carrosséis.
+
+        Parâmetros:
+            name (str): O nome da pasta do carrossel.
+
+        Retorna:
+            int: A quantidade de imagens (0 se o carrossel não existir).
+
+        Lança ValueError se o carrossel tiver arquivos fora da sequência (1.png, 2.png, ...).
+        """
+        if self.carousels is None:
+            carousels = AssetPack.carousel_lengths()
+            with self.lock:
+                self.carousels = carousels
+        length = self.carousels.get(name, 0)
+        if length is None:
+            raise ValueError(
+                f"Carrossel '{name}' precisa de imagens numeradas em sequência a partir de 1.png"
+            )
+        return length
+
+    def get_font(self, path, size) -> ImageFont.FreeTypeFont:
+        """
+        Retorna a fonte TrueType no tamanho informado, carregando-a apenas uma vez por tamanho
+        enquanto o arquivo não for modificado.
+
+        Parâmetros:
+            path (str): O caminho para o arquivo .ttf.
+            size (int): O tamanho da fonte.
+
+        Retorna:
+            ImageFont.FreeTypeFont: A fonte carregada.
+        """
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, size)
+        with self.lock:
+            cached = self.fonts.get(key)
+            if cached is not None and cached[0] == mtime:
+                self.hits += 1
+                return cached[1]
+
+        font = ImageFont.truetype(path, size)
+
+        with self.lock:
+            self.misses += 1
+            self.fonts[key] = (mtime, font)
+        return font
+
+    def warm(self, folders) -> int:
+        """
+        Pré-carrega todas as imagens PNG das pastas informadas (recursivamente).
+
+        Parâmetros:
+            folders (list): As pastas a serem pré-carregadas.
+
+        Retorna:
+            int: A quantidade de imagens carregadas.
+        """
+        count = 0
+        for folder in folders:
+            for root, _, filenames in os.walk(folder):
+                for filename in filenames:
+                    if filename.lower().endswith(".png"):
+                        self.get_image(os.path.join(root, filename).replace("\\", "/"))
+                        count += 1
+        return count
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas do cache.
+
+        Retorna:
+            dict: Quantidade de imagens e fontes em cache, acertos e falhas.
+        """
+        with self.lock:
+            return {
+                "images": len(self.images),
+                "fonts": len(self.fonts),
+                "hits": self.hits,
+                "misses": self.misses,
+                "pack_hits": self.pack_hits,
+            }
+
+    def clear(self) -> None:
+        """
+        Esvazia o cache.
+        """
+        with self.lock:
+            self.images.clear()
+            self.fonts.clear()
@@ -0,0 +1,178 @@
+import json
+import mmap
+import os
+import re
+import struct
+
+from PIL import Image
+
+MAGIC = b"PPMPACK1"
+ALIGNMENT = 4096
+
+
+def align(value) -> int:
+    """
+    Arredonda um deslocamento para o próximo múltiplo de ALIGNMENT.
+    """
+    return -(-value // ALIGNMENT) * ALIGNMENT
+
+
+class AssetPack:
+    """
+    Pacote de assets pré-decodificados: os pixels de assets/backgrounds (inclusive os carrosséis
+    numerados) e de assets/img_elements gravados em um único arquivo, mapeado em memória somente
+    leitura. Processos que mapeiam o mesmo pacote compartilham as páginas de memória dos pixels e
+    não precisam decodificar PNGs ao iniciar.
+
+    Formato: MAGIC, tamanho do índice (uint64), índice JSON e, a partir do próximo múltiplo de 4096
+    bytes, os pixels crus de cada imagem (cada uma também alinhada em 4096). O índice guarda, por
+    caminho, modo, tamanho, deslocamento (relativo ao início dos pixels) e mtime do PNG de origem,
+    além do comprimento validado de cada carrossel.
+
+    Parâmetros:
+        path (str): O caminho do pacote.
+    """
+
+    SOURCE_FOLDERS = ("assets/backgrounds", "assets/img_elements")
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            if file.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"Pacote de assets inválido: {path}")
+            (index_length,) = struct.unpack("<Q", file.read(8))
+            self.index = json.loads(file.read(index_length))
+            self.data_start = align(len(MAGIC) + 8 + index_length)
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.entries = self.index["images"]
+        self.carousels = self.index["carousels"]
+
+    def get_image(self, path, mtime=None) -> Image.Image:
+        """
+        Retorna a imagem do pacote sem copiar os pixels (somente leitura), ou None se ela não estiver
+        no pacote ou se o PNG de origem tiver sido modificado depois da geração do pacote.
+
+        Parâmetros:
+            path (str): O caminho original da imagem (ex.: "assets/img_elements/white_frame.png").
+            mtime (int, opcional): O mtime atual do PNG de origem, em nanossegundos.
+
+        Retorna:
+            Image.Image: A imagem mapeada, ou None.
+        """
+        entry = self.entries.get(path)
+        if entry is None or (mtime is not None and entry["mtime"] != mtime):
+            return None
+
+        offset, length = self.data_start + entry["offset"], entry["length"]
+        return Image.frombuffer(
+            entry["mode"],
+            tuple(entry["size"]),
+            memoryview(self.buffer)[offset : offset + length],
+            "raw",
+            entry["mode"],
+            0,
+            1,
+        )
+
+    @staticmethod
+    def carousel_lengths(folder="assets/backgrounds/carrossel") -> dict:
+        """
+        Calcula o comprimento de cada carrossel, validando que as imagens são numeradas em sequência
+        a partir de 1 (1.png, 2.png, ...).
+
+        Parâmetros:
+            folder (str, opcional): A pasta com os carrosséis. O padrão é "assets/backgrounds/carrossel".
+
+        Retorna:
+            dict: O número de imagens de cada carrossel, ou None para os carrosséis com arquivos fora da sequência
+            (ignorados com um aviso; o erro só é lançado ao renderizar com eles, ver AssetCache.carousel_length).
+        """
+        lengths = {}
+        if not os.path.isdir(folder):
+            return lengths
+
+        for name in sorted(os.listdir(folder)):
+            carousel_path = os.path.join(folder, name)
+            if not os.path.isdir(carousel_path):
+                continue
+
+            numbers = sorted(
+                int(match.group(1))
+                for match in (
+                    re.fullmatch(r"(\d+)\.png", filename)
+                    for filename in os.listdir(carousel_path)
+                )
+                if match
+            )
+            if numbers != list(range(1, len(numbers) + 1)):
+                print(
+                    f"Carrossel '{name}' ignorado: precisa de imagens numeradas em sequência a partir de 1.png: {numbers}"
+                )
+                lengths[name] = None
+                continue
+            lengths[name] = len(numbers)
+
+        return lengths
+
+    @staticmethod
+    def build(path="assets/asset_pack.bin", folders=SOURCE_FOLDERS) -> dict:
+        """
+        Decodifica os PNGs das pastas informadas e grava o pacote (de forma atômica).
+
+        Parâmetros:
+            path (str, opcional): O caminho do pacote. O padrão é "assets/asset_pack.bin".
+            folders (tuple, opcional): As pastas incluídas. O padrão são backgrounds e img_elements.
+
+        Retorna:
+            dict: O índice gravado.
+        """
+        sources = []
+        for folder in folders:
+            for root, _, filenames in os.walk(folder):
+                for filename in sorted(filenames):
+                    if filename.lower().endswith(".png"):
+                        sources.append(os.path.join(root, filename).replace("\\", "/"))
+
+        index = {"images": {}, "carousels": AssetPack.carousel_lengths()}
+
+        offset = 0
+        for source in sorted(sources):
+            with Image.open(source) as image:
+                mode = image.mode if image.mode in ("RGB", "RGBA", "L") else "RGBA"
+                width, height = image.size
+            length = width * height * {"L": 1, "RGB": 3, "RGBA": 4}[mode]
+            index["images"][source] = {
+                "mode": mode,
+                "size": [width, height],
+                "offset": offset,
+                "length": length,
+                "mtime": os.stat(source).st_mtime_ns,
+            }
+            offset += align(length)
+
+        index_bytes = json.dumps(index).encode("utf-8")
+        data_start = align(len(MAGIC) + 8 + len(index_bytes))
+
+        with open(path + ".tmp", "wb") as file:
+            file.write(MAGIC)
+            file.write(struct.pack("<Q", len(index_bytes)))
+            file.write(index_bytes)
+
+            for source, entry in index["images"].items():
+                with Image.open(source) as image:
+                    pixels = image.convert(entry["mode"]).tobytes()
+                file.seek(data_start + entry["offset"])
+                file.write(pixels)
+
+        os.replace(path + ".tmp", path)
+        return index
+
+
+if __name__ == "__main__":
+    index = AssetPack.build()
+    print(
+        f"{len(index['images'])} imagens empacotadas;",
+        "carrosséis:",
+        index["carousels"],
+    )
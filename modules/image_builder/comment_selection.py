@@ -0,0 +1,62 @@
+from modules.image_builder.text_processor import TextProcessor
+
+COMMENT_LINE_MAX = 65  # caracteres por linha no bloco de comentário
+MAX_COMMENT_LINES = 23  # comentários maiores não cabem em uma página
+
+POLICIES = ("top", "longest", "reactions")
+
+
+def comment_lines(comment) -> int:
+    """
+    Retorna a quantidade de linhas do texto do comentário depois da quebra de linhas, ou 0 se ele
+    não tiver texto.
+
+    Parâmetros:
+        comment (dict): O comentário.
+
+    Retorna:
+        int: A quantidade de linhas.
+    """
+    text = TextProcessor.break_line(comment["comment_text"], line_max=COMMENT_LINE_MAX)
+    if text == "":
+        return 0
+    return len(text.split("\n"))
+
+
+def is_renderable(comment) -> bool:
+    """
+    Indica se o comentário será renderizado (tem texto e cabe em uma página).
+
+    Parâmetros:
+        comment (dict): O comentário.
+
+    Retorna:
+        bool: True se o comentário será renderizado.
+    """
+    return 0 < comment_lines(comment) <= MAX_COMMENT_LINES
+
+
+def select_comments(comments, policy="top", limit=None) -> list:
+    """
+    Seleciona os comentários renderizáveis de acordo com a política.
+
+    Parâmetros:
+        comments (list): Os comentários, na ordem da página.
+        policy (str, opcional): "top" (os primeiros, na ordem da página), "longest" (os de texto mais longo)
+        ou "reactions" (os com mais reações). O padrão é "top".
+        limit (int, opcional): A quantidade máxima de comentários. O padrão é None (todos).
+
+    Retorna:
+        list: Os comentários selecionados, na ordem da política.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política de comentários inválida: {policy} (use {', '.join(POLICIES)})")
+
+    selected = [comment for comment in comments if is_renderable(comment)]
+
+    if policy == "longest":
+        selected.sort(key=lambda comment: len(comment["comment_text"]), reverse=True)
+    elif policy == "reactions":
+        selected.sort(key=lambda comment: comment.get("reactions", 0), reverse=True)
+
+    return selected if limit is None else selected[:limit]
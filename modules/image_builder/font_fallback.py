@@ -0,0 +1,330 @@
+import os
+import struct
+import threading
+
+from PIL import Image, ImageDraw
+
+# faixas de código com apresentação de emoji, desenhadas em cores a partir do atlas de glifos
+EMOJI_RANGES = (
+    (0x2300, 0x23FF),  # símbolos técnicos (⌚, ⏰...)
+    (0x2600, 0x27BF),  # símbolos diversos e dingbats
+    (0x2B00, 0x2BFF),  # setas e formas (⬆, ⭐...)
+    (0x1F000, 0x1FAFF),  # emojis, pictogramas e bandeiras
+)
+JOINERS = {0x200D, 0xFE0E, 0xFE0F}  # ZWJ e seletores de variação, sempre com o emoji vizinho
+SKIN_TONES = range(0x1F3FB, 0x1F400)  # sem shaping (raqm), o tom de pele viraria um quadrado ao lado do emoji
+
+
+def read_cmap(path) -> set:
+    """
+    Lê a tabela cmap de uma fonte TrueType/OpenType (subtabelas de formato 4 e 12) e retorna os
+    caracteres que ela cobre.
+
+    Parâmetros:
+        path (str): O caminho para o arquivo .ttf.
+
+    Retorna:
+        set: Os códigos (int) dos caracteres com glifo na fonte.
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+
+    (num_tables,) = struct.unpack_from(">H", data, 4)
+    cmap_offset = None
+    for index in range(num_tables):
+        tag, _, offset, _ = struct.unpack_from(">4sLLL", data, 12 + 16 * index)
+        if tag == b"cmap":
+            cmap_offset = offset
+            break
+    if cmap_offset is None:
+        return set()
+
+    # preferência: Unicode completo (formato 12) e depois BMP (formato 4)
+    subtables = {}
+    (num_subtables,) = struct.unpack_from(">H", data, cmap_offset + 2)
+    for index in range(num_subtables):
+        platform, encoding, offset = struct.unpack_from(
+            ">HHL", data, cmap_offset + 4 + 8 * index
+        )
+        subtable = cmap_offset + offset
+        (subtable_format,) = struct.unpack_from(">H", data, subtable)
+        if (platform, encoding) in ((3, 10), (0, 4), (0, 6)) and subtable_format == 12:
+            subtables.setdefault(12, subtable)
+        elif (platform, encoding) in ((3, 1), (0, 3)) and subtable_format == 4:
+            subtables.setdefault(4, subtable)
+
+    if 12 in subtables:
+        return read_cmap_format_12(data, subtables[12])
+    if 4 in subtables:
+        return read_cmap_format_4(data, subtables[4])
+    return set()
+
+
+def read_cmap_format_4(data, offset) -> set:
+    """
+    Lê uma subtabela cmap de formato 4 (segmentos do BMP).
+    """
+    (seg_count_x2,) = struct.unpack_from(">H", data, offset + 6)
+    seg_count = seg_count_x2 // 2
+    end_codes = struct.unpack_from(f">{seg_count}H", data, offset + 14)
+    start_codes = struct.unpack_from(f">{seg_count}H", data, offset + 16 + seg_count_x2)
+    id_deltas = struct.unpack_from(f">{seg_count}h", data, offset + 16 + 2 * seg_count_x2)
+    range_offsets_start = offset + 16 + 3 * seg_count_x2
+    range_offsets = struct.unpack_from(f">{seg_count}H", data, range_offsets_start)
+
+    covered = set()
+    for segment in range(seg_count):
+        start, end = start_codes[segment], end_codes[segment]
+        if start == 0xFFFF:
+            continue
+        for code in range(start, end + 1):
+            if range_offsets[segment] == 0:
+                glyph = (code + id_deltas[segment]) & 0xFFFF
+            else:
+                glyph_offset = (
+                    range_offsets_start
+                    + 2 * segment
+                    + range_offsets[segment]
+                    + 2 * (code - start)
+                )
+                (glyph,) = struct.unpack_from(">H", data, glyph_offset)
+                if glyph:
+                    glyph = (glyph + id_deltas[segment]) & 0xFFFF
+            if glyph:
+                covered.add(code)
+    return covered
+
+
+def read_cmap_format_12(data, offset) -> set:
+    """
+    Lê uma subtabela cmap de formato 12 (grupos de códigos, inclusive fora do BMP).
+    """
+    (num_groups,) = struct.unpack_from(">L", data, offset + 12)
+    covered = set()
+    for index in range(num_groups):
+        start, end, start_glyph = struct.unpack_from(">LLL", data, offset + 16 + 12 * index)
+        if start_glyph == 0:
+            start += 1  # o primeiro código do grupo aponta para o glifo vazio
+        covered.update(range(start, end + 1))
+    return covered
+
+
+def is_emoji(code) -> bool:
+    """
+    Indica se o código está em uma faixa de emojis (desenhados em cores).
+    """
+    return code in JOINERS or any(start <= code <= end for start, end in EMOJI_RANGES)
+
+
+class FontFallback:
+    """
+    Fallback de fontes por caractere: cada caractere é desenhado com a fonte pedida ou, se ela não
+    tiver o glifo, com a primeira fonte da cadeia de fallback que o tenha (índice de cobertura lido
+    das tabelas cmap das fontes de assets/fonts). Emojis são desenhados em cores (embedded_color)
+    a partir de um atlas de glifos já rasterizados.
+
+    A escolha da fonte de cada caractere fica em uma tabela por fonte pedida, de modo que o trabalho
+    por caractere é uma consulta a um dicionário.
+
+    Parâmetros:
+        assets (AssetCache): O cache de fontes.
+        folder (str, opcional): A pasta das fontes. O padrão é "assets/fonts".
+        chain (tuple, opcional): As fontes de fallback, em ordem. O padrão é ("segoeui", "seguiemj").
+        emoji_font (str, opcional): A fonte dos emojis coloridos. O padrão é "seguiemj".
+    """
+
+    def __init__(
+        self,
+        assets,
+        folder="assets/fonts",
+        chain=("segoeui", "seguiemj"),
+        emoji_font="seguiemj",
+    ):
+        self.assets = assets
+        self.folder = folder
+        self.chain = chain
+        self.emoji_font = emoji_font
+        self.coverages = {}
+        self.tables = {}
+        self.glyphs = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def font_path(self, name) -> str:
+        return f"{self.folder}/{name}.ttf"
+
+    def coverage(self, name) -> set:
+        """
+        Retorna os caracteres cobertos pela fonte, lendo sua cmap apenas uma vez enquanto o arquivo
+        não for modificado.
+
+        Parâmetros:
+            name (str): O nome da fonte (sem .ttf).
+
+        Retorna:
+            set: Os códigos dos caracteres cobertos.
+        """
+        path = self.font_path(name)
+        mtime = os.stat(path).st_mtime_ns
+        cached = self.coverages.get(name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        covered = read_cmap(path)
+        with self.lock:
+            self.coverages[name] = (mtime, covered)
+            self.tables.clear()
+        return covered
+
+    def font_for(self, char, font) -> tuple:
+        """
+        Retorna a fonte que desenha o caractere e se ele deve ser desenhado em cores.
+
+        Parâmetros:
+            char (str): O caractere.
+            font (str): A fonte pedida.
+
+        Retorna:
+            tuple: O nome da fonte (None se nenhuma fonte cobrir o caractere) e se é um emoji colorido.
+        """
+        table = self.tables.get(font)
+        if table is None:
+            table = self.tables.setdefault(font, {})
+
+        choice = table.get(char)
+        if choice is not None:
+            return choice
+
+        code = ord(char)
+        emoji = is_emoji(code)
+        candidates = (self.emoji_font, font, *self.chain) if emoji else (font, *self.chain)
+        choice = (None, False)
+        for candidate in candidates:
+            if code in self.coverage(candidate):
+                choice = (candidate, emoji and candidate == self.emoji_font)
+                break
+
+        table[char] = choice
+        return choice
+
+    def segment(self, text, font) -> list:
+        """
+        Divide o texto em trechos consecutivos desenhados com a mesma fonte. Caracteres fora do BMP sem
+        nenhuma fonte que os cubra são descartados; os demais ficam com a fonte pedida. Modificadores de tom
+        de pele logo após um emoji também são descartados (o emoji é desenhado no tom padrão).
+
+        Parâmetros:
+            text (str): O texto (uma linha).
+            font (str): A fonte pedida.
+
+        Retorna:
+            list: Trechos (fonte, texto, emoji colorido).
+        """
+        runs = []
+        for char in text:
+            run_font, emoji = self.font_for(char, font)
+            if ord(char) in SKIN_TONES and runs and runs[-1][2]:
+                continue
+            if run_font is None:
+                if ord(char) > 0xFFFF:
+                    continue
+                run_font = font
+
+            if runs and runs[-1][0] == run_font and runs[-1][2] == emoji:
+                runs[-1][1].append(char)
+            else:
+                runs.append((run_font, [char], emoji))
+
+        return [(run_font, "".join(chars), emoji) for run_font, chars, emoji in runs]
+
+    def needs_fallback(self, text, font) -> bool:
+        """
+        Indica se algum caractere do texto não é desenhado diretamente com a fonte pedida.
+        """
+        return any(
+            self.font_for(char, font) != (font, False)
+            for char in set(text)
+            if char != "\n"
+        )
+
+    def glyph(self, name, size, char, color) -> tuple:
+        """
+        Retorna o glifo colorido de um emoji a partir do atlas, rasterizando-o apenas na primeira vez.
+
+        Parâmetros:
+            name (str): A fonte.
+            size (int): O tamanho da fonte.
+            char (str): O caractere.
+            color (tuple): A cor usada nos glifos sem cor própria.
+
+        Retorna:
+            tuple: A imagem RGBA do glifo, sua máscara, o deslocamento em relação à linha de base e o avanço.
+        """
+        key = (name, size, char, color)
+        cached = self.glyphs.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        font = self.assets.get_font(self.font_path(name), size)
+        left, top, right, bottom = font.getbbox(char, anchor="ls")
+        glyph = Image.new("RGBA", (max(right - left, 1), max(bottom - top, 1)), (0, 0, 0, 0))
+        ImageDraw.Draw(glyph).text(
+            (-left, -top), char, font=font, fill=color, anchor="ls", embedded_color=True
+        )
+        cached = (glyph, glyph.getchannel("A"), (left, top), font.getlength(char))
+
+        with self.lock:
+            self.misses += 1
+            self.glyphs[key] = cached
+        return cached
+
+    def draw_line(self, draw, pos, text, font, font_size, color) -> None:
+        """
+        Desenha uma linha com fallback de fontes: os trechos compartilham a linha de base da fonte pedida.
+
+        Parâmetros:
+            draw (ImageDraw.Draw): O objeto de desenho da imagem.
+            pos (tuple): A posição do canto superior esquerdo da linha (como no anchor "la").
+            text (str): O texto da linha.
+            font (str): A fonte pedida.
+            font_size (int): O tamanho da fonte.
+            color (tuple): A cor do texto.
+        """
+        primary = self.assets.get_font(self.font_path(font), font_size)
+        x = pos[0]
+        baseline = pos[1] + primary.getmetrics()[0]
+
+        for run_font, run_text, emoji in self.segment(text, font):
+            if not emoji:
+                run = self.assets.get_font(self.font_path(run_font), font_size)
+                draw.text((x, baseline), run_text, font=run, fill=color, anchor="ls")
+                x += run.getlength(run_text)
+                continue
+
+            for char in run_text:
+                glyph, mask, (left, top), advance = self.glyph(
+                    run_font, font_size, char, color
+                )
+                box_x, box_y = int(x + left), int(baseline + top)
+                # mesma colagem usada pelo ImageDraw.text com embedded_color
+                draw.im.paste(
+                    glyph.im,
+                    (box_x, box_y, box_x + glyph.size[0], box_y + glyph.size[1]),
+                    mask.im,
+                )
+                x += advance
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas do fallback (acertos e falhas do atlas de glifos).
+        """
+        with self.lock:
+            return {
+                "fonts": len(self.coverages),
+                "tables": len(self.tables),
+                "glyphs": len(self.glyphs),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -1,8 +1,27 @@
 import json
 import os
 
+from modules.image_builder.animation_writer import AnimationWriter, frame_durations
+from modules.image_builder.archive_writer import ArchiveWriter
+from modules.image_builder.comment_selection import (
+    COMMENT_LINE_MAX,
+    comment_lines,
+    select_comments,
+)
 from modules.image_builder.image_processor import ImageProcessor
+from modules.image_builder.layout import Layout
+from modules.image_builder.page_packer import pack, paragraph_break_costs
+from modules.image_builder.pdf_writer import PdfWriter
+from modules.image_builder.template import compile_template
 from modules.image_builder.text_processor import TextProcessor
+from modules.image_builder.tile_cache import TileCache
+from modules.metrics.metrics import BatchMetrics
+
+
+class RenderCancelled(Exception):
+    """
+    Renderização interrompida porque o cancelamento foi solicitado (ver o parâmetro cancelled do ImageBuilder).
+    """
 
 
 class ImageBuilder:
@@ -14,17 +33,46 @@ class ImageBuilder:
         background (str, opcional): O nome do arquivo de imagem de fundo ou pasta dentro de "assets/backgrounds/carrossel" contendo as imagens. O padrão
         é "default_blue" (background_carrossel=False).
         background_carrossel (bool, opcional): Indica se o fundo deve ser contínuo em todas as páginas. O padrão é False.
+        data (dict, opcional): Os dados do post. Se não informado, são lidos de "<path>/data.json".
+        output_path (str, opcional): A pasta de saída. O padrão é "<path>/processed_images".
+        metrics (BatchMetrics, opcional): As métricas do lote, que recebem a duração do plano ("layout"), da
+        rasterização ("render") e da codificação ("encode") de cada página. O padrão é None (métricas próprias).
+        cancelled (callable, opcional): Consultado antes de cada página; se retornar True, a renderização é
+        interrompida com RenderCancelled (ex.: a reserva da pasta foi perdida). O padrão é None.
+
+    Posições, tamanhos, fontes e elementos das páginas vêm de um template de layout compilado
+    (RenderProgram, ver templates.yaml); o padrão é o template "default".
     """
 
-    def __init__(self, path, background="default_blue", background_carrossel=False):
+    tiles = TileCache()  # componentes renderizados, compartilhados entre os posts do processo
+
+    def __init__(
+        self,
+        path,
+        background="default_blue",
+        background_carrossel=False,
+        data=None,
+        output_path=None,
+        metrics=None,
+        cancelled=None,
+    ):
         self.path = path
-        self.output_path = self.path + "/processed_images"
-        self.data = self.read_file(os.path.join(path, "data.json"))
-        self.height_line = 29
-        self.text_font = "seguiemj"
-        self.text_size = 22
+        self.cancelled = cancelled
+        self.output_path = output_path or self.path + "/processed_images"
+        self.data = (
+            data if data is not None else self.read_file(os.path.join(path, "data.json"))
+        )
+        self.output_files = []
+        self.metrics = metrics or BatchMetrics()
         self.background = background
         self.background_carrossel = background_carrossel
+        self.carousel_warned = False
+        self.set_template(compile_template())
+        self.comments_policy = "top"
+        self.comments_limit = None
+        self.pagination = "optimal"
+        self.plan_costs = {}
+        self.set_target(Layout.FORMATS["square"])
 
     def read_file(self, path) -> dict:
         """
@@ -49,7 +97,27 @@ class ImageBuilder:
             return None
 
     def build(
-        self, anonymous=False, background_carrossel=False, background="default_blue"
+        self,
+        anonymous=False,
+        background_carrossel=False,
+        background="default_blue",
+        preview=None,
+        pdf=False,
+        pdf_compression="jpeg",
+        pdf_quality=85,
+        formats=None,
+        comments_policy="top",
+        comments_limit=None,
+        pagination="optimal",
+        archive=None,
+        archive_stored=True,
+        archive_writer=None,
+        template="default",
+        templates_path="templates.yaml",
+        animation=None,
+        animation_durations=3000,
+        animation_loop=0,
+        animation_quality=80,
     ) -> None:
         """
         Constrói as imagens com base nos dados fornecidos.
@@ -59,6 +127,33 @@ class ImageBuilder:
             background_carrossel (bool, opcional): Indica se o fundo deve ser contínuo em todas as páginas. O padrão é False.
             background (str, opcional): O nome do arquivo de imagem de fundo ou pasta dentro de "assets/backgrounds/carrossel"
             contendo as imagens. O padrão é "default_blue".
+            preview (float, opcional): Escala da prévia (ex.: 0.25 ou 0.5). Se informada, o mesmo plano de páginas é
+            renderizado em escala reduzida e salvo como miniaturas JPEG em "processed_images/preview". O padrão é None.
+            pdf (bool, opcional): Se True, também gera "carrossel.pdf" com todas as páginas, na ordem do plano, escrito
+            página a página durante a renderização. O padrão é False.
+            pdf_compression (str, opcional): A compressão das imagens do PDF, "jpeg" ou "flate". O padrão é "jpeg".
+            pdf_quality (int, opcional): A qualidade JPEG (ou nível flate) das imagens do PDF. O padrão é 85.
+            formats (list, opcional): Formatos de saída ("square", "portrait", "story" ou "LARGURAxALTURA"). O layout e a
+            paginação são calculados uma vez por proporção e rasterizados em cada tamanho, em
+            "processed_images/<LARGURA>x<ALTURA>". O padrão é None (somente 1080x1080, em "processed_images").
+            comments_policy (str, opcional): Como escolher os comentários: "top" (ordem da página), "longest" (mais longos)
+            ou "reactions" (mais reações). O padrão é "top".
+            comments_limit (int, opcional): A quantidade máxima de comentários renderizados. O padrão é None (todos).
+            pagination (str, opcional): "optimal" (menos páginas, com preenchimento equilibrado) ou "greedy" (cada página
+            preenchida até o limite). O custo do plano escolhido fica em self.plan_costs. O padrão é "optimal".
+            archive (str, opcional): "zip" ou "tar" para gravar as páginas em um único arquivo por pasta de saída
+            ("pages.zip" ou "pages.tar") em vez de arquivos soltos. O padrão é None (arquivos soltos).
+            archive_stored (bool, opcional): Se True, o zip guarda as páginas sem recomprimir. O padrão é True.
+            archive_writer (ArchiveWriter, opcional): Um arquivo compartilhado por um lote de posts (aberto e fechado
+            por quem chama); as páginas entram com o caminho da pasta de saída como prefixo. O padrão é None.
+            template (str, opcional): O template de layout. O padrão é "default".
+            templates_path (str, opcional): O arquivo de templates. O padrão é "templates.yaml".
+            animation (str, opcional): "webp" ou "gif" para gerar também "carrossel.webp" (ou ".gif") com as páginas
+            como quadros, codificados durante a renderização (GIF se o Pillow não tiver WebP animado). O padrão é None.
+            animation_durations (int | list | dict, opcional): A duração de cada quadro, em milissegundos: única, por
+            página ou por tipo de página (ver frame_durations). O padrão é 3000.
+            animation_loop (int, opcional): Quantidade de repetições da animação (0 = infinitas). O padrão é 0.
+            animation_quality (int, opcional): A qualidade dos quadros WebP (0-100). O padrão é 80.
 
         Retorno:
             int: 1 se as imagens forem construídas com sucesso, 0 caso contrário.
@@ -67,9 +162,6 @@ class ImageBuilder:
         os dados do autor e dos comentários serão substituídos por valores padrão antes da construção das imagens.
         """
 
-        if not os.path.exists(self.output_path):
-            os.mkdir(self.output_path)
-
         if anonymous:
             self.data = self.anonimous_data()
 
@@ -77,16 +169,266 @@ class ImageBuilder:
             self.background_carrossel = background_carrossel
 
         self.background = background
+        self.carousel_warned = False
+        self.comments_policy = comments_policy
+        self.comments_limit = comments_limit
+        self.pagination = pagination
+        self.set_template(compile_template(template, templates_path))
+
+        if formats is None:
+            targets = [(Layout.FORMATS["square"], self.output_path)]
+        else:
+            targets = []
+            for output_format in formats:
+                size = Layout.parse_format(output_format)
+                targets.append((size, f"{self.output_path}/{size[0]}x{size[1]}"))
+
+        aspects = {}
+        for size, output_path in targets:
+            aspects.setdefault(Layout.aspect_of(size), []).append((size, output_path))
+
+        for aspect, aspect_targets in aspects.items():
+            self.layout = self.program.layout(aspect)
+            with self.metrics.timer("layout"):
+                plan = self.plan_pages()
+
+            for size, output_path in aspect_targets:
+                self.set_target(size, preview=preview)
+                if preview:
+                    output_path += "/preview"
+
+                # com um arquivo de lote e sem PDF, nada é gravado na pasta de saída
+                needs_folder = archive_writer is None or pdf or animation
+                if needs_folder and not os.path.exists(output_path):
+                    os.makedirs(output_path)
+
+                archive_prefix = ""
+                own_archive = None
+                if archive_writer is None and archive:
+                    own_archive = ArchiveWriter(
+                        f"{output_path}/pages.{archive}", archive, stored=archive_stored
+                    )
+                elif archive_writer is not None:
+                    archive_prefix = os.path.normpath(output_path).replace("\\", "/") + "/"
+
+                sinks = []
+                if pdf:
+                    sinks.append(
+                        PdfWriter(
+                            f"{output_path}/carrossel.pdf",
+                            compression=pdf_compression,
+                            quality=pdf_quality,
+                        )
+                    )
+                if animation:
+                    sinks.append(
+                        AnimationWriter(
+                            f"{output_path}/carrossel",
+                            animation,
+                            durations=frame_durations(animation_durations, plan),
+                            loop=animation_loop,
+                            quality=animation_quality,
+                        )
+                    )
+
+                try:
+                    self.render_plan(
+                        plan,
+                        output_path,
+                        sinks=sinks,
+                        archive=own_archive or archive_writer,
+                        archive_prefix=archive_prefix,
+                    )
+                except Exception:
+                    # arquivos incompletos desta pasta não são movidos para o destino
+                    for writer in sinks + ([own_archive] if own_archive is not None else []):
+                        writer.abort()
+                    raise
+
+                if own_archive is not None:
+                    own_archive.close()
+                    self.output_files.append(own_archive.path)
+
+        return 1
+
+    @staticmethod
+    def configure_process(configs) -> None:
+        """
+        Aplica as configurações compartilhadas pelo processo: orçamento de memória das mídias, pasta do
+        cache de tiles e pacote de assets. O template de layout é compilado aqui, uma vez por processo.
+
+        Parâmetros:
+            configs (dict): As configurações (config.yaml).
+        """
+        ImageProcessor.set_memory_budget(configs.get("media_memory_budget_mb"))
+        ImageBuilder.tiles.set_disk_path(configs.get("tile_cache_dir"))
+        ImageProcessor.assets.load_pack(configs.get("asset_pack"))
+        compile_template(
+            configs.get("template", "default"), configs.get("templates_path", "templates.yaml")
+        )
+
+    @staticmethod
+    def build_options(configs) -> dict:
+        """
+        Converte as configurações (config.yaml) nos parâmetros de build.
+
+        Parâmetros:
+            configs (dict): As configurações.
 
-        self.paginate_post_text(data=self.data)
+        Retorna:
+            dict: Os parâmetros nomeados de build.
+        """
+        return {
+            "anonymous": configs["anom_users"],
+            "background_carrossel": configs["background_carrossel"],
+            "background": configs["background"],
+            "preview": configs.get("preview"),
+            "pdf": configs.get("pdf_export", False),
+            "pdf_compression": configs.get("pdf_compression", "jpeg"),
+            "pdf_quality": configs.get("pdf_quality", 85),
+            "formats": configs.get("formats"),
+            "comments_policy": configs.get("comments_policy", "top"),
+            "comments_limit": configs.get("comments_limit"),
+            "pagination": configs.get("pagination", "optimal"),
+            "archive": configs.get("output_archive"),
+            "archive_stored": configs.get("archive_stored", True),
+            "template": configs.get("template", "default"),
+            "templates_path": configs.get("templates_path", "templates.yaml"),
+            "animation": configs.get("animation_export"),
+            "animation_durations": configs.get("animation_durations", 3000),
+            "animation_loop": configs.get("animation_loop", 0),
+            "animation_quality": configs.get("animation_quality", 80),
+        }
+
+    def set_template(self, program) -> None:
+        """
+        Define o template de layout compilado usado no plano e na renderização das páginas.
+
+        Parâmetros:
+            program (RenderProgram): O template compilado (ver compile_template).
+        """
+        self.program = program
+        self.height_line = program.text["line_height"]
+        self.text_font = program.text["font"]
+        self.text_size = program.text["size"]
+        self.layout = program.layout()
+
+    def set_target(self, size, preview=None) -> None:
+        """
+        Define o tamanho final das páginas. Na prévia, o tamanho é reduzido pela escala informada, com
+        reamostragem barata e páginas salvas como JPEG de baixa qualidade.
+
+        Parâmetros:
+            size (tuple): A largura e a altura finais, em pixels.
+            preview (float, opcional): A escala da prévia. O padrão é None.
+        """
+        preview_scale = preview or 1
+        self.canvas_size = (
+            round(size[0] * preview_scale),
+            round(size[1] * preview_scale),
+        )
+        self.scale = self.layout.scale_for(size) * preview_scale
+        if preview:
+            self.resample = ImageProcessor.FAST_RESAMPLE
+            self.output_extension = "jpg"
+            self.save_params = {"quality": 60}
+        else:
+            self.resample = None
+            self.output_extension = "png"
+            self.save_params = {}
+        self.layers = self.program.layers(self.scale, self.resample)
+
+    def px(self, value) -> int:
+        """
+        Converte uma medida do layout (unidades de projeto, com 1080 de largura) para pixels no tamanho atual.
+
+        Parâmetros:
+            value (int): A medida em unidades de projeto.
+
+        Retorna:
+            int: A medida na escala atual.
+        """
+        return int(round(value * self.scale))
+
+    def plan_pages(self) -> list:
+        """
+        Monta o plano de páginas (texto, mídias e comentários) sem renderizar nada.
+
+        Retorna:
+            list: Uma lista de dicionários, um por página, na ordem de saída. Cada página tem ao menos
+            "type", "name" e "background".
+
+        O resultado do empacotamento de cada seção (páginas, custo e preenchimento) fica em self.plan_costs.
+        """
+        self.plan_costs = {}
+        plan = self.paginate_post_text(data=self.data)
 
         if len(self.data["content"]["img_filenames"]) > 0:
-            self.paginate_content_media(data=self.data)
+            plan += self.paginate_content_media(data=self.data)
 
-        if len(self.data["comments"]) > 0:
-            self.paginate_comments_images(data=self.data)
+        comments = select_comments(
+            self.data["comments"], self.comments_policy, self.comments_limit
+        )
+        if len(comments) > 0:
+            plan += self.paginate_comments_images(comments)
 
-        return 1
+        for page_number, page in enumerate(plan, start=1):
+            page["background"] = self.get_background(page_number)
+
+        return plan
+
+    def render_plan(self, plan, output_path, sinks=(), archive=None, archive_prefix="") -> None:
+        """
+        Renderiza e salva cada página do plano.
+
+        Parâmetros:
+            plan (list): O plano de páginas retornado por plan_pages.
+            output_path (str): A pasta onde as páginas serão salvas.
+            sinks (list, opcional): Saídas adicionais (com add_page(image), close() e abort()) que recebem cada página
+            assim que ela é renderizada, como o PdfWriter e o AnimationWriter.
+            archive (ArchiveWriter, opcional): Se informado, as páginas codificadas vão para o arquivo (que não é
+            fechado aqui) em vez de arquivos soltos. O padrão é None.
+            archive_prefix (str, opcional): O prefixo do nome das páginas dentro do arquivo. O padrão é "".
+        """
+        for page in plan:
+            if self.cancelled is not None and self.cancelled():
+                raise RenderCancelled(f"Renderização cancelada: {self.path}")
+
+            with self.metrics.timer("render"):
+                image = self.render_page(page)
+
+            with self.metrics.timer("encode"):
+                filename = f"{page['name']}.{self.output_extension}"
+                if archive is not None:
+                    archive.add_image(archive_prefix + filename, image, **self.save_params)
+                else:
+                    page_path = f"{output_path}/{filename}"
+                    ImageProcessor.save_image(image, page_path, **self.save_params)
+                    self.output_files.append(page_path)
+
+                for sink in sinks:
+                    sink.add_page(image)
+            self.metrics.count("pages")
+
+        for sink in sinks:
+            sink.close()
+            self.output_files.append(sink.path)
+
+    def render_page(self, page):
+        """
+        Renderiza uma página do plano.
+
+        Parâmetros:
+            page (dict): A página a ser renderizada.
+
+        Retorna:
+            Image.Image: A imagem da página.
+        """
+        if page["type"] == "post":
+            return self.build_post_text(page)
+        if page["type"] == "content_media":
+            return self.build_content_media_image(page)
+        return self.build_comments_image(page)
 
     def anonimous_data(self) -> dict:
         """
@@ -105,109 +447,126 @@ class ImageBuilder:
 
         return data
 
-    def paginate_post_text(self, data, output_count=1) -> None:
+    def paginate_post_text(self, data) -> list:
         """
         Pagina as imagens do post de acordo com o número máximo de linhas permitidas.
+        As linhas são distribuídas pelo empacotador de páginas (page_packer): a última página comporta
+        até max_post_lines linhas e as demais até max_post_lines_continued, evitando linhas viúvas ou
+        órfãs de um parágrafo e, no modo "optimal", equilibrando o preenchimento entre as páginas.
 
         Parâmetros:
             data (dict): Os dados do post.
-            output_count (int, opcional): O contador de saída para nomear os arquivos de imagem. O padrão é 1.
-        """
-        max_lines_per_image = 26
-
-        text = TextProcessor.break_line(data["content"]["text"])
-
-        text_splited = text.split("\n")
-        n_lines = len(text_splited)
-
-        text_to_build = "\n".join(
-            text_splited
-            if n_lines <= max_lines_per_image
-            else text_splited[: max_lines_per_image - 4]
-        )
-
-        height = (210 if output_count == 1 else 290) + len(
-            text_to_build.split("\n")
-        ) * self.height_line
 
-        self.build_post_text(
-            text=text_to_build,
-            output_count=output_count,
-            continued=output_count > 1,
-            end=n_lines < max_lines_per_image,
-            height=height,
+        Retorna:
+            list: As páginas de texto do post.
+        """
+        lines = []
+        paragraph_ids = []
+        for paragraph_id, paragraph in enumerate(data["content"]["text"].split("\n")):
+            for line in TextProcessor.break_line(paragraph).split("\n"):
+                lines.append(line)
+                paragraph_ids.append(paragraph_id)
+
+        result = pack(
+            [1] * len(lines),
+            capacity=self.layout.max_post_lines_continued,
+            last_capacity=self.layout.max_post_lines,
+            min_items=2,
+            break_costs=paragraph_break_costs(paragraph_ids),
+            optimal=self.pagination == "optimal",
         )
+        self.plan_costs["post"] = result
+
+        pages = []
+        for index, (start, end) in enumerate(result.pages):
+            page_lines = lines[start:end]
+            header_height = (
+                self.program.post["continued_header_height"]
+                if index > 0
+                else self.program.post["header_height"]
+            )
+            height = header_height + len(page_lines) * self.height_line
+
+            pages.append(
+                {
+                    "type": "post",
+                    "name": f"01_feed_post_{index + 1}",
+                    "text": "\n".join(page_lines),
+                    "continued": index > 0,
+                    "end": index == len(result.pages) - 1,
+                    "height": height,
+                }
+            )
 
-        if n_lines > max_lines_per_image:
-            text = "\n".join(text_splited[: max_lines_per_image - 4])
-            page_text = "\n".join(text_splited[max_lines_per_image - 4 :])
-            new_data = data.copy()
-            new_data["content"]["text"] = page_text
-            self.paginate_post_text(data=new_data, output_count=output_count + 1)
+        return pages
 
-    def build_post_text(self, text, output_count, continued, end, height) -> None:
+    def build_post_text(self, page):
         """
         Constrói a imagem do post com base nos dados fornecidos.
 
         Parâmetros:
-            text (str): O texto do post.
-            output_count (int): O contador de saída para nomear o arquivo de imagem.
-            continued (bool): Indica se o post continua em outra página.
-            end (bool): Indica se é a última página do post.
-            height (int): A altura da imagem.
-        """
-        image, draw = ImageProcessor.start_image(self.get_background())
+            page (dict): A página do plano, com o texto ("text"), se continua uma página anterior ("continued"),
+            se é a última página do post ("end") e a altura do quadro ("height").
 
-        image, frame = ImageProcessor.place_frame(
-            image,
-            height=height,
+        Retorna:
+            Image.Image: A imagem da página.
+        """
+        image, draw = ImageProcessor.start_image(
+            page["background"], size=self.canvas_size, resample=self.resample
         )
 
-        self.place_author_header(image, draw, frame["y"] + 20)
+        post = self.program.post
+        image, frame = self.place_frame(image, page["height"])
+
+        self.place_author_header(
+            image, draw, frame["y"] + self.px(self.program.author_header["y"])
+        )
 
-        if continued:
-            image, pos = ImageProcessor.paste_image(
+        if page["continued"]:
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/header_ellipsis.png",
-                y=frame["y"] + 110,
+                self.layers["header_ellipsis"],
+                y=frame["y"] + self.px(post["header_ellipsis_y"]),
             )
 
-            content_text_padding_top = frame["y"] + 185
+            content_text_padding_top = frame["y"] + self.px(post["continued_text_y"])
 
         else:
-            content_text_padding_top = frame["y"] + 117
+            content_text_padding_top = frame["y"] + self.px(post["text_y"])
 
-        content_text_padding_left = 136
+        content_text_padding_left = self.px(post["text_x"])
 
         ImageProcessor.write_text(
             draw=draw,
-            text=text,
+            text=page["text"],
             pos=(content_text_padding_left, content_text_padding_top),
             multline=True,
-            font_size=self.text_size,
+            font_size=self.px(self.text_size),
             font=self.text_font,
-            spacing=12,
+            spacing=self.px(post["text_spacing"]),
         )
 
-        if not end:
-            ImageProcessor.paste_image(
+        if not page["end"]:
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/ellipsis_continue.png",
-                y=frame["end_y"] - 72,
+                self.layers["ellipsis_continue"],
+                y=frame["end_y"] - self.px(post["continue_ellipsis_bottom"]),
             )
 
         else:
-            ImageProcessor.paste_image(
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/action_bar.png",
-                size=(int(800 * 1), int(65 * 1)),
-                y=frame["end_y"] - 80,
+                self.layers["post_action_bar"],
+                y=frame["end_y"] - self.px(post["action_bar"]["bottom"]),
             )
 
-            ImageProcessor.paste_image(
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/reaction_icon_3.png",
-                pos=(frame["x"] + 30, frame["end_y"] - 90),
+                self.layers["reaction_icon"],
+                pos=(
+                    frame["x"] + self.px(post["reaction_icon"]["x"]),
+                    frame["end_y"] - self.px(post["reaction_icon"]["bottom"]),
+                ),
             )
 
             reactions = self.data["content"]["reactions"]
@@ -217,264 +576,331 @@ class ImageBuilder:
                     if len(reactions) > 1
                     else reactions[0]
                 )
+                style = post["reactions"]
                 ImageProcessor.write_text(
                     draw,
                     text=reactions_text,
                     pos=(
-                        206,
-                        frame["end_y"] - 94,
+                        self.px(style["x"]),
+                        frame["end_y"] - self.px(style["bottom"]),
                     ),
-                    font_size=18,
-                    color=(130, 130, 130),
+                    font=style["font"],
+                    font_size=self.px(style["size"]),
+                    color=style["color"],
                 )
 
-        ImageProcessor.save_image(
-            image, f"{self.output_path}/01_feed_post_{output_count}.png"
-        )
+        return image
 
-    def paginate_content_media(self, data) -> None:
+    def paginate_content_media(self, data) -> list:
         """
         Pagina as mídias de conteúdo.
 
         Parâmetros:
             data (dict): Os dados do post.
+
+        Retorna:
+            list: Uma página por mídia de conteúdo.
         """
-        for index, content_image_filename in enumerate(
-            data["content"]["img_filenames"]
-        ):
-            if index == len(data["content"]["img_filenames"]) - 1:
-                end = True
-            else:
-                end = False
+        pages = []
+        img_filenames = data["content"]["img_filenames"]
+        for index, content_image_filename in enumerate(img_filenames):
+            pages.append(
+                {
+                    "type": "content_media",
+                    "name": f"02_feed_content_media_{index + 1}",
+                    "filename": content_image_filename,
+                    "end": index == len(img_filenames) - 1,
+                }
+            )
 
-            self.build_content_media_image(content_image_filename, index, end=end)
+        return pages
 
-    def build_content_media_image(self, content_image_filename, index, end) -> None:
+    def build_content_media_image(self, page):
         """
         Constrói a imagem de mídia de conteúdo com base nos dados fornecidos.
 
         Parâmetros:
-            content_image_filename (str): O nome do arquivo de mídia de conteúdo.
-            index (int): O índice da imagem de mídia de conteúdo.
-            end (bool): Indica se é a última imagem de mídia de conteúdo.
+            page (dict): A página do plano, com o nome do arquivo de mídia ("filename") e se é a última
+            imagem de mídia de conteúdo ("end").
 
-        Esta função constrói a imagem de mídia de conteúdo com base no nome do arquivo, índice e se é a última imagem.
+        Retorna:
+            Image.Image: A imagem da página.
         """
-        height_frame = 900
-        image, draw = ImageProcessor.start_image(self.get_background())
-
-        image, frame = ImageProcessor.place_frame(
-            image,
-            height=height_frame,
+        height_frame = self.layout.frame_max_height
+        image, draw = ImageProcessor.start_image(
+            page["background"], size=self.canvas_size, resample=self.resample
         )
 
+        media = self.program.content_media
+        image, frame = self.place_frame(image, height_frame)
+
         image = self.place_author_header(
-            image=image, draw=draw, content_top_y=frame["y"] + 20
+            image=image,
+            draw=draw,
+            content_top_y=frame["y"] + self.px(self.program.author_header["y"]),
         )
 
-        padding_bottom = 40
-        padding_top = 80
         image = ImageProcessor.place_content_media(
             image,
-            f"{self.path}/{content_image_filename}",
-            border=40,
+            f"{self.path}/{page['filename']}",
+            border=self.px(media["border"]),
             frame_size=(frame["width"], frame["height"]),
             frame_pos=(frame["pos"]),
-            padding_bottom=padding_bottom,
-            padding_top=padding_top,
+            padding_bottom=self.px(media["padding_bottom"]),
+            padding_top=self.px(media["padding_top"]),
+            resample=self.resample,
         )
 
-        if end:
-            image, pos = ImageProcessor.paste_image(
+        if page["end"]:
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/ellipsis_continue.png",
-                y=frame["end_y"] - 70,
+                self.layers["ellipsis_continue"],
+                y=frame["end_y"] - self.px(media["continue_ellipsis_bottom"]),
             )
 
         else:
-            image, pos = ImageProcessor.paste_image(
+            ImageProcessor.paste_layer(
                 image,
-                "assets/img_elements/action_bar.png",
-                y=frame["end_y"] - 75,
+                self.layers["media_action_bar"],
+                y=frame["end_y"] - self.px(media["action_bar_bottom"]),
             )
 
-        ImageProcessor.save_image(
-            image, f"{self.output_path}/02_feed_content_media_{index + 1}.png"
-        )
+        return image
 
-    def paginate_comments_images(self, data, output_count=1) -> None:
+    def paginate_comments_images(self, comments) -> list:
         """
         Pagina as imagens dos comentários de acordo com a altura máxima permitida(em consideração a soma de linhas e espaçamentos).
+        Cada comentário é um bloco indivisível no empacotador de páginas (page_packer); um comentário que
+        sozinho excede a altura máxima ocupa uma página própria.
 
         Parâmetros:
-            data (dict): Os dados dos comentários.
-            output_count (int, opcional): O contador de saída para nomear os arquivos de imagem. O padrão é 1.
-        """
-
-        max_height = 900  # 900
-        height_comment_header = 120  # espaçamentos
+            comments (list): Os comentários a serem renderizados (já selecionados e renderizáveis).
 
-        staged_comments = []
-        height_frame = 110  # seria o header
+        Retorna:
+            list: As páginas de comentários.
+        """
 
-        for i, comment in enumerate(data["comments"]):
-            comment_text = TextProcessor.break_line(
-                comment["comment_text"], line_max=65
+        max_height = self.layout.frame_max_height  # 900 no formato quadrado
+        height_comment_header = self.program.comments["block_padding"]  # espaçamentos
+        height_header = self.program.comments["header_height"]
+
+        heights = [
+            (comment_lines(comment) + 1) * self.height_line + height_comment_header
+            for comment in comments
+        ]
+        result = pack(
+            heights,
+            capacity=max_height - height_header,
+            optimal=self.pagination == "optimal",
+        )
+        self.plan_costs["comments"] = result
+
+        pages = []
+        for index, (start, end) in enumerate(result.pages):
+            last = index == len(result.pages) - 1
+            height_frame = height_header + sum(heights[start:end])
+            pages.append(
+                {
+                    "type": "comments",
+                    "name": f"03_feed_comments_{index + 1}",
+                    "comments": comments[start:end],
+                    "height_frame": (
+                        height_frame
+                        if last
+                        else height_frame + self.program.comments["continued_extra_height"]
+                    ),
+                    "end": last,
+                }
             )
-            n_lines = len(comment_text.split("\n"))
-
-            # ignorando comentários muito grandes ou sem texto
-            if n_lines > 23 or comment_text == "":
-                continue
-
-            comment_height = (n_lines + 1) * self.height_line + height_comment_header
 
-            if height_frame + comment_height > max_height:
-                new_data = data.copy()
-                new_data["comments"] = data["comments"][i:]
-                self.paginate_comments_images(
-                    data=new_data,
-                    output_count=output_count + 1,
-                )
-                break
-            else:
-                height_frame += comment_height
-                staged_comments.append(comment)
-
-        last_image = staged_comments[-1] == data["comments"][-1]
-        self.build_comments_image(
-            comments=staged_comments,
-            height_frame=height_frame if last_image else height_frame + 50,
-            output_count=output_count,
-            end=last_image,
-        )
+        return pages
 
-    def build_comments_image(
-        self, comments, height_frame, output_count=1, end=False
-    ) -> None:
+    def build_comments_image(self, page):
         """
         Constrói a imagem dos comentários com base nos dados fornecidos.
 
         Parâmetros:
-            comments (list): Uma lista de dicionários contendo os dados dos comentários.
-            height_frame (int): A altura do frame da imagem.
-            output_count (int, opcional): O contador de saída para nomear o arquivo de imagem. O padrão é 1.
-            end (bool, opcional): Indica se é a última imagem de comentários. O padrão é False.
+            page (dict): A página do plano, com a lista de comentários ("comments"), a altura do frame
+            ("height_frame") e se é a última imagem de comentários ("end").
 
-        Esta função constrói a imagem dos comentários com base nos dados fornecidos, incluindo os comentários,
-        a altura do frame da imagem e se é a última imagem.
+        Retorna:
+            Image.Image: A imagem da página.
         """
 
-        image, draw = ImageProcessor.start_image(self.get_background(output_count))
+        image, draw = ImageProcessor.start_image(
+            page["background"], size=self.canvas_size, resample=self.resample
+        )
+
+        comments = self.program.comments
 
         # frame
-        image, frame = ImageProcessor.place_frame(image, height=height_frame)
+        image, frame = self.place_frame(image, page["height_frame"])
 
         # ellipsis continued
-        ImageProcessor.paste_image(
+        ImageProcessor.paste_layer(
             image,
-            "assets/img_elements/header_ellipsis.png",
-            y=(frame["y"] + 10),
+            self.layers["header_ellipsis"],
+            y=frame["y"] + self.px(comments["header_ellipsis_y"]),
         )
 
-        comment_bg = "assets/img_elements/comment_bg.png"
-        # comment 0
-
-        comment_start_y = frame["y"] + 80
+        comment_start_y = frame["y"] + self.px(comments["start_y"])
         acummulated_height = 0
-        padding_top = 30
-        for comment in comments:
-            comment_y = comment_start_y + acummulated_height
-            author = TextProcessor.remove_emoji(comment["author"])
-
-            headline = (
-                comment["headline"][:65] + "..."
-                if len(comment["headline"]) > 65
-                else comment["headline"]
+        padding_top = comments["gap"]
+        for comment in page["comments"]:
+            comment_y = comment_start_y + self.px(acummulated_height)
+
+            tile, background_size = self.get_comment_tile(comment)
+            ImageProcessor.paste_tile(image, tile, (self.px(comments["x"]), comment_y))
+
+            acummulated_height += background_size + padding_top
+
+        if not page["end"]:
+            ImageProcessor.paste_layer(
+                image,
+                self.layers["ellipsis_continue"],
+                y=frame["end_y"] - self.px(comments["continue_ellipsis_bottom"]),
             )
 
-            age = comment["comment_age"]
+        return image
 
-            if "default" in comment["img_filename"] or not os.path.exists(
-                f"{self.path}/{comment['img_filename']}"
-            ):
-                img_path = "assets/img_elements/default_profile_photo.png"
-            else:
-                img_path = f"{self.path}/{comment['img_filename']}"
+    def place_frame(self, image, height) -> tuple:
+        """
+        Posiciona o quadro do template, centralizado na imagem.
 
-            text = TextProcessor.break_line(comment["comment_text"], line_max=65)
+        Parâmetros:
+            image (Image.Image): A imagem da página.
+            height (int): A altura do quadro, em unidades de projeto.
 
-            n_lines = len(text.split("\n"))
-            background_size = 100 + int(32 * n_lines)
+        Retorna:
+            tuple: A imagem e o dicionário com a posição e o tamanho do quadro (ver ImageProcessor.place_frame).
+        """
+        return ImageProcessor.place_frame(
+            image,
+            height=self.px(height),
+            width=self.px(self.program.frame["width"]),
+            frame_path=self.program.elements["frame"],
+            resample=self.resample,
+        )
 
-            # bg
-            ImageProcessor.paste_image(
-                image, comment_bg, pos=(215, comment_y), size=(720, background_size)
-            )
+    @staticmethod
+    def cut_headline(headline, max_chars) -> str:
+        return headline[:max_chars] + "..." if len(headline) > max_chars else headline
 
-            # image author
-            ImageProcessor.paste_image(
-                image,
-                path=img_path,
-                pos=(135, comment_y + 10),
-                size=(65, 65),
-                rounded=True,
-            )
+    def profile_photo_path(self, img_filename) -> str:
+        """
+        Retorna o caminho da foto de perfil coletada ou, se ela não existir (ou for anônima), da foto padrão
+        do template.
+        """
+        if "default" in img_filename or not os.path.exists(f"{self.path}/{img_filename}"):
+            return self.program.elements["default_profile_photo"]
+        return f"{self.path}/{img_filename}"
 
-            # name
-            ImageProcessor.write_text(
-                draw,
-                author,
-                (230, comment_y + 10),
-                font="seguisb",
-                font_size=22,
-            )
+    def get_comment_tile(self, comment) -> tuple:
+        """
+        Retorna o bloco de um comentário (balão, foto, nome, headline, idade e texto) como um tile RGBA
+        transparente, usando o cache de tiles.
 
-            # headline
-            ImageProcessor.write_text(
-                draw,
-                text=headline,
-                pos=(230, comment_y + 40),
-                font_size=20,
-                color=(130, 130, 130),
-                font="segoeuil",
-            )
+        Parâmetros:
+            comment (dict): O comentário.
 
-            # age
-            ImageProcessor.write_text(
-                draw,
-                text=age,
-                pos=(880, comment_y + 10),
-                font_size=20,
-                color=(130, 130, 130),
+        Retorna:
+            tuple: O tile, com origem na coluna dos comentários do template, e a altura do balão em unidades
+            de projeto.
+        """
+        block = self.program.comment
+        author = comment["author"]
+        headline = self.cut_headline(comment["headline"], block["headline"]["max_chars"])
+        age = comment["comment_age"]
+        img_path = self.profile_photo_path(comment["img_filename"])
+
+        text = TextProcessor.break_line(comment["comment_text"], line_max=COMMENT_LINE_MAX)
+
+        n_lines = len(text.split("\n"))
+        background_size = block["bubble_height"] + int(block["bubble_line_height"] * n_lines)
+
+        key = TileCache.make_key(
+            "comment",
+            {
+                "author": author,
+                "headline": headline,
+                "age": age,
+                "image": [img_path, os.stat(img_path).st_mtime_ns],
+                "text": text,
+                "template": self.program.digest,
+                "scale": self.scale,
+                "resample": self.resample,
+            },
+        )
+        tile = ImageBuilder.tiles.get(key)
+        if tile is not None:
+            return tile, background_size
+
+        origin_x = self.px(self.program.comments["x"])
+        # margem abaixo do balão para as linhas que ultrapassam o fundo
+        tile, draw = ImageProcessor.new_tile(
+            (
+                self.canvas_size[0] - origin_x,
+                self.px(background_size + block["bottom_margin"]),
             )
+        )
+
+        # bg
+        ImageProcessor.paste_image(
+            tile,
+            self.program.elements["comment_bg"],
+            pos=(self.px(block["bubble_x"]) - origin_x, 0),
+            size=(self.px(block["bubble_width"]), self.px(background_size)),
+            resample=self.resample,
+            composite=True,
+        )
+
+        # image author
+        photo = block["photo"]
+        ImageProcessor.paste_image(
+            tile,
+            path=img_path,
+            pos=(0, self.px(photo["y"])),
+            size=(self.px(photo["size"]), self.px(photo["size"])),
+            rounded=True,
+            resample=self.resample,
+            composite=True,
+        )
 
-            # text
+        text_x = self.px(block["text_x"]) - origin_x
+
+        # name, headline e age
+        for value, style, x in (
+            (author, block["name"], text_x),
+            (headline, block["headline"], text_x),
+            (age, block["age"], self.px(block["age"]["x"]) - origin_x),
+        ):
             ImageProcessor.write_text(
                 draw,
-                text=text,
-                pos=(230, comment_y + 80),
-                font_size=self.text_size,
-                font=self.text_font,
-                multline=True,
-                spacing=15,
+                text=value,
+                pos=(x, self.px(style["y"])),
+                font=style["font"],
+                font_size=self.px(style["size"]),
+                color=style["color"],
             )
 
-            acummulated_height += background_size + padding_top
-
-        if not end:
-            ImageProcessor.paste_image(
-                image=image,
-                path="assets/img_elements/ellipsis_continue.png",
-                y=frame["end_y"] - 70,
-            )
-        ImageProcessor.save_image(
-            image, f"{self.output_path}/03_feed_comments_{output_count}.png"
+        # text
+        ImageProcessor.write_text(
+            draw,
+            text=text,
+            pos=(text_x, self.px(block["text"]["y"])),
+            font_size=self.px(self.text_size),
+            font=self.text_font,
+            multline=True,
+            spacing=self.px(block["text"]["spacing"]),
         )
 
+        ImageBuilder.tiles.put(key, tile)
+        return tile, background_size
+
     def place_author_header(self, image, draw, content_top_y):
         """
-        Coloca o cabeçalho do autor na imagem.
+        Coloca o cabeçalho do autor na imagem. O cabeçalho é renderizado uma vez como tile RGBA
+        (cache de tiles) e colado em cada página de texto e mídia.
 
         Parâmetros:
             image: A imagem na qual o cabeçalho será colocado.
@@ -484,68 +910,82 @@ class ImageBuilder:
         Retorna:
             image: A imagem com o cabeçalho do autor colocado.
         """
+        header = self.program.author_header
         author_name = self.data["author"]["name"]
-        author_headline = (
-            self.data["author"]["headline"][:65] + "..."
-            if len(self.data["author"]["headline"]) > 65
-            else self.data["author"]["headline"]
+        author_headline = self.cut_headline(
+            self.data["author"]["headline"], header["headline"]["max_chars"]
         )
         post_time_stamp = self.data["author"]["post_age"]
+        author_image_path = self.profile_photo_path(self.data["author"]["img_filename"])
+
+        origin_x = self.px(header["x"])
+        key = TileCache.make_key(
+            "author_header",
+            {
+                "name": author_name,
+                "headline": author_headline,
+                "age": post_time_stamp,
+                "image": [author_image_path, os.stat(author_image_path).st_mtime_ns],
+                "template": self.program.digest,
+                "scale": self.scale,
+                "resample": self.resample,
+            },
+        )
+        tile = ImageBuilder.tiles.get(key)
 
-        if "default" in self.data["author"]["img_filename"]:
-            author_image_path = "assets/img_elements/default_profile_photo.png"
-        else:
-            author_image_path = f"{self.path}/{self.data['author']['img_filename']}"
+        if tile is None:
+            tile, tile_draw = ImageProcessor.new_tile(
+                (self.canvas_size[0] - origin_x, self.px(header["height"]))
+            )
 
-        image, pos = ImageProcessor.paste_image(
-            image,
-            author_image_path,
-            pos=(135, content_top_y),
-            size=(75, 75),
-            rounded=True,
-        )
+            ImageProcessor.paste_image(
+                tile,
+                author_image_path,
+                pos=(0, 0),
+                size=(self.px(header["photo_size"]), self.px(header["photo_size"])),
+                rounded=True,
+                resample=self.resample,
+                composite=True,
+            )
 
-        draw = ImageProcessor.write_text(
-            draw, text=author_name, pos=(225, content_top_y), font="seguisb"
-        )
-        draw = ImageProcessor.write_text(
-            draw,
-            text=author_headline,
-            pos=(225, content_top_y + 30),
-            font_size=20,
-            color=(130, 130, 130),
-        )
-        draw = ImageProcessor.write_text(
-            draw,
-            text=post_time_stamp,
-            pos=(225, content_top_y + 55),
-            font_size=20,
-            color=(130, 130, 130),
-        )
+            for value, style in (
+                (author_name, header["name"]),
+                (author_headline, header["headline"]),
+                (post_time_stamp, header["age"]),
+            ):
+                ImageProcessor.write_text(
+                    tile_draw,
+                    text=value,
+                    pos=(self.px(header["text_x"]) - origin_x, self.px(style["y"])),
+                    font=style["font"],
+                    font_size=self.px(style["size"]),
+                    color=style["color"],
+                )
 
-        return image
+            ImageBuilder.tiles.put(key, tile)
+
+        ImageProcessor.paste_tile(image, tile, (origin_x, content_top_y))
 
-    background_count = 0
+        return image
 
-    def get_background(self, comments_output_count=None):
+    def get_background(self, page_number=1):
         """
         Retorna o caminho para o arquivo de imagem de fundo.
 
+        Parâmetros:
+            page_number (int, opcional): O número da página no plano (usado no modo carrossel). O padrão é 1.
+
         Retorna:
             str: O caminho para o arquivo de imagem de fundo.
         """
 
-        if self.background_carrossel:
-            if comments_output_count is not None:
-                comment_output = self.background_count + comments_output_count
-                background_path = f"assets/backgrounds/carrossel/{self.background}/{comment_output}.png"
-
-                if not os.path.exists(background_path):
-                    print("Limite de carrossel ultrapassado, preenchendo com primeira imagem")
-                    background_path = f"assets/backgrounds/carrossel/{self.background}/1.png"
-                return background_path
-            else:
-                self.background_count += 1
-            return f"assets/backgrounds/carrossel/{self.background}/{self.background_count}.png"
-        else:
+        if not self.background_carrossel:
             return f"assets/backgrounds/{self.background}.png"
+
+        if page_number > ImageProcessor.assets.carousel_length(self.background):
+            # avisa uma vez por build, não a cada página excedente de cada formato
+            if not self.carousel_warned:
+                print("Limite de carrossel ultrapassado, preenchendo com primeira imagem")
+                self.carousel_warned = True
+            page_number = 1
+        return f"assets/backgrounds/carrossel/{self.background}/{page_number}.png"
@@ -1,30 +1,75 @@
-from PIL import Image, ImageDraw, ImageFont
+import io
+import os
+
+from PIL import Image, ImageDraw, ImageOps
 from typing import Tuple
 
+from modules.image_builder.asset_cache import AssetCache
+from modules.image_builder.font_fallback import FontFallback
+from modules.image_builder.memory_budget import MemoryBudget
+from modules.scraper.output_layout import temp_path
+
 
 class ImageProcessor:
     """
     Classe para processar imagens.
     """
 
+    memory_budget = None  # MemoryBudget das decodificações de mídias do worker (None = sem limite)
+    FAST_RESAMPLE = Image.Resampling.NEAREST  # reamostragem barata usada nas prévias
+    assets = AssetCache()  # imagens de assets/ e fontes decodificadas, compartilhadas pelo processo
+    fallback = FontFallback(assets)  # cobertura das fontes e atlas de emojis coloridos
+
+    @staticmethod
+    def open_image(path) -> Image.Image:
+        """
+        Abre uma imagem. Arquivos da pasta assets/ são servidos pelo cache (somente leitura).
+
+        Parâmetros:
+            path (str): O caminho para a imagem.
+
+        Retorna:
+            Image.Image: A imagem aberta.
+        """
+        if path.startswith("assets/"):
+            return ImageProcessor.assets.get_image(path)
+        return Image.open(path)
+
     @staticmethod
-    def start_image(background_path: str) -> Tuple[Image.Image, ImageDraw.Draw]:
+    def start_image(
+        background_path: str, size=None, resample=None
+    ) -> Tuple[Image.Image, ImageDraw.Draw]:
         """
         Inicia o processamento da imagem.
 
         Argumetos:
             background_path (str): O caminho para a imagem de fundo.
+            size (tuple, opcional): O tamanho da tela. Se diferente do fundo, o fundo é redimensionado para cobrir
+            a tela e cortado no centro. Default None (tamanho do fundo).
+            resample (int, opcional): O filtro de reamostragem usado no redimensionamento. Default None (bicúbico).
 
         Retorno:
             Tuple[Image.Image, ImageDraw.Draw]: Uma tupla contendo a imagem aberta e o objeto de desenho.
         """
-        image = Image.open(background_path)
+        image = ImageProcessor.open_image(background_path)
+        if size is not None and tuple(size) != image.size:
+            image = ImageOps.fit(
+                image,
+                size,
+                method=Image.Resampling.BICUBIC if resample is None else resample,
+            )
+        else:
+            image = image.copy()
         draw = ImageDraw.Draw(image)
         return image, draw
 
     @staticmethod
     def place_frame(
-        image, height, width=860, frame_path="assets/img_elements/white_frame.png"
+        image,
+        height,
+        width=860,
+        frame_path="assets/img_elements/white_frame.png",
+        resample=None,
     ) -> Tuple[Image.Image, dict]:
         """
         Posiciona o quadro dentro de uma imagem.
@@ -34,13 +79,14 @@ class ImageProcessor:
             height (int): A altura do quadro.
             width (int, optional): A largura do quadro. Default 860.
             frame_path (str, optional): O caminho para o arquivo de imagem do quadro. Default "backgrounds/white_frame.png".
+            resample (int, optional): O filtro de reamostragem. Default None (padrão do Pillow).
 
         Retorna:
             Tuple[Image.Image, dict]: Uma tupla contendo a imagem com o quadro adicionada e um dicionário contendo informações sobre a posição e o tamanho.
         """
 
         image, frame_pos = ImageProcessor.paste_image(
-            image, frame_path, size=(width, height), center=True
+            image, frame_path, size=(width, height), center=True, resample=resample
         )
 
         frame_size = (width, height)
@@ -83,7 +129,8 @@ class ImageProcessor:
         spacing=5,
     ) -> ImageDraw.Draw:
         """
-        Escreve texto na imagem.
+        Escreve texto na imagem. Caracteres que a fonte não cobre são desenhados com a fonte de fallback
+        que os tenha, e emojis em cores (ver FontFallback).
 
         Parâmetros:
             draw (ImageDraw.Draw): O objeto de desenho da imagem.
@@ -99,19 +146,143 @@ class ImageProcessor:
             ImageDraw.Draw: O objeto de desenho atualizado com o texto adicionado.
         """
 
-        font = ImageFont.truetype(f"assets/fonts/{font}.ttf", font_size)
+        font_name = font
+        font = ImageProcessor.assets.get_font(f"assets/fonts/{font}.ttf", font_size)
 
-        if not multline:
+        if ImageProcessor.fallback.needs_fallback(text, font_name):
+            # mesma regra de espaçamento entre linhas do ImageDraw.multiline_text
+            line_spacing = draw.textbbox((0, 0), "A", font=font)[3] + (
+                spacing if multline else 4
+            )
+            for index, line in enumerate(text.split("\n")):
+                ImageProcessor.fallback.draw_line(
+                    draw,
+                    (pos[0], pos[1] + index * line_spacing),
+                    line,
+                    font_name,
+                    font_size,
+                    color,
+                )
+        elif not multline:
             draw.text(pos, text=text, font=font, fill=color)
         else:
             draw.multiline_text(pos, text=text, font=font, fill=color, spacing=spacing)
 
         return draw
 
+    @staticmethod
+    def set_memory_budget(megabytes) -> None:
+        """
+        Define o orçamento de memória, por worker, para a decodificação de mídias de conteúdo. O orçamento é
+        compartilhado pelas decodificações simultâneas do processo; se o limite não mudou, o orçamento atual
+        (com as reservas em andamento) é mantido.
+
+        Parâmetros:
+            megabytes (int | None): O limite em megabytes. None remove o limite.
+        """
+        total = int(megabytes * 1024 * 1024) if megabytes else None
+        current = ImageProcessor.memory_budget
+        if total is None:
+            ImageProcessor.memory_budget = None
+        elif current is None or current.total != total:
+            ImageProcessor.memory_budget = MemoryBudget(total)
+
+    @staticmethod
+    def fit_content_media(
+        media_size, border, frame_size, frame_pos
+    ) -> Tuple[tuple, tuple]:
+        """
+        Calcula o tamanho e a posição finais de uma mídia dentro do quadro.
+
+        Parâmetros:
+            media_size (tuple): A largura e a altura originais da mídia.
+            border (int): A largura da borda ao redor do conteúdo de mídia.
+            frame_size (tuple): A largura e a altura da área útil do quadro.
+            frame_pos (tuple): As coordenadas x e y do canto superior esquerdo da área útil.
+
+        Retorna:
+            Tuple[tuple, tuple]: O tamanho final da mídia e a posição onde ela será colada.
+        """
+        media_width, media_height = media_size
+
+        if media_width > media_height:
+            new_image_width = frame_size[0] - 2 * border
+            new_image_height = int(media_height * new_image_width / media_width)
+
+            new_image_pos = (
+                frame_pos[0] + border,
+                int((frame_pos[1]) + (frame_size[1] - new_image_height) / 2),
+            )
+        else:
+            new_image_height = frame_size[1] - 2 * border
+            new_image_width = int(media_width * new_image_height / media_height)
+
+            new_image_pos = (
+                int((frame_pos[0]) + (frame_size[0] - new_image_width) / 2),
+                frame_pos[1] + border,
+            )
+
+        return (new_image_width, new_image_height), new_image_pos
+
+    @staticmethod
+    def decode_media(source, size, resample=None) -> Image.Image:
+        """
+        Decodifica uma mídia já no tamanho mais próximo do necessário.
+
+        Para JPEG usa o modo draft (o decodificador entrega a imagem em 1/2, 1/4 ou 1/8 da resolução)
+        e, para qualquer formato, aplica reduce() antes do redimensionamento final. Com um orçamento de
+        memória (ImageProcessor.memory_budget), a decodificação reserva a sua estimativa de memória e aguarda
+        as demais decodificações do worker liberarem espaço.
+
+        Parâmetros:
+            source (Image.Image): A imagem aberta (ainda não carregada).
+            size (tuple): O tamanho final desejado.
+            resample (int, opcional): O filtro de reamostragem final. Default None (padrão do Pillow).
+
+        Retorna:
+            Image.Image: A mídia redimensionada para o tamanho desejado.
+
+        Lança MediaTooLarge se a mídia sozinha exceder o orçamento (a renderização falha em vez de omitir a mídia).
+        """
+        if source.format == "JPEG":
+            source.draft("RGB", size)
+
+        budget = ImageProcessor.memory_budget
+        if budget is None:
+            return ImageProcessor.resize_media(source, size, resample)
+
+        decoded_bytes = source.width * source.height * len(source.getbands())
+        with budget.reserve(decoded_bytes, getattr(source, "filename", "")):
+            return ImageProcessor.resize_media(source, size, resample)
+
+    @staticmethod
+    def resize_media(source, size, resample=None) -> Image.Image:
+        """
+        Carrega a mídia e a redimensiona, aplicando reduce() antes quando ela é bem maior que o destino.
+        """
+        source.load()
+
+        factor = min(source.width // size[0], source.height // size[1])
+        if factor >= 2:
+            reduced = source.reduce(factor)
+            new_image = reduced.resize(size, resample=resample)
+            reduced.close()
+        else:
+            new_image = source.resize(size, resample=resample)
+
+        return new_image
+
     @staticmethod
     def place_content_media(
-        image, path, border, frame_size, frame_pos, padding_bottom, padding_top
-    )-> Image.Image:
+        image,
+        path,
+        border,
+        frame_size,
+        frame_pos,
+        padding_bottom,
+        padding_top,
+        resample=None,
+    ) -> Image.Image:
         """
         Coloca conteúdo de mídia na imagem, realizando o redimensionamento e posicionamento condicional.
 
@@ -123,47 +294,42 @@ class ImageProcessor:
             frame_pos (tuple): Uma tupla contendo as coordenadas x e y do canto superior esquerdo do quadro.
             padding_bottom (int): O preenchimento inferior dentro do quadro.
             padding_top (int): O preenchimento superior dentro do quadro.
+            resample (int, opcional): O filtro de reamostragem. Default None (padrão do Pillow).
 
         Retorna:
             Image.Image: A imagem com o conteúdo de mídia adicionado.
         """
 
-        new_image = Image.open(path)
-
         frame_size = (frame_size[0], frame_size[1] - padding_top - padding_bottom)
         frame_pos = (frame_pos[0], frame_pos[1] + padding_top)
 
-        if new_image.width > new_image.height:
-            new_image_max_width = frame_size[0] - 2 * border
-            new_image_width = new_image_max_width
-            new_image_height = int(
-                new_image.height * new_image_max_width / new_image.width
-            )
-
-            new_image_pos = (
-                frame_pos[0] + border,
-                int((frame_pos[1]) + (frame_size[1] - new_image_height) / 2),
+        with Image.open(path) as source:
+            new_image_size, new_image_pos = ImageProcessor.fit_content_media(
+                source.size, border, frame_size, frame_pos
             )
-        else:
-            new_image_max_height = frame_size[1] - 2 * border
-            new_image_width = int(
-                new_image.width * new_image_max_height / new_image.height
-            )
-            new_image_height = new_image_max_height
-
-            new_image_pos = (
-                int((frame_pos[0]) + (frame_size[0] - new_image_width) / 2),
-                frame_pos[1] + border,
+            new_image = ImageProcessor.decode_media(
+                source, new_image_size, resample=resample
             )
 
-        new_image = new_image.resize((new_image_width, new_image_height))
-
-        image.paste(new_image, new_image_pos, mask=new_image)
+        mask = new_image if "A" in new_image.getbands() else None
+        image.paste(new_image, new_image_pos, mask=mask)
+        new_image.close()
 
         return image
 
     @staticmethod
-    def paste_image(image, path, pos=None, size=None, y=None, rounded=False, center=False)-> Tuple[Image.Image, tuple]:
+    def paste_image(
+        image,
+        path,
+        pos=None,
+        size=None,
+        y=None,
+        rounded=False,
+        center=False,
+        scale=1,
+        resample=None,
+        composite=False,
+    ) -> Tuple[Image.Image, tuple]:
         """
         Cola uma imagem na imagem principal.
 
@@ -176,15 +342,19 @@ class ImageProcessor:
             horizontalmente. Padrão None.
             rounded (bool, opcional): Indica se a imagem deve ser colada com bordas arredondadas. Padrão False.
             center (bool, opcional): Indica se a imagem deve ser colada no centro da imagem principal. Padrão False.
+            scale (float, opcional): A escala aplicada ao tamanho original quando size não é informado. Padrão 1.
+            resample (int, opcional): O filtro de reamostragem. Padrão None (padrão do Pillow).
+            composite (bool, opcional): Usa composição alfa ("over") em vez de colar com máscara; necessário ao colar
+            sobre tiles transparentes. Padrão False.
 
         Retorna:
             Tuple[Image.Image, tuple]: Uma tupla contendo a imagem principal atualizada e a posição onde a imagem foi colada.
         """
 
-        new_image = Image.open(path)
+        new_image = ImageProcessor.open_image(path)
         if not size:
-            size = (new_image.width, new_image.height)
-        new_image = new_image.resize(size)
+            size = (round(new_image.width * scale), round(new_image.height * scale))
+        new_image = new_image.resize(size, resample=resample)
 
         if center:
             pos = (
@@ -199,25 +369,116 @@ class ImageProcessor:
             mask = ImageProcessor.create_circle_mask(new_image.size)
             new_image.putalpha(mask)
 
-        image.paste(new_image, pos, mask=new_image)
+        if composite:
+            image.alpha_composite(new_image.convert("RGBA"), dest=pos)
+        else:
+            mask = new_image if "A" in new_image.getbands() else None
+            image.paste(new_image, pos, mask=mask)
 
         return image, pos
 
     @staticmethod
-    def save_image(image, path) -> int:
+    def paste_layer(image, layer, pos=None, y=None) -> tuple:
         """
-        Salva a imagem em um arquivo.
+        Cola uma camada já redimensionada (ver RenderProgram.layers), sem copiá-la.
+
+        Parâmetros:
+            image (Image.Image): A imagem principal.
+            layer (Image.Image): A camada (somente leitura).
+            pos (tuple, opcional): A posição onde a camada será colada. Padrão None.
+            y (int, opcional): A coordenada y; se informada, a camada é centralizada horizontalmente. Padrão None.
+
+        Retorna:
+            tuple: A posição onde a camada foi colada.
+        """
+        if y is not None:
+            pos = ((image.width - layer.width) // 2, y)
+
+        mask = layer if "A" in layer.getbands() else None
+        image.paste(layer, pos, mask=mask)
+        return pos
+
+    @staticmethod
+    def new_tile(size) -> Tuple[Image.Image, ImageDraw.Draw]:
+        """
+        Cria um tile RGBA transparente para renderizar um componente isolado.
+
+        Parâmetros:
+            size (tuple): A largura e a altura do tile.
+
+        Retorna:
+            Tuple[Image.Image, ImageDraw.Draw]: O tile e o objeto de desenho.
+        """
+        tile = Image.new("RGBA", size, (0, 0, 0, 0))
+        return tile, ImageDraw.Draw(tile)
+
+    @staticmethod
+    def paste_tile(image, tile, pos) -> Image.Image:
+        """
+        Compõe um tile RGBA sobre a imagem com uma única colagem alfa.
+
+        Parâmetros:
+            image (Image.Image): A imagem RGBA de destino.
+            tile (Image.Image): O tile RGBA.
+            pos (tuple): A posição do canto superior esquerdo do tile.
+
+        Retorna:
+            Image.Image: A imagem com o tile.
+        """
+        width = min(tile.width, image.width - pos[0])
+        height = min(tile.height, image.height - pos[1])
+        if width <= 0 or height <= 0:
+            return image
+
+        image.alpha_composite(tile, dest=pos, source=(0, 0, width, height))
+        return image
+
+    @staticmethod
+    def save_image(image, path, **params) -> int:
+        """
+        Salva a imagem em um arquivo. A imagem é gravada em um arquivo temporário e movida para o destino, para
+        que leitores (modo watch, servidor) nunca vejam uma página parcial.
 
         Parâmetros:
             image (Image.Image): A imagem a ser salva.
             path (str): O caminho para o arquivo de destino.
+            **params: Opções repassadas ao codificador do Pillow (ex.: quality para JPEG).
 
         Retorna:
             int: Se a imagem foi salva com sucesso.
         """
-        image.save(path)
+        if path.lower().endswith((".jpg", ".jpeg")) and image.mode != "RGB":
+            image = image.convert("RGB")
+        temp = temp_path(path)
+        try:
+            image.save(temp, **params)
+            os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
         return 1
 
+    @staticmethod
+    def encode_image(image, extension, **params) -> bytes:
+        """
+        Codifica a imagem em memória, com as mesmas regras de save_image.
+
+        Parâmetros:
+            image (Image.Image): A imagem a ser codificada.
+            extension (str): A extensão que define o formato (ex.: "png" ou "jpg").
+            **params: Opções repassadas ao codificador do Pillow (ex.: quality para JPEG).
+
+        Retorna:
+            bytes: A imagem codificada.
+        """
+        extension = extension.lower().lstrip(".")
+        if extension in ("jpg", "jpeg") and image.mode != "RGB":
+            image = image.convert("RGB")
+        image_format = "JPEG" if extension in ("jpg", "jpeg") else extension.upper()
+        buffer = io.BytesIO()
+        image.save(buffer, format=image_format, **params)
+        return buffer.getvalue()
+
 
 if __name__ == "__main__":
 
@@ -0,0 +1,86 @@
+from math import gcd
+
+
+class Layout:
+    """
+    Geometria do layout em unidades de projeto, independente da resolução.
+
+    A largura da tela tem sempre 1080 unidades; a altura acompanha a proporção do formato
+    (1080 no quadrado, 1350 no retrato 4:5, 1920 no story 9:16). As posições usadas pelo ImageBuilder
+    estão nessas unidades e são convertidas para pixels apenas na rasterização, então a paginação
+    é calculada uma vez por proporção e reaproveitada em qualquer tamanho final.
+
+    Parâmetros:
+        aspect (tuple, opcional): A proporção (largura, altura) da tela. O padrão é (1, 1).
+        line_height (int, opcional): A altura de uma linha de texto, em unidades. O padrão é 29.
+        frame_margin (int, opcional): Altura da tela não ocupada pelo quadro de mídia e comentários. O padrão é 180.
+        post_frame_margin (int, opcional): Altura da tela não ocupada pelo quadro de texto. O padrão é 116.
+        post_header_height (int, opcional): Altura do quadro de texto além das linhas. O padrão é 210.
+        continued_reserved_lines (int, opcional): Linhas a menos nas páginas de texto que não são a última.
+        O padrão é 4.
+    """
+
+    BASE_WIDTH = 1080
+
+    FORMATS = {
+        "square": (1080, 1080),
+        "portrait": (1080, 1350),
+        "story": (1080, 1920),
+    }
+
+    def __init__(
+        self,
+        aspect=(1, 1),
+        line_height=29,
+        frame_margin=180,
+        post_frame_margin=116,
+        post_header_height=210,
+        continued_reserved_lines=4,
+    ):
+        self.width = self.BASE_WIDTH
+        self.height = round(self.BASE_WIDTH * aspect[1] / aspect[0])
+        self.line_height = line_height
+
+        # quadro de mídia e de comentários: 900 unidades no formato quadrado
+        self.frame_max_height = self.height - frame_margin
+        # o quadro de texto pode avançar um pouco sobre a margem (964 unidades no quadrado)
+        self.post_frame_max_height = self.height - post_frame_margin
+
+        self.max_post_lines = (self.post_frame_max_height - post_header_height) // line_height
+        self.max_post_lines_continued = self.max_post_lines - continued_reserved_lines
+
+    @staticmethod
+    def parse_format(value) -> tuple:
+        """
+        Converte um formato ("square", "portrait", "story" ou "LARGURAxALTURA") em tamanho em pixels.
+
+        Parâmetros:
+            value (str | tuple): O nome do formato, o texto "1080x1350" ou uma tupla (largura, altura).
+
+        Retorna:
+            tuple: A largura e a altura em pixels.
+        """
+        if isinstance(value, (tuple, list)):
+            return int(value[0]), int(value[1])
+        if value in Layout.FORMATS:
+            return Layout.FORMATS[value]
+
+        width, _, height = str(value).lower().partition("x")
+        try:
+            return int(width), int(height)
+        except ValueError:
+            raise ValueError(f"Formato inválido: {value}")
+
+    @staticmethod
+    def aspect_of(size) -> tuple:
+        """
+        Retorna a proporção reduzida de um tamanho (ex.: (1080, 1350) -> (4, 5)).
+        """
+        divisor = gcd(size[0], size[1])
+        return size[0] // divisor, size[1] // divisor
+
+    def scale_for(self, size) -> float:
+        """
+        Retorna a escala de unidades de projeto para pixels em um tamanho final.
+        """
+        return size[0] / self.width
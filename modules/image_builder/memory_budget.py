@@ -0,0 +1,51 @@
+import threading
+from contextlib import contextmanager
+
+
+class MediaTooLarge(ValueError):
+    """
+    Mídia cuja decodificação sozinha excede o orçamento de memória do worker.
+    """
+
+
+class MemoryBudget:
+    """
+    Orçamento de memória compartilhado pelas decodificações de mídias de um worker de renderização: cada
+    decodificação reserva a sua estimativa de memória e espera enquanto as decodificações em andamento (outras
+    threads do processo, como no modo serve) ocupam o orçamento.
+
+    Parâmetros:
+        total (int): O orçamento, em bytes.
+    """
+
+    def __init__(self, total):
+        self.total = total
+        self.used = 0
+        self.condition = threading.Condition()
+
+    @contextmanager
+    def reserve(self, amount, name=""):
+        """
+        Reserva memória durante o bloco, aguardando até que haja espaço no orçamento.
+
+        Parâmetros:
+            amount (int): A memória estimada, em bytes.
+            name (str, opcional): O nome da mídia, usado na mensagem de erro. O padrão é "".
+
+        Lança MediaTooLarge se a estimativa sozinha for maior que o orçamento.
+        """
+        if amount > self.total:
+            raise MediaTooLarge(
+                f"Mídia {name} precisa de {amount / 1024 / 1024:.0f} MB para ser decodificada, acima do "
+                f"orçamento de {self.total / 1024 / 1024:.0f} MB (media_memory_budget_mb)"
+            )
+
+        with self.condition:
+            self.condition.wait_for(lambda: self.used + amount <= self.total)
+            self.used += amount
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.used -= amount
+                self.condition.notify_all()
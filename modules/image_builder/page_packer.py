@@ -0,0 +1,174 @@
+from typing import List, NamedTuple, Tuple
+
+PAGE_COST = 1_000_000  # cada página a mais custa mais que qualquer combinação das demais penalidades
+BREAK_COST = 1_000  # quebra desaconselhada (ex.: linha viúva ou órfã de um parágrafo)
+SHORT_PAGE_COST = 1_000  # página com menos itens que o mínimo
+
+
+class PackResult(NamedTuple):
+    """
+    Resultado do empacotamento.
+
+    Atributos:
+        pages (list): Os intervalos (início, fim) de itens de cada página, fim exclusivo.
+        cost (float): O custo total do plano (páginas, penalidades e desequilíbrio de preenchimento).
+        fill (list): A fração da capacidade ocupada em cada página.
+    """
+
+    pages: List[Tuple[int, int]]
+    cost: float
+    fill: List[float]
+
+
+def page_cost(used, capacity) -> float:
+    """
+    Custo de equilíbrio de uma página: o quadrado da fração não preenchida.
+    """
+    if used >= capacity:
+        return 0.0
+    return (1 - used / capacity) ** 2
+
+
+def pack(
+    heights,
+    capacity,
+    last_capacity=None,
+    min_items=1,
+    break_costs=None,
+    optimal=True,
+) -> PackResult:
+    """
+    Distribui itens em ordem (linhas, blocos de comentário) em páginas sem dividi-los.
+
+    No modo ótimo, usa programação dinâmica para minimizar primeiro a quantidade de páginas e depois
+    as penalidades (quebras desaconselhadas, páginas com menos de min_items) e o desequilíbrio de
+    preenchimento (soma dos quadrados do espaço livre de cada página, o que evita últimas páginas curtas).
+    No modo guloso, reproduz a paginação anterior: cada página é preenchida até a capacidade, e o
+    restante vai para a última página se couber em last_capacity.
+
+    Parâmetros:
+        heights (list): A altura de cada item.
+        capacity (float): A altura máxima de uma página que não é a última.
+        last_capacity (float, opcional): A altura máxima da última página. O padrão é capacity.
+        min_items (int, opcional): A quantidade mínima de itens por página (ex.: 2 linhas). O padrão é 1.
+        break_costs (list, opcional): A penalidade de quebrar a página antes de cada item. O padrão é None.
+        optimal (bool, opcional): Se False, usa o modo guloso. O padrão é True.
+
+    Retorna:
+        PackResult: As páginas, o custo do plano e o preenchimento de cada página.
+
+    Um item maior que a capacidade ocupa sozinho uma página.
+    """
+    if last_capacity is None:
+        last_capacity = capacity
+    n = len(heights)
+    if n == 0:
+        return PackResult([], 0.0, [])
+
+    if optimal:
+        pages = pack_optimal(heights, capacity, last_capacity, min_items, break_costs)
+    else:
+        pages = pack_greedy(heights, capacity, last_capacity)
+
+    cost = 0.0
+    fill = []
+    for index, (start, end) in enumerate(pages):
+        used = sum(heights[start:end])
+        page_capacity = last_capacity if index == len(pages) - 1 else capacity
+        fill.append(used / page_capacity)
+        cost += PAGE_COST + page_cost(used, page_capacity)
+        if end - start < min_items <= n:
+            cost += SHORT_PAGE_COST
+        if break_costs and end < n:
+            cost += break_costs[end]
+
+    return PackResult(pages, cost, fill)
+
+
+def pack_greedy(heights, capacity, last_capacity) -> list:
+    """
+    Empacotamento guloso (preenche cada página até a capacidade).
+    """
+    pages = []
+    start = 0
+    n = len(heights)
+    while start < n:
+        if sum(heights[start:]) <= last_capacity:
+            pages.append((start, n))
+            break
+
+        end = start + 1
+        used = heights[start]
+        while end < n and used + heights[end] <= capacity:
+            used += heights[end]
+            end += 1
+        pages.append((start, end))
+        start = end
+    return pages
+
+
+def pack_optimal(heights, capacity, last_capacity, min_items, break_costs) -> list:
+    """
+    Empacotamento ótimo por programação dinâmica sobre os pontos de quebra, em O(n * itens por página).
+    """
+    n = len(heights)
+    max_capacity = max(capacity, last_capacity)
+
+    # best[i]: (custo, fim da primeira página) para empacotar os itens i..n-1
+    best = [(0.0, n)] * (n + 1)
+    for start in range(n - 1, -1, -1):
+        best_cost, best_end = None, None
+        used = 0
+        for end in range(start + 1, n + 1):
+            used += heights[end - 1]
+            if used > max_capacity and end > start + 1:
+                break
+
+            last = end == n
+            page_capacity = last_capacity if last else capacity
+            if used > page_capacity and end > start + 1:
+                continue
+
+            cost = PAGE_COST + page_cost(used, page_capacity) + best[end][0]
+            if end - start < min_items <= n:
+                cost += SHORT_PAGE_COST
+            if break_costs and not last:
+                cost += break_costs[end]
+
+            if best_cost is None or cost < best_cost:
+                best_cost, best_end = cost, end
+
+        best[start] = (best_cost, best_end)
+
+    pages = []
+    start = 0
+    while start < n:
+        end = best[start][1]
+        pages.append((start, end))
+        start = end
+    return pages
+
+
+def paragraph_break_costs(paragraph_ids) -> list:
+    """
+    Penalidades de quebra para linhas de texto: quebrar antes de uma linha é desaconselhado quando
+    deixaria a primeira linha de um parágrafo sozinha no fim da página (órfã) ou a última linha sozinha
+    no início da página seguinte (viúva).
+
+    Parâmetros:
+        paragraph_ids (list): O índice do parágrafo de cada linha.
+
+    Retorna:
+        list: A penalidade de quebrar antes de cada linha.
+    """
+    n = len(paragraph_ids)
+    costs = [0] * n
+    for index in range(1, n):
+        same_paragraph = paragraph_ids[index] == paragraph_ids[index - 1]
+        if not same_paragraph:
+            continue
+        orphan = index == 1 or paragraph_ids[index - 2] != paragraph_ids[index]
+        widow = index == n - 1 or paragraph_ids[index + 1] != paragraph_ids[index]
+        if orphan or widow:
+            costs[index] = BREAK_COST
+    return costs
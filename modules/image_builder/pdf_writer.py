@@ -0,0 +1,122 @@
+import io
+import os
+import zlib
+
+
+class PdfWriter:
+    """
+    Escreve um PDF de várias páginas de forma incremental: cada página é codificada e gravada no arquivo
+    assim que é adicionada, sem manter as páginas anteriores em memória. A tabela de referências (xref)
+    e a árvore de páginas são escritas ao fechar.
+
+    Parâmetros:
+        path (str): O caminho do PDF de saída.
+        compression (str, opcional): "jpeg" (DCTDecode, com perdas) ou "flate" (FlateDecode, sem perdas). O padrão é "jpeg".
+        quality (int, opcional): A qualidade JPEG (1-95) ou o nível de compressão flate (0-9). O padrão é 85.
+    """
+
+    def __init__(self, path, compression="jpeg", quality=85):
+        if compression not in ("jpeg", "flate"):
+            raise ValueError(f"Compressão de PDF inválida: {compression}")
+
+        self.path = path
+        self.compression = compression
+        self.quality = quality
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 3  # 1: Catalog, 2: Pages
+
+        self.file = open(path + ".tmp", "wb")
+        self.file.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def write_object(self, object_id, content, stream=None) -> None:
+        """
+        Grava um objeto PDF (opcionalmente com stream) e registra seu deslocamento.
+        """
+        self.offsets[object_id] = self.file.tell()
+        self.file.write(f"{object_id} 0 obj\n".encode("ascii"))
+        self.file.write(content.encode("ascii"))
+        if stream is not None:
+            self.file.write(b"\nstream\n")
+            self.file.write(stream)
+            self.file.write(b"\nendstream")
+        self.file.write(b"\nendobj\n")
+
+    def encode_image(self, image) -> tuple:
+        """
+        Codifica a página conforme a compressão configurada.
+
+        Retorna:
+            tuple: O nome do filtro PDF e os bytes codificados.
+        """
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        if self.compression == "jpeg":
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=self.quality)
+            return "DCTDecode", buffer.getvalue()
+
+        return "FlateDecode", zlib.compress(image.tobytes(), min(self.quality, 9))
+
+    def add_page(self, image) -> None:
+        """
+        Adiciona uma página do tamanho da imagem (1 pixel = 1 ponto).
+
+        Parâmetros:
+            image (Image.Image): A imagem da página.
+        """
+        image_id, content_id, page_id = self.next_id, self.next_id + 1, self.next_id + 2
+        self.next_id += 3
+        width, height = image.size
+
+        pdf_filter, data = self.encode_image(image)
+        self.write_object(
+            image_id,
+            f"<< /Type /XObject /Subtype /Image /Width {width} /Height {height} "
+            f"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /{pdf_filter} "
+            f"/Length {len(data)} >>",
+            data,
+        )
+
+        content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode("ascii")
+        self.write_object(content_id, f"<< /Length {len(content)} >>", content)
+
+        self.write_object(
+            page_id,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /XObject << /Im0 {image_id} 0 R >> >> "
+            f"/Contents {content_id} 0 R >>",
+        )
+        self.page_ids.append(page_id)
+
+    def close(self) -> None:
+        """
+        Escreve a árvore de páginas, a tabela xref e o trailer, e move o arquivo para o destino final.
+        """
+        kids = " ".join(f"{page_id} 0 R" for page_id in self.page_ids)
+        self.write_object(
+            2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self.page_ids)} >>"
+        )
+        self.write_object(1, "<< /Type /Catalog /Pages 2 0 R >>")
+
+        xref_offset = self.file.tell()
+        self.file.write(f"xref\n0 {self.next_id}\n".encode("ascii"))
+        self.file.write(b"0000000000 65535 f \n")
+        for object_id in range(1, self.next_id):
+            self.file.write(f"{self.offsets[object_id]:010d} 00000 n \n".encode("ascii"))
+        self.file.write(
+            f"trailer\n<< /Size {self.next_id} /Root 1 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii")
+        )
+
+        self.file.close()
+        os.replace(self.path + ".tmp", self.path)
+
+    def abort(self) -> None:
+        """
+        Descarta o PDF incompleto (após uma falha na renderização): fecha o arquivo e remove o ".tmp".
+        """
+        self.file.close()
+        if os.path.exists(self.path + ".tmp"):
+            os.remove(self.path + ".tmp")
@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+import threading
+
+import yaml
+
+from modules.image_builder.image_processor import ImageProcessor
+from modules.image_builder.layout import Layout
+
+FONTS_FOLDER = "assets/fonts"
+
+# elementos sem partes variáveis, redimensionados uma vez por escala: nome -> (elemento, tamanho fixo)
+CONSTANT_LAYERS = {
+    "header_ellipsis": ("header_ellipsis", None),
+    "ellipsis_continue": ("ellipsis_continue", None),
+    "post_action_bar": ("action_bar", ("post", "action_bar")),
+    "media_action_bar": ("action_bar", None),
+    "reaction_icon": ("reaction_icon", None),
+}
+
+compiled_programs = {}  # (arquivo, template) -> (mtime do arquivo, RenderProgram)
+compiled_lock = threading.Lock()
+
+
+def merge_template(base, override, name, key_path="") -> dict:
+    """
+    Aplica as chaves de um template sobre o template base, validando nomes e tipos.
+
+    Parâmetros:
+        base (dict): O template base (já completo).
+        override (dict): As chaves do template.
+        name (str): O nome do template (usado nas mensagens de erro).
+        key_path (str, opcional): O caminho da seção atual (usado nas mensagens de erro). O padrão é "".
+
+    Retorna:
+        dict: O template completo.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        path = f"{key_path}.{key}" if key_path else key
+        if key not in base:
+            raise ValueError(f"Chave desconhecida no template {name}: {path}")
+
+        reference = base[key]
+        if isinstance(reference, dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"A chave {path} do template {name} deve ser uma seção")
+            merged[key] = merge_template(reference, value, name, path)
+        elif isinstance(reference, (int, float)) and not isinstance(value, (int, float)):
+            raise ValueError(f"A chave {path} do template {name} deve ser um número")
+        else:
+            merged[key] = value
+    return merged
+
+
+def find_keys(spec, wanted) -> list:
+    """
+    Retorna todos os valores das chaves com o nome informado, em qualquer seção do template.
+    """
+    found = []
+    for key, value in spec.items():
+        if isinstance(value, dict):
+            found += find_keys(value, wanted)
+        elif key == wanted:
+            found.append(value)
+    return found
+
+
+def freeze_colors(spec) -> dict:
+    """
+    Converte as cores do template (listas do YAML) em tuplas, o formato esperado pelo Pillow.
+    """
+    return {
+        key: freeze_colors(value)
+        if isinstance(value, dict)
+        else tuple(value)
+        if key == "color"
+        else value
+        for key, value in spec.items()
+    }
+
+
+def text_sections(spec) -> list:
+    """
+    Retorna as seções do template que descrevem um texto (com "font" e "size").
+    """
+    sections = []
+    for value in spec.values():
+        if isinstance(value, dict):
+            if "font" in value and "size" in value:
+                sections.append(value)
+            sections += text_sections(value)
+    return sections
+
+
+class RenderProgram:
+    """
+    Um template de layout compilado: todas as chaves resolvidas (herança aplicada e tipos validados),
+    caminhos de assets e fontes verificados, e os elementos constantes (reticências, barras de ação,
+    ícone de reações) pré-dimensionados por escala. O ImageBuilder executa o mesmo programa para cada
+    post do lote, apenas lendo posições e colando camadas já prontas.
+
+    Parâmetros:
+        name (str): O nome do template.
+        spec (dict): O template completo (ver templates.yaml).
+
+    Atributos:
+        digest (str): Impressão digital do template, incluída nas chaves do cache de tiles.
+    """
+
+    def __init__(self, name, spec):
+        self.name = name
+        self.spec = freeze_colors(spec)
+        self.elements = self.spec["elements"]
+        self.frame = self.spec["frame"]
+        self.text = self.spec["text"]
+        self.author_header = self.spec["author_header"]
+        self.post = self.spec["post"]
+        self.content_media = self.spec["content_media"]
+        self.comments = self.spec["comments"]
+        self.comment = self.spec["comment"]
+        self.digest = hashlib.sha1(
+            json.dumps(spec, sort_keys=True).encode("utf-8")
+        ).hexdigest()[:16]
+        self.compiled_layers = {}
+        self.lock = threading.Lock()
+        self.resolve()
+
+    def resolve(self) -> None:
+        """
+        Verifica se todos os assets e fontes do template existem.
+        """
+        for element, path in self.elements.items():
+            if not os.path.exists(path):
+                raise ValueError(f"Asset do template {self.name} não encontrado ({element}): {path}")
+
+        for font in set(find_keys(self.spec, "font")):
+            if not os.path.exists(self.font_path(font)):
+                raise ValueError(f"Fonte do template {self.name} não encontrada: {font}")
+
+    @staticmethod
+    def font_path(font) -> str:
+        return f"{FONTS_FOLDER}/{font}.ttf"
+
+    def layout(self, aspect=(1, 1)) -> Layout:
+        """
+        Retorna a geometria do layout para a proporção informada, com as margens do template.
+
+        Parâmetros:
+            aspect (tuple, opcional): A proporção (largura, altura) da tela. O padrão é (1, 1).
+
+        Retorna:
+            Layout: A geometria do layout.
+        """
+        return Layout(
+            aspect,
+            line_height=self.text["line_height"],
+            frame_margin=self.frame["margin"],
+            post_frame_margin=self.frame["post_margin"],
+            post_header_height=self.post["header_height"],
+            continued_reserved_lines=self.post["continued_reserved_lines"],
+        )
+
+    def layers(self, scale, resample=None) -> dict:
+        """
+        Retorna os elementos constantes já redimensionados para a escala, preparando-os apenas na
+        primeira vez (ou quando algum asset é modificado). As fontes do template também são carregadas
+        nos tamanhos da escala.
+
+        Parâmetros:
+            scale (float): A escala da rasterização.
+            resample (int, opcional): O filtro de reamostragem. O padrão é None (padrão do Pillow).
+
+        Retorna:
+            dict: As camadas (Image.Image) por nome, ver CONSTANT_LAYERS.
+        """
+        mtimes = tuple(
+            os.stat(self.elements[element]).st_mtime_ns
+            for element, _ in CONSTANT_LAYERS.values()
+        )
+        key = (scale, resample)
+        cached = self.compiled_layers.get(key)
+        if cached is not None and cached[0] == mtimes:
+            return cached[1]
+
+        layers = {}
+        for layer, (element, fixed_size) in CONSTANT_LAYERS.items():
+            source = ImageProcessor.open_image(self.elements[element])
+            if fixed_size:
+                section = self.spec[fixed_size[0]][fixed_size[1]]
+                size = (
+                    int(round(section["width"] * scale)),
+                    int(round(section["height"] * scale)),
+                )
+            else:
+                size = (round(source.width * scale), round(source.height * scale))
+            layers[layer] = source.resize(size, resample=resample)
+
+        for section in text_sections(self.spec):
+            ImageProcessor.assets.get_font(
+                self.font_path(section["font"]), int(round(section["size"] * scale))
+            )
+
+        with self.lock:
+            self.compiled_layers[key] = (mtimes, layers)
+        return layers
+
+
+def compile_template(name="default", path="templates.yaml") -> RenderProgram:
+    """
+    Compila um template de layout do arquivo de templates, reaproveitando a compilação enquanto o
+    arquivo não for modificado.
+
+    Parâmetros:
+        name (str, opcional): O nome do template. O padrão é "default".
+        path (str, opcional): O arquivo de templates. O padrão é "templates.yaml".
+
+    Retorna:
+        RenderProgram: O template compilado.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    key = (path, name)
+    cached = compiled_programs.get(key)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with open(path, "r", encoding="utf-8") as file:
+        templates = yaml.load(file, Loader=yaml.FullLoader) or {}
+
+    if "default" not in templates:
+        raise ValueError(f"O arquivo de templates {path} não define o template default")
+    if name not in templates:
+        raise ValueError(f"Template não encontrado em {path}: {name}")
+
+    # cadeia de herança, do template pedido até o default
+    chain = []
+    current = name
+    while current != "default":
+        if current in chain:
+            raise ValueError(f"Herança circular no template {name}")
+        chain.append(current)
+        override = templates.get(current)
+        if override is None:
+            raise ValueError(f"Template não encontrado em {path}: {current}")
+        current = override.get("extends", "default")
+
+    spec = templates["default"]
+    for current in reversed(chain):
+        override = {
+            key: value for key, value in templates[current].items() if key != "extends"
+        }
+        spec = merge_template(spec, override, current)
+
+    program = RenderProgram(name, spec)
+    with compiled_lock:
+        compiled_programs[key] = (mtime, program)
+    return program
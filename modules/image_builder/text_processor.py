@@ -1,3 +1,8 @@
+import re
+
+NON_BMP = re.compile("[\U00010000-\U0010FFFF]")
+
+
 class TextProcessor:
     """
     Classe para processamento de texto.
@@ -6,7 +11,8 @@ class TextProcessor:
     @staticmethod
     def remove_emoji(text) -> str:
         """
-        Remove emojis do texto.
+        Remove emojis (caracteres fora do BMP) do texto. A renderização não precisa mais dela, pois
+        os emojis são desenhados pelo fallback de fontes (ver FontFallback).
 
         Parâmetros:
             text (str): O texto que pode conter emojis.
@@ -14,12 +20,7 @@ class TextProcessor:
         Retorna:
             str: O texto sem emojis.
         """
-
-        clean_text = ""
-        for caractere in text:
-            if not ord(caractere) > 0xFFFF:
-                clean_text += caractere
-        return clean_text
+        return NON_BMP.sub("", text)
 
     @staticmethod
     def break_line(text, line_max=75) -> str:
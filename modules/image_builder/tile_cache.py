@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from modules.scraper.output_layout import temp_path
+
+
+class TileCache:
+    """
+    Cache de componentes já renderizados (cabeçalho do autor, blocos de comentário) como tiles RGBA
+    transparentes, indexados pelo conteúdo e pelo estilo do componente.
+
+    Os tiles ficam em memória (LRU) e, opcionalmente, em disco como PNG, para serem reaproveitados
+    entre páginas, entre renderizações com outro fundo e entre execuções.
+
+    Parâmetros:
+        max_items (int, opcional): Quantidade máxima de tiles em memória. O padrão é 256.
+        disk_path (str, opcional): Pasta para persistir os tiles. O padrão é None (somente memória).
+    """
+
+    def __init__(self, max_items=256, disk_path=None):
+        self.max_items = max_items
+        self.disk_path = disk_path
+        self.tiles = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def set_disk_path(self, disk_path) -> None:
+        """
+        Define (ou remove, com None) a pasta de persistência dos tiles.
+        """
+        self.disk_path = disk_path
+        if disk_path and not os.path.exists(disk_path):
+            os.makedirs(disk_path, exist_ok=True)
+
+    @staticmethod
+    def make_key(kind, content) -> str:
+        """
+        Gera a chave de um tile a partir do tipo de componente e de um dicionário com seu conteúdo e estilo.
+
+        Parâmetros:
+            kind (str): O tipo do componente (ex.: "author_header").
+            content (dict): Os textos, caminhos de imagem (com mtime), fontes e escala do componente.
+
+        Retorna:
+            str: A chave do tile.
+        """
+        payload = json.dumps([kind, content], sort_keys=True, ensure_ascii=False)
+        return kind + "_" + hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key) -> Image.Image:
+        """
+        Retorna o tile da chave, da memória ou do disco, ou None se não existir.
+        """
+        with self.lock:
+            tile = self.tiles.get(key)
+            if tile is not None:
+                self.tiles.move_to_end(key)
+                self.hits += 1
+                return tile
+
+        if self.disk_path:
+            tile_path = os.path.join(self.disk_path, key + ".png")
+            try:
+                with Image.open(tile_path) as source:
+                    tile = source.convert("RGBA")
+            except FileNotFoundError:
+                tile = None
+            except OSError as e:
+                # arquivo corrompido (ex.: gravado por uma versão antiga): renderiza de novo e regrava
+                print(f"Tile inválido em {tile_path}: {e}")
+                tile = None
+            if tile is not None:
+                self.store(key, tile)
+                with self.lock:
+                    self.hits += 1
+                return tile
+
+        with self.lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, tile) -> None:
+        """
+        Guarda um tile na memória e, se configurado, no disco. O arquivo é gravado em um temporário exclusivo e
+        movido para o destino, pois threads e processos compartilham a pasta e podem gravar a mesma chave ao
+        mesmo tempo. Uma falha ao gravar no disco não interrompe a renderização: o tile já está na memória.
+        """
+        self.store(key, tile)
+        if self.disk_path:
+            tile_path = os.path.join(self.disk_path, key + ".png")
+            temp = temp_path(tile_path)
+            try:
+                tile.save(temp, format="PNG", compress_level=1)
+                os.replace(temp, tile_path)
+            except OSError as e:
+                print(f"Não foi possível gravar o tile {tile_path}: {e}")
+            finally:
+                if os.path.exists(temp):
+                    os.remove(temp)
+
+    def store(self, key, tile) -> None:
+        """
+        Guarda um tile na memória, descartando os menos usados acima de max_items.
+        """
+        with self.lock:
+            self.tiles[key] = tile
+            self.tiles.move_to_end(key)
+            while len(self.tiles) > self.max_items:
+                self.tiles.popitem(last=False)
+
+    def stats(self) -> dict:
+        """
+        Retorna as estatísticas do cache.
+        """
+        with self.lock:
+            return {"tiles": len(self.tiles), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,212 @@
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# etapas medidas, na ordem do relatório
+STAGES = (
+    "navigate",  # abertura da página do post
+    "waits",  # esperas da página: estado da página (modal de login, artigo ou conteúdo indisponível); rolagem e expansão dos comentários
+    "parse",  # leitura do HTML do artigo
+    "image_fetch",  # download das fotos e mídias
+    "layout",  # plano de páginas (quebra de linhas e paginação)
+    "render",  # rasterização de cada página
+    "encode",  # codificação e gravação de cada página
+)
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(values, p) -> float:
+    """
+    Retorna o percentil p (0-100) de uma lista de valores, com interpolação linear entre as posições.
+
+    Parâmetros:
+        values (list): Os valores (não precisam estar ordenados).
+        p (float): O percentil.
+
+    Retorna:
+        float: O percentil, ou None se a lista estiver vazia.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def hit_rate(stats) -> float:
+    """
+    Retorna a taxa de acertos (0-1) de um cache a partir de suas estatísticas ("hits" e "misses"; os
+    acertos do pacote de assets, "pack_hits", também contam), ou None se não houve acessos.
+    """
+    hits = stats.get("hits", 0) + stats.get("pack_hits", 0)
+    total = hits + stats.get("misses", 0)
+    return hits / total if total else None
+
+
+class BatchMetrics:
+    """
+    Métricas de um lote de coletas e renderizações: duração de cada etapa (uma amostra por execução,
+    ex.: uma por página na renderização), posts concluídos, páginas geradas e falhas por causa.
+
+    Atributos:
+        samples (dict): As durações, em segundos, de cada etapa.
+        counters (dict): Contadores ("posts_scraped", "posts_rendered", "pages"...).
+        failures (dict): A quantidade de falhas por causa.
+    """
+
+    def __init__(self):
+        self.samples = {}
+        self.counters = {}
+        self.failures = {}
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, stage):
+        """
+        Mede a duração do bloco e a registra na etapa informada (também em caso de erro).
+
+        Parâmetros:
+            stage (str): A etapa (ver STAGES).
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def add(self, stage, seconds) -> None:
+        with self.lock:
+            self.samples.setdefault(stage, []).append(seconds)
+
+    def count(self, name, amount=1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def failure(self, cause) -> None:
+        """
+        Registra uma falha.
+
+        Parâmetros:
+            cause (str): A causa (ex.: "timeout", "unavailable", "render").
+        """
+        with self.lock:
+            self.failures[cause] = self.failures.get(cause, 0) + 1
+
+    def report(self, caches=None) -> dict:
+        """
+        Monta o relatório agregado do lote.
+
+        Parâmetros:
+            caches (dict, opcional): As estatísticas de cada cache (ex.: {"assets": AssetCache.stats()}), das quais
+            é calculada a taxa de acertos. O padrão é None.
+
+        Retorna:
+            dict: Duração do lote, posts por minuto, percentis de cada etapa (em milissegundos), contadores,
+            caches e falhas por causa.
+        """
+        elapsed = time.perf_counter() - self.started
+        with self.lock:
+            samples = {stage: list(values) for stage, values in self.samples.items()}
+            counters = dict(self.counters)
+            failures = dict(self.failures)
+
+        stages = {}
+        for stage in STAGES + tuple(sorted(set(samples) - set(STAGES))):
+            values = samples.get(stage)
+            if not values:
+                continue
+            stages[stage] = {
+                "count": len(values),
+                "total_ms": round(sum(values) * 1000, 1),
+                **{
+                    f"p{p}_ms": round(percentile(values, p) * 1000, 1)
+                    for p in PERCENTILES
+                },
+                "max_ms": round(max(values) * 1000, 1),
+            }
+
+        # coleta e renderização no mesmo lote contam cada post uma vez
+        posts = max(counters.get("posts_scraped", 0), counters.get("posts_rendered", 0))
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "elapsed_s": round(elapsed, 2),
+            "posts": posts,
+            "posts_per_minute": round(posts * 60 / elapsed, 2) if elapsed > 0 else None,
+            "pages": counters.get("pages", 0),
+            "counters": counters,
+            "stages": stages,
+            "caches": {
+                name: {**stats, "hit_rate": hit_rate(stats)}
+                for name, stats in (caches or {}).items()
+            },
+            "failures": failures,
+        }
+
+    @staticmethod
+    def format_report(report) -> str:
+        """
+        Formata o relatório como um resumo em texto.
+
+        Parâmetros:
+            report (dict): O relatório retornado por report().
+
+        Retorna:
+            str: O resumo.
+        """
+        lines = [
+            f"Lote iniciado em {report['started_at']} ({report['elapsed_s']} s)",
+            f"Posts: {report['posts']} ({report['posts_per_minute']} por minuto; "
+            f"coletados: {report['counters'].get('posts_scraped', 0)}, "
+            f"renderizados: {report['counters'].get('posts_rendered', 0)})",
+            f"Páginas: {report['pages']}",
+            "",
+            f"{'Etapa':<12} {'n':>5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total ms':>10}",
+        ]
+        for stage, values in report["stages"].items():
+            lines.append(
+                f"{stage:<12} {values['count']:>5} {values['p50_ms']:>9} "
+                f"{values['p95_ms']:>9} {values['p99_ms']:>9} {values['total_ms']:>10}"
+            )
+
+        if report["caches"]:
+            lines.append("")
+            lines.append("Caches:")
+            for name, stats in report["caches"].items():
+                rate = "-" if stats["hit_rate"] is None else f"{stats['hit_rate']:.1%}"
+                lines.append(f"      {name}: {rate} de acertos")
+
+        lines.append("")
+        lines.append("Falhas:" if report["failures"] else "Falhas: 0")
+        for cause, count in sorted(report["failures"].items()):
+            lines.append(f"      {cause}: {count}")
+        return "\n".join(lines)
+
+    def write(self, folder, caches=None) -> tuple:
+        """
+        Grava o relatório em JSON e em texto, com o horário de início do lote no nome dos arquivos.
+
+        Parâmetros:
+            folder (str): A pasta dos relatórios.
+            caches (dict, opcional): As estatísticas dos caches (ver report). O padrão é None.
+
+        Retorna:
+            tuple: O relatório (dict) e os caminhos dos arquivos JSON e texto.
+        """
+        report = self.report(caches)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        name = os.path.join(folder, self.started_at.strftime("%Y-%m-%d_%H%M%S"))
+        with open(name + ".json", "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        with open(name + ".txt", "w", encoding="utf-8") as file:
+            file.write(self.format_report(report) + "\n")
+        return report, name + ".json", name + ".txt"
@@ -0,0 +1,155 @@
+# Extração dos dados do post dentro do navegador: um único execute_script por frame retorna um objeto
+# já no formato do data.json, em vez de transferir o HTML do artigo e interpretá-lo com o BeautifulSoup.
+# Os seletores e regras de texto espelham os de LinkedinScraper.get_author/get_content/get_comments
+# (textContent equivale ao .text do BeautifulSoup), para que os dois caminhos produzam os mesmos dados.
+
+EXTRACT_POST_SCRIPT = """
+const maxComments = arguments[0];
+const lines = (element) => element.textContent.split("\\n").map((item) => item.trim()).filter(Boolean);
+const required = (parent, selector) => {
+    const element = parent.querySelector(selector);
+    if (!element) throw new Error("elemento não encontrado: " + selector);
+    return element;
+};
+
+const article = required(document, "article");
+
+const header = required(article, 'div[data-test-id="main-feed-activity-card__entity-lockup"]');
+const headerContent = lines(header);
+const author = {
+    name: required(header, '[data-tracking-control-name="public_post_feed-actor-name"]').textContent.trim(),
+    headline: headerContent[1],
+    post_age: headerContent[2],
+    img_src: required(header, "img").getAttribute("src"),
+    img_filename: "author_img.png",
+};
+
+let imgsSrc = [];
+let type = "text";
+const images = article.querySelector('[data-test-id="feed-images-content"]');
+const videos = article.querySelectorAll("video");
+if (images) {
+    imgsSrc = Array.from(images.querySelectorAll("img"), (img) => img.getAttribute("src"));
+    type = "image";
+} else if (videos.length) {
+    imgsSrc = Array.from(videos, (video) => video.getAttribute("data-poster-url"));
+    type = "video";
+}
+
+const content = {
+    text: required(article, "p.attributed-text-segment-list__content").textContent,
+    imgs_src: imgsSrc,
+    type: type,
+    reactions: lines(required(article, "div.main-feed-activity-card__social-actions")),
+    img_filenames: imgsSrc.map((_, index) => "content_img_" + index + ".png"),
+};
+
+let sections = Array.from(article.querySelectorAll("section.comment"));
+if (maxComments !== null) sections = sections.slice(0, maxComments);
+
+const comments = sections.map((comment, index) => {
+    const commentHeader = lines(required(comment, ".comment__header"));
+    const reactions = comment.querySelector('[class*="reactions-count"]');
+    const digits = reactions ? reactions.textContent.replace(/\\D/g, "") : "";
+    return {
+        author: commentHeader[0],
+        headline: commentHeader[1],
+        comment_age: commentHeader[2],
+        profile_url: required(comment, "a").getAttribute("href").split("?")[0],
+        profile_image_src: required(comment, "img").getAttribute("src"),
+        comment_text: required(comment, ".comment__text").textContent,
+        reactions: digits ? parseInt(digits, 10) : 0,
+        is_reply: comment.parentElement.closest("section.comment") !== null,
+        img_filename: "comment_profile_photo_" + index + ".png",
+    };
+});
+
+return {
+    author: author,
+    content: content,
+    comments: comments,
+    document_iframe: type === "text"
+        && article.ownerDocument.querySelector("iframe[data-id='feed-paginated-document-content']") !== null,
+};
+"""
+
+EXTRACT_CAROUSEL_SCRIPT = """
+const track = document.querySelector("div.carousel-track-container");
+if (!track) throw new Error("elemento não encontrado: div.carousel-track-container");
+return Array.from(track.querySelectorAll("img"), (img) => img.getAttribute("src"));
+"""
+
+# estado da página do post em uma única consulta: modal de login visível, aviso de conteúdo indisponível
+# visível e artigo presente (equivalentes ao element_to_be_clickable/find_element usados antes)
+PAGE_STATE_SCRIPT = """
+const visible = (selector) => {
+    const element = document.querySelector(selector);
+    return element !== null && element.getClientRects().length > 0
+        && getComputedStyle(element).visibility !== "hidden";
+};
+return {
+    sign_in_modal: visible("icon.contextual-sign-in-modal__modal-dismiss-icon"),
+    unavailable: visible("a[data-tracking-control-name='public_post_content-unavailable-join']"),
+    article: document.querySelector("article") !== null,
+};
+"""
+
+EXTRACTION_MODES = ("script", "soup", "check")
+
+
+def extract_post(driver, max_comments=None) -> tuple:
+    """
+    Extrai autor, conteúdo, reações, mídias e comentários do artigo com um único execute_script.
+
+    Parâmetros:
+        driver (WebDriver): O driver, na página do post.
+        max_comments (int, opcional): A quantidade máxima de comentários. O padrão é None (todos).
+
+    Retorna:
+        tuple: Os dados no formato do data.json e se o post tem um carrossel de documento (iframe), cujas
+        imagens são extraídas à parte, dentro do frame.
+    """
+    result = driver.execute_script(EXTRACT_POST_SCRIPT, max_comments)
+    document_iframe = result.pop("document_iframe")
+    return result, document_iframe
+
+
+def extract_carousel(driver) -> list:
+    """
+    Extrai as URLs das imagens do carrossel de documento. O driver deve estar dentro do iframe.
+
+    Retorna:
+        list: As URLs das imagens.
+    """
+    return driver.execute_script(EXTRACT_CAROUSEL_SCRIPT)
+
+
+def diff_data(expected, actual, path="") -> list:
+    """
+    Compara dois dados de post (ex.: extração pelo script e pelo BeautifulSoup).
+
+    Parâmetros:
+        expected: O valor de referência.
+        actual: O valor comparado.
+        path (str, opcional): O caminho do valor (usado no resultado). O padrão é "".
+
+    Retorna:
+        list: Os caminhos dos valores diferentes (ex.: "comments[2].headline").
+    """
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        differences = []
+        for key in sorted(set(expected) | set(actual)):
+            differences += diff_data(
+                expected.get(key), actual.get(key), f"{path}.{key}" if path else key
+            )
+        return differences
+
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [f"{path} ({len(expected)} != {len(actual)} itens)"]
+        differences = []
+        for index, (left, right) in enumerate(zip(expected, actual)):
+            differences += diff_data(left, right, f"{path}[{index}]")
+        return differences
+
+    return [] if expected == actual else [path]
@@ -0,0 +1,18 @@
+class ScrapeError(Exception):
+    """
+    Falha ao coletar um post.
+
+    Parâmetros:
+        message (str): A descrição da falha.
+        retryable (bool, opcional): Se a coleta pode ser tentada novamente (lentidão, bloqueio temporário).
+        O padrão é True.
+        timeout (bool, opcional): Se a falha foi um tempo de espera esgotado. O padrão é False.
+        cause (str, opcional): A causa, usada no relatório do lote ("unavailable", "extraction"...). O padrão é
+        "timeout" se timeout for True e "scrape" caso contrário.
+    """
+
+    def __init__(self, message, retryable=True, timeout=False, cause=None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.timeout = timeout
+        self.cause = cause or ("timeout" if timeout else "scrape")
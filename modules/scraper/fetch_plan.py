@@ -0,0 +1,80 @@
+from modules.image_builder.comment_selection import select_comments
+
+
+class FetchPlan:
+    """
+    Plano de download das imagens de um post a partir das configurações de renderização: baixa só o que
+    o ImageBuilder vai usar. Com autores anônimos, as fotos de perfil são sempre substituídas pela foto
+    padrão; e os comentários que não serão renderizados (sem texto, maiores que uma página ou fora da
+    seleção de comments_policy/comments_limit) não precisam da foto do autor.
+
+    As imagens não baixadas caem na foto padrão se o post for renderizado depois com outra configuração.
+
+    Parâmetros:
+        anonymous (bool, opcional): Se True, as fotos de perfil não são baixadas. O padrão é False.
+        comments_policy (str, opcional): A política de seleção dos comentários (ver select_comments). O padrão é "top".
+        comments_limit (int, opcional): A quantidade máxima de comentários renderizados. O padrão é None (todos).
+    """
+
+    def __init__(self, anonymous=False, comments_policy="top", comments_limit=None):
+        self.anonymous = anonymous
+        self.comments_policy = comments_policy
+        self.comments_limit = comments_limit
+
+    @staticmethod
+    def from_config(configs) -> "FetchPlan":
+        """
+        Cria o plano a partir das configurações (config.yaml), com as mesmas chaves usadas na renderização.
+        """
+        return FetchPlan(
+            anonymous=configs.get("anom_users", False),
+            comments_policy=configs.get("comments_policy", "top"),
+            comments_limit=configs.get("comments_limit"),
+        )
+
+    def images(self, data) -> tuple:
+        """
+        Lista as imagens do post que devem ser baixadas.
+
+        Parâmetros:
+            data (dict): Os dados do post.
+
+        Retorna:
+            tuple: A lista de (url, nome do arquivo) a baixar e a quantidade de imagens ignoradas (as fotos de
+            perfil genéricas, "aero-", nunca são baixadas e não entram na contagem).
+        """
+        if self.anonymous:
+            skipped = {data["author"]["img_filename"]}
+            skipped.update(comment["img_filename"] for comment in data["comments"])
+        else:
+            rendered = {
+                id(comment)
+                for comment in select_comments(
+                    data["comments"], self.comments_policy, self.comments_limit
+                )
+            }
+            skipped = {
+                comment["img_filename"]
+                for comment in data["comments"]
+                if id(comment) not in rendered
+            }
+
+        images = FetchPlan.all_images(data)
+        fetched = [image for image in images if image[1] not in skipped]
+        return fetched, len(images) - len(fetched)
+
+    @staticmethod
+    def all_images(data) -> list:
+        """
+        Lista todas as imagens do post (sem plano de renderização), como (url, nome do arquivo).
+        """
+        images = [(data["author"]["img_src"], data["author"]["img_filename"])]
+        for index, img in enumerate(data["content"]["imgs_src"]):
+            if not img or not img.startswith(("https://", "http://")):
+                continue
+            images.append((img, f"content_img_{index}.png"))
+        for comment in data["comments"]:
+            if "aero-" in comment["profile_image_src"]:
+                continue
+            images.append((comment["profile_image_src"], comment["img_filename"]))
+        return images
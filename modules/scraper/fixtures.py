@@ -0,0 +1,345 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+ORIGIN = "{{origin}}"  # substituído pelo endereço do servidor de replay
+RESOURCE_PREFIX = "/r/"  # recursos gravados: /r/<host>/<caminho>
+
+# valores de atributos HTML (src, href, srcset, style, data-*, poster...), blocos <style> e scripts da página
+ATTRIBUTE_VALUE = re.compile(r"""(=\s*)(["'])(.*?)\2""", re.DOTALL)
+STYLE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+# URLs absolutas no início do valor, após espaço ou vírgula (srcset) ou em url(...) do CSS; URLs dentro da
+# query de outra URL (ex.: "?redirect=https://...") não são reescritas
+VALUE_URL = re.compile(r"""(^|[\s,]|url\(\s*(?:["']|&quot;)?)https?://""", re.IGNORECASE)
+STYLE_URL = re.compile(r"""(url\(\s*["']?|@import\s+["'])https?://""", re.IGNORECASE)
+SCRIPT = re.compile(r"<script\b.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+
+def fixture_name(url) -> str:
+    """
+    Retorna o nome do arquivo de fixture de uma URL de post (último trecho do caminho, sem caracteres especiais).
+    """
+    path = urlsplit(url).path.rstrip("/")
+    return re.sub(r"[^a-zA-Z0-9_-]", "_", path.rsplit("/", 1)[-1] or "post")[:120]
+
+
+def offline_html(html) -> str:
+    """
+    Prepara um HTML gravado para o replay: remove os scripts (a página gravada já está expandida) e aponta
+    as URLs absolutas dos atributos (inclusive todas as candidatas de um srcset e os url(...) de um style) e
+    dos blocos <style> para o servidor de replay, para que o navegador nunca acesse a rede.
+
+    Parâmetros:
+        html (str): O HTML da página.
+
+    Retorna:
+        str: O HTML com as URLs no formato "{{origin}}/r/<host>/<caminho>".
+    """
+    def replay(match):
+        return match.group(1) + ORIGIN + RESOURCE_PREFIX
+
+    html = SCRIPT.sub("", html)
+    html = STYLE.sub(
+        lambda match: match.group(1) + STYLE_URL.sub(replay, match.group(2)) + match.group(3), html
+    )
+    return ATTRIBUTE_VALUE.sub(
+        lambda match: match.group(1)
+        + match.group(2)
+        + VALUE_URL.sub(replay, match.group(3))
+        + match.group(2),
+        html,
+    )
+
+
+def resource_key(url) -> str:
+    """
+    Chave de um recurso gravado: host, caminho e query da URL original, sem o esquema.
+    """
+    parts = urlsplit(url)
+    key = parts.netloc + unquote(parts.path)
+    if parts.query:
+        key += "?" + unquote(parts.query)
+    return key
+
+
+def sniff_content_type(body) -> str:
+    if body.startswith(b"\x89PNG"):
+        return "image/png"
+    if body.startswith(b"\xff\xd8"):
+        return "image/jpeg"
+    if body[:4] == b"RIFF" and body[8:12] == b"WEBP":
+        return "image/webp"
+    if body[:4] == b"GIF8":
+        return "image/gif"
+    return "application/octet-stream"
+
+
+class FixtureArchive:
+    """
+    Arquivo de fixture de um post (zip): o HTML da página já expandida, os documentos dos iframes
+    (carrosséis de documento) e as imagens baixadas, com um manifest.json que liga cada URL original ao
+    seu conteúdo gravado.
+    """
+
+    @staticmethod
+    def write(path, url, page_html, documents=None, resources=None) -> str:
+        """
+        Grava a fixture de um post.
+
+        Parâmetros:
+            path (str): O arquivo .zip de destino.
+            url (str): A URL do post.
+            page_html (str): O HTML da página do post.
+            documents (dict, opcional): O HTML de cada iframe, indexado pela URL do iframe. O padrão é None.
+            resources (dict, opcional): O conteúdo (bytes) de cada imagem, indexado pela URL. O padrão é None.
+
+        Retorna:
+            str: O caminho do arquivo gravado.
+        """
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        manifest = {
+            "url": url,
+            "path": urlsplit(url).path,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "documents": {},
+            "resources": {},
+        }
+
+        temp_path = path + ".tmp"
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("page.html", offline_html(page_html))
+
+            for index, (document_url, html) in enumerate((documents or {}).items()):
+                name = f"documents/{index}.html"
+                archive.writestr(name, offline_html(html))
+                manifest["documents"][resource_key(document_url)] = name
+
+            for index, (resource_url, body) in enumerate((resources or {}).items()):
+                name = f"resources/{index}"
+                archive.writestr(name, body, compress_type=zipfile.ZIP_STORED)
+                manifest["resources"][resource_key(resource_url)] = {
+                    "name": name,
+                    "content_type": sniff_content_type(body),
+                }
+
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+
+        os.replace(temp_path, path)
+        return path
+
+    @staticmethod
+    def load(path) -> dict:
+        """
+        Lê uma fixture para a memória.
+
+        Parâmetros:
+            path (str): O arquivo .zip.
+
+        Retorna:
+            dict: O manifest, com o HTML da página ("page"), dos documentos e o conteúdo dos recursos já lidos.
+        """
+        with zipfile.ZipFile(path) as archive:
+            manifest = json.loads(archive.read("manifest.json"))
+            manifest["page"] = archive.read("page.html").decode("utf-8")
+            manifest["documents"] = {
+                key: archive.read(name).decode("utf-8")
+                for key, name in manifest["documents"].items()
+            }
+            manifest["resources"] = {
+                key: (resource["content_type"], archive.read(resource["name"]))
+                for key, resource in manifest["resources"].items()
+            }
+        return manifest
+
+
+class FixtureRecorder:
+    """
+    Acumula o que o scraper leu durante a coleta de um post (HTML da página, documentos dos iframes e
+    imagens) e grava a fixture ao final.
+
+    Parâmetros:
+        folder (str): A pasta das fixtures.
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.reset()
+
+    def reset(self) -> None:
+        self.page_html = None
+        self.documents = {}
+        self.resources = {}
+
+    def add_document(self, url, html) -> None:
+        self.documents[url] = html
+
+    def add_resource(self, url, body) -> None:
+        self.resources[url] = body
+
+    def save(self, url) -> str:
+        """
+        Grava a fixture do post coletado e limpa o que foi acumulado.
+
+        Parâmetros:
+            url (str): A URL do post.
+
+        Retorna:
+            str: O caminho da fixture, ou None se o HTML da página não foi gravado.
+        """
+        if self.page_html is None:
+            return None
+        path = FixtureArchive.write(
+            os.path.join(self.folder, fixture_name(url) + ".zip"),
+            url,
+            self.page_html,
+            self.documents,
+            self.resources,
+        )
+        self.reset()
+        return path
+
+
+class ReplayServer:
+    """
+    Servidor HTTP local que substitui o LinkedIn nos benchmarks e testes do scraper: serve as páginas
+    gravadas nos mesmos caminhos do LinkedIn ("/posts/<slug>"), e os iframes e imagens em "/r/<host>/<caminho>",
+    com latência configurável. Recursos não gravados respondem 404 imediatamente, sem acessar a rede.
+
+    Parâmetros:
+        fixtures (list): Os arquivos de fixture (.zip).
+        host (str, opcional): O endereço. O padrão é "127.0.0.1".
+        port (int, opcional): A porta (0 = escolhida pelo sistema). O padrão é 0.
+        latency (float, opcional): Atraso de cada página e iframe, em milissegundos. O padrão é 0.
+        resource_latency (float, opcional): Atraso de cada imagem, em milissegundos. O padrão é 0.
+        jitter (float, opcional): Variação aleatória (uniforme, +/-) dos atrasos, em milissegundos. O padrão é 0.
+        seed (int, opcional): Semente da variação, para execuções reproduzíveis. O padrão é 0.
+    """
+
+    def __init__(
+        self,
+        fixtures,
+        host="127.0.0.1",
+        port=0,
+        latency=0,
+        resource_latency=0,
+        jitter=0,
+        seed=0,
+    ):
+        self.pages = {}
+        self.documents = {}
+        self.resources = {}
+        for path in fixtures:
+            fixture = FixtureArchive.load(path)
+            self.pages[fixture["path"].rstrip("/")] = fixture["page"]
+            self.documents.update(fixture["documents"])
+            self.resources.update(fixture["resources"])
+
+        self.latency = latency
+        self.resource_latency = resource_latency
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.requests_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def origin(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, url) -> str:
+        """
+        Retorna a URL de replay de um post gravado (mesmo caminho, no servidor local).
+        """
+        return self.origin + urlsplit(url).path
+
+    def delay(self, base) -> None:
+        if base <= 0 and self.jitter <= 0:
+            return
+        with self.random_lock:
+            offset = self.random.uniform(-self.jitter, self.jitter)
+        time.sleep(max(base + offset, 0) / 1000)
+
+    def respond(self, path) -> tuple:
+        """
+        Resolve uma requisição.
+
+        Parâmetros:
+            path (str): O caminho requisitado (com a query).
+
+        Retorna:
+            tuple: O status HTTP, o tipo de conteúdo e o corpo.
+        """
+        if path.startswith(RESOURCE_PREFIX):
+            key = unquote(path[len(RESOURCE_PREFIX):])
+            if key in self.documents:
+                self.delay(self.latency)
+                return 200, "text/html; charset=utf-8", self.render_html(self.documents[key])
+            if key in self.resources:
+                self.delay(self.resource_latency)
+                content_type, body = self.resources[key]
+                return 200, content_type, body
+            return 404, "text/plain", b"fixture not recorded"
+
+        page = self.pages.get(urlsplit(path).path.rstrip("/"))
+        if page is None:
+            return 404, "text/plain", b"fixture not recorded"
+        self.delay(self.latency)
+        return 200, "text/html; charset=utf-8", self.render_html(page)
+
+    def render_html(self, html) -> bytes:
+        return html.replace(ORIGIN, self.origin).encode("utf-8")
+
+    def handler_class(self):
+        server = self
+
+        class ReplayHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server.requests_lock:
+                    server.requests += 1
+                status, content_type, body = server.respond(self.path)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return ReplayHandler
+
+    def start(self) -> "ReplayServer":
+        """
+        Inicia o servidor em uma thread (para benchmarks no mesmo processo).
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        print(f"Replay de {len(self.pages)} posts em {self.origin}")
+        for path in self.pages:
+            print(" " * 6, self.origin + path)
+        try:
+            self.httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.httpd.server_close()
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,479 @@
+import os
+import random
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from urllib.parse import urlparse
+
+from modules.scraper.errors import ScrapeError
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    url TEXT NOT NULL,
+    host TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_run_at REAL NOT NULL,
+    lease_until REAL,
+    last_error TEXT,
+    output_path TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, next_run_at);
+CREATE INDEX IF NOT EXISTS jobs_url ON jobs (url);
+"""
+
+JOB_STATUSES = ("queued", "running", "done", "dead")
+
+
+class JobQueue:
+    """
+    Fila persistente (SQLite) de coletas. Cada URL vira um job que sobrevive a quedas do processo:
+    falhas são reagendadas com backoff exponencial e jitter, e jobs que esgotam as tentativas (ou cuja
+    falha não permite nova tentativa) vão para a lista de mortos (status "dead").
+
+    Parâmetros:
+        path (str, opcional): O arquivo do banco. O padrão é "scraped/jobs.sqlite3".
+        max_attempts (int, opcional): Tentativas antes de mover o job para os mortos. O padrão é 5.
+        base_delay (float, opcional): O atraso da primeira nova tentativa, em segundos. O padrão é 30.
+        max_delay (float, opcional): O atraso máximo entre tentativas, em segundos. O padrão é 1800.
+        lease (float, opcional): Tempo, em segundos, após o qual um job "running" sem conclusão (processo
+        encerrado no meio da coleta) volta para a fila. O padrão é 600.
+    """
+
+    def __init__(
+        self,
+        path="scraped/jobs.sqlite3",
+        max_attempts=5,
+        base_delay=30,
+        max_delay=1800,
+        lease=600,
+    ):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+
+        folder = os.path.dirname(path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder)
+
+        with closing(self.connect()) as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SCHEMA)
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Abre uma conexão com o banco (uma por operação, para uso a partir de várias threads).
+        """
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def enqueue(self, urls) -> int:
+        """
+        Adiciona URLs à fila, ignorando as que já têm um job pendente ou em execução.
+
+        Parâmetros:
+            urls (list): As URLs dos posts.
+
+        Retorna:
+            int: A quantidade de jobs criados.
+        """
+        now = time.time()
+        created = 0
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for url in urls:
+                active = connection.execute(
+                    "SELECT 1 FROM jobs WHERE url = ? AND status IN ('queued', 'running')",
+                    (url,),
+                ).fetchone()
+                if active:
+                    continue
+                connection.execute(
+                    "INSERT INTO jobs (url, host, next_run_at, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, urlparse(url).hostname or "", now, now, now),
+                )
+                created += 1
+            connection.execute("COMMIT")
+        return created
+
+    def claim(self) -> dict:
+        """
+        Reserva o próximo job vencido (ou um job "running" cujo prazo expirou).
+
+        Retorna:
+            dict: O job reservado, ou None se não houver job vencido.
+        """
+        now = time.time()
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            job = connection.execute(
+                "SELECT * FROM jobs WHERE (status = 'queued' AND next_run_at <= ?) "
+                "OR (status = 'running' AND lease_until <= ?) "
+                "ORDER BY next_run_at LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if job is not None:
+                connection.execute(
+                    "UPDATE jobs SET status = 'running', lease_until = ?, updated_at = ? WHERE id = ?",
+                    (now + self.lease, now, job["id"]),
+                )
+            connection.execute("COMMIT")
+        return dict(job) if job is not None else None
+
+    def next_due(self) -> float:
+        """
+        Retorna quantos segundos faltam para o próximo job pendente vencer, ou None se a fila estiver vazia.
+        """
+        with closing(self.connect()) as connection:
+            (next_run_at,) = connection.execute(
+                "SELECT MIN(CASE WHEN status = 'queued' THEN next_run_at ELSE lease_until END) "
+                "FROM jobs WHERE status IN ('queued', 'running')"
+            ).fetchone()
+        if next_run_at is None:
+            return None
+        return max(0.0, next_run_at - time.time())
+
+    def complete(self, job_id, output_path) -> None:
+        """
+        Marca o job como concluído.
+        """
+        with closing(self.connect()) as connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'done', output_path = ?, last_error = NULL, "
+                "attempts = attempts + 1, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (output_path, time.time(), job_id),
+            )
+
+    def backoff(self, attempts) -> float:
+        """
+        Calcula o atraso da próxima tentativa: exponencial no número de tentativas, limitado a max_delay,
+        com jitter ("equal jitter": metade fixa e metade aleatória) para não sincronizar as novas tentativas.
+
+        Parâmetros:
+            attempts (int): As tentativas já feitas.
+
+        Retorna:
+            float: O atraso em segundos.
+        """
+        delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def fail(self, job_id, error, retryable=True) -> str:
+        """
+        Registra a falha do job: reagenda com backoff ou move para os mortos.
+
+        Parâmetros:
+            job_id (int): O job.
+            error (str): A descrição da falha.
+            retryable (bool, opcional): Se a coleta pode ser tentada novamente. O padrão é True.
+
+        Retorna:
+            str: O novo status ("queued" ou "dead").
+        """
+        now = time.time()
+        with closing(self.connect()) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            (attempts,) = connection.execute(
+                "SELECT attempts + 1 FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            status = "queued" if retryable and attempts < self.max_attempts else "dead"
+            connection.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, last_error = ?, next_run_at = ?, "
+                "lease_until = NULL, updated_at = ? WHERE id = ?",
+                (status, attempts, str(error), now + self.backoff(attempts), now, job_id),
+            )
+            connection.execute("COMMIT")
+        return status
+
+    def dead_letters(self) -> list:
+        """
+        Retorna os jobs mortos (tentativas esgotadas ou falha definitiva).
+        """
+        with closing(self.connect()) as connection:
+            return [
+                dict(row)
+                for row in connection.execute(
+                    "SELECT * FROM jobs WHERE status = 'dead' ORDER BY updated_at"
+                )
+            ]
+
+    def requeue_dead(self) -> int:
+        """
+        Devolve os jobs mortos para a fila, com as tentativas zeradas.
+
+        Retorna:
+            int: A quantidade de jobs devolvidos.
+        """
+        now = time.time()
+        with closing(self.connect()) as connection:
+            return connection.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, next_run_at = ?, updated_at = ? "
+                "WHERE status = 'dead'",
+                (now, now),
+            ).rowcount
+
+    def stats(self) -> dict:
+        """
+        Retorna a quantidade de jobs por status.
+        """
+        with closing(self.connect()) as connection:
+            counts = dict(
+                connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+            )
+        return {status: counts.get(status, 0) for status in JOB_STATUSES}
+
+
+class TokenBucket:
+    """
+    Limite de taxa por balde de fichas: até `burst` coletas seguidas e, depois, `rate` por minuto.
+
+    Parâmetros:
+        rate (float): Fichas repostas por minuto.
+        burst (int, opcional): Capacidade do balde. O padrão é 1.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate / 60
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Reserva uma ficha.
+
+        Retorna:
+            float: Quantos segundos esperar antes de usar a ficha reservada (0 se disponível).
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class HostRateLimiter:
+    """
+    Um TokenBucket por host.
+
+    Parâmetros:
+        rate (float): Coletas por minuto em cada host.
+        burst (int, opcional): Coletas seguidas permitidas em cada host. O padrão é 1.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host) -> float:
+        """
+        Espera até que o host permita uma nova coleta.
+
+        Retorna:
+            float: O tempo esperado, em segundos.
+        """
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = self.buckets[host] = TokenBucket(self.rate, self.burst)
+        delay = bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class AdaptiveConcurrency:
+    """
+    Limite de coletas simultâneas com aumento aditivo e redução multiplicativa (AIMD): o limite sobe 1 a
+    cada `window` sucessos seguidos e cai pela metade quando a taxa de erros ou timeouts das últimas
+    `window` coletas passa de `threshold`.
+
+    Parâmetros:
+        minimum (int, opcional): O limite mínimo. O padrão é 1.
+        maximum (int, opcional): O limite máximo. O padrão é 4.
+        window (int, opcional): A quantidade de coletas consideradas. O padrão é 10.
+        threshold (float, opcional): A taxa de falhas que reduz o limite. O padrão é 0.2.
+    """
+
+    def __init__(self, minimum=1, maximum=4, window=10, threshold=0.2):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.threshold = threshold
+        self.limit = minimum
+        self.active = 0
+        self.results = []
+        self.streak = 0
+        self.condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Espera até haver uma vaga dentro do limite atual.
+        """
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def cancel(self) -> None:
+        """
+        Libera a vaga sem registrar resultado (nenhum job foi executado).
+        """
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def release(self, success, timeout=False) -> None:
+        """
+        Libera a vaga e ajusta o limite com o resultado da coleta.
+
+        Parâmetros:
+            success (bool): Se a coleta teve sucesso.
+            timeout (bool, opcional): Se a falha foi um tempo de espera esgotado. O padrão é False.
+        """
+        with self.condition:
+            self.active -= 1
+            self.results = (self.results + [not success or timeout])[-self.window :]
+            failure_rate = sum(self.results) / len(self.results)
+
+            if failure_rate > self.threshold and not success:
+                self.limit = max(self.minimum, self.limit // 2)
+                self.results = []
+                self.streak = 0
+            elif success:
+                self.streak += 1
+                if self.streak >= self.window:
+                    self.limit = min(self.maximum, self.limit + 1)
+                    self.streak = 0
+
+            self.condition.notify_all()
+
+
+class ScrapeRunner:
+    """
+    Executa a fila de coletas com várias threads, cada uma com seu próprio navegador, respeitando o limite
+    de taxa por host e a concorrência adaptativa.
+
+    Parâmetros:
+        queue (JobQueue): A fila de coletas.
+        scraper_factory (callable): Cria um LinkedinScraper (um por thread, criado no primeiro job da thread).
+        limiter (HostRateLimiter): O limite de taxa por host.
+        concurrency (AdaptiveConcurrency): O limite adaptativo de coletas simultâneas.
+    """
+
+    def __init__(self, queue, scraper_factory, limiter, concurrency):
+        self.queue = queue
+        self.scraper_factory = scraper_factory
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.stopping = threading.Event()
+        self.completed = []
+        self.lock = threading.Lock()
+
+    def record_failure(self, job, error, retryable=True) -> None:
+        """
+        Registra a falha de um job na fila. Se nem isso for possível (ex.: banco bloqueado), o job é retomado
+        quando a reserva expirar.
+        """
+        try:
+            status = self.queue.fail(job["id"], str(error), retryable=retryable)
+        except Exception as e:
+            print("Não foi possível registrar a falha do job", job["id"], "-", repr(e))
+            return
+        print(f"Falha ({status}):", job["url"], "-", error)
+
+    def run_job(self, scraper, job) -> None:
+        """
+        Coleta um job e registra o resultado na fila. A vaga de concorrência é sempre liberada, mesmo que a
+        espera do limite de taxa ou o registro na fila falhem.
+        """
+        success = False
+        timeout = False
+        try:
+            self.limiter.wait(job["host"])
+            output_path = scraper.scrape_data(job["url"], raise_errors=True)
+            self.queue.complete(job["id"], output_path)
+            with self.lock:
+                self.completed.append(output_path)
+            print("Coletado:", job["url"], "->", output_path)
+            success = True
+        except ScrapeError as e:
+            timeout = e.timeout
+            self.record_failure(job, e, retryable=e.retryable)
+        except Exception as e:
+            self.record_failure(job, repr(e))
+        finally:
+            self.concurrency.release(success=success, timeout=timeout)
+
+    def worker(self, until_empty) -> None:
+        """
+        Laço de uma thread: reserva jobs vencidos até a fila esvaziar (until_empty) ou até run ser interrompido.
+        """
+        scraper = None
+        try:
+            while not self.stopping.is_set():
+                self.concurrency.acquire()
+                job = self.queue.claim()
+                if job is None:
+                    self.concurrency.cancel()
+                    wait = self.queue.next_due()
+                    if wait is None and until_empty:
+                        return
+                    self.stopping.wait(min(wait if wait is not None else 5.0, 5.0))
+                    continue
+
+                if scraper is None:
+                    try:
+                        scraper = self.scraper_factory()
+                    except Exception as e:
+                        # navegador que não inicia: o job volta para a fila e a vaga é liberada
+                        self.record_failure(job, f"Falha ao iniciar o navegador: {e!r}")
+                        self.concurrency.release(success=False)
+                        continue
+                self.run_job(scraper, job)
+        finally:
+            if scraper is not None:
+                scraper.close()
+
+    def run(self, until_empty=True) -> list:
+        """
+        Executa a fila.
+
+        Parâmetros:
+            until_empty (bool, opcional): Se True, termina quando não houver jobs pendentes (inclusive os que
+            aguardam uma nova tentativa); caso contrário,
+            continua aguardando novos jobs até Ctrl+C. O padrão é True.
+
+        Retorna:
+            list: As pastas dos posts coletados.
+        """
+        threads = [
+            threading.Thread(target=self.worker, args=(until_empty,), daemon=True)
+            for _ in range(self.concurrency.maximum)
+        ]
+        for thread in threads:
+            thread.start()
+        try:
+            for thread in threads:
+                while thread.is_alive():
+                    thread.join(0.5)
+        except KeyboardInterrupt:
+            print("Encerrando após as coletas em andamento...")
+            self.stopping.set()
+            for thread in threads:
+                thread.join()
+        return self.completed
@@ -14,33 +14,36 @@ from bs4 import BeautifulSoup
 from selenium.webdriver.common.by import By
 
 # from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
 # from selenium.webdriver.remote.webdriver import WebElement
 # from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException
-from time import sleep
-import json
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementNotInteractableException, StaleElementReferenceException, WebDriverException
+from time import monotonic, perf_counter, sleep
 from datetime import datetime
 
-import shutil
-
-
-def clear_text(text) -> str:
-    """
-    Substitui caracteres não alfanuméricos em uma string por underscores e converte
-    a string para minúsculas.
-
-    Parâmetros:
-        text (str): A string que será limpa.
-
-    Retorna:
-        str: A string limpa, com caracteres não alfanuméricos substituídos por underscores
-        e convertida para minúsculas.
-    """
-    text = re.sub(r"[^a-zA-Z0-9]", "_", text.lower())
-    return text
+from modules.catalog.catalog import Catalog
+from modules.metrics.metrics import BatchMetrics
+from modules.scraper.dom_extraction import (
+    EXTRACTION_MODES,
+    PAGE_STATE_SCRIPT,
+    diff_data,
+    extract_carousel,
+    extract_post,
+)
+from modules.scraper.errors import ScrapeError
+from modules.scraper.fetch_plan import FetchPlan
+from modules.scraper.fixtures import FixtureRecorder
+from modules.scraper.markers import SCRAPE_COMPLETE, remove_marker, write_marker
+from modules.scraper.network_capture import NetworkCapture
+from modules.scraper.output_layout import (
+    POSTS_FOLDER,
+    alias_slugs,
+    atomic_write_json,
+    clear_text,
+    post_id,
+    swap_symlink,
+    temp_path,
+)
 
 
 class LinkedinScraper:
@@ -52,94 +55,233 @@ class LinkedinScraper:
         date (str): A data atual no formato 'YYYY-MM-DD'.
         base_path (str): O caminho base para salvar os dados raspados.
         output_path (str): O caminho de saída para os dados raspados.
+        network_capture (NetworkCapture): Captura das imagens pela rede do navegador, se habilitada.
+        catalog (Catalog): O catálogo SQLite atualizado a cada post salvo, se habilitado.
+        metrics (BatchMetrics): As métricas do lote (duração de cada etapa e falhas por causa).
+        recorder (FixtureRecorder): Gravação de fixtures (HTML e imagens) de cada post coletado, se habilitada.
+        allowed_hosts (tuple): Os hosts aceitos como páginas de post.
+        extraction (str): Como os dados são extraídos: "script", "soup" ou "check".
+
+        max_comments (int): A quantidade máxima de comentários extraídos (None = todos os carregados).
 
     Métodos:
         __init__(): Inicializa a instância da classe e configura os atributos necessários.
         scrape_data(url, debug=False): Realiza o scraping de dados de uma URL do LinkedIn.
     """
 
-    def __init__(self):
+    # botões "carregar mais comentários" e "ver respostas" da página pública do post
+    xpath_load_more_comments = (
+        "//button[contains(@data-tracking-control-name, 'comment') "
+        "and (contains(@data-tracking-control-name, 'load-more') "
+        "or contains(@data-tracking-control-name, 'see-more'))]"
+    )
+    xpath_close_modal = (
+        "//icon[contains(@class, 'contextual-sign-in-modal__modal-dismiss-icon')]"
+    )
+    xpath_load_replies = (
+        "//button[contains(@data-tracking-control-name, 'replies') "
+        "or contains(@class, 'show-prev-replies') "
+        "or contains(@class, 'load-more-replies')]"
+    )
+
+    def __init__(
+        self,
+        capture_network=False,
+        max_comments=None,
+        catalog_path=None,
+        metrics=None,
+        record_path=None,
+        allowed_hosts=("linkedin.com",),
+        extraction="script",
+        page_timeout=5.0,
+        fetch_plan=None,
+    ):
         """
         Inicializa a instância da classe e configura os atributos necessários.
+
+        Parâmetros:
+            capture_network (bool, optional): Se True, as imagens são gravadas a partir das respostas
+            já baixadas pela página (eventos de rede do DevTools), evitando navegar até cada imagem. Default False.
+            max_comments (int, optional): Quantidade máxima de comentários extraídos, expandindo "carregar mais
+            comentários" e as respostas até esse limite. Default None (todos).
+            catalog_path (str, optional): Arquivo do catálogo SQLite dos posts coletados. Default None (sem catálogo).
+            metrics (BatchMetrics, optional): As métricas do lote. Default None (métricas próprias do scraper).
+            record_path (str, optional): Pasta onde gravar uma fixture (.zip) de cada post coletado, para replay
+            offline com o ReplayServer. Default None (sem gravação).
+            allowed_hosts (tuple, optional): Trechos de host aceitos na URL da página do post (ex.: o endereço do
+            servidor de replay). Default ("linkedin.com",).
+            extraction (str, optional): "script" extrai os dados no navegador com um execute_script por frame
+            (BeautifulSoup apenas se o script falhar), "soup" usa somente o BeautifulSoup e "check" usa o script e
+            compara o resultado com o do BeautifulSoup, imprimindo as diferenças. Default "script".
+            page_timeout (float, optional): Tempo máximo de espera, em segundos, até a página do post mostrar o
+            artigo ou o aviso de conteúdo indisponível. Default 5.0.
+            fetch_plan (FetchPlan, optional): Plano de download das imagens conforme a configuração de renderização
+            (ex.: sem fotos de perfil com autores anônimos). Default None (todas as imagens).
         """
-        self.driver = webdriver.Chrome()
+        if capture_network:
+            self.driver = webdriver.Chrome(options=NetworkCapture.chrome_options())
+            self.network_capture = NetworkCapture(self.driver)
+            self.network_capture.enable()
+        else:
+            self.driver = webdriver.Chrome()
+            self.network_capture = None
+        self.max_comments = max_comments
+        self.catalog = Catalog(catalog_path) if catalog_path else None
+        self.metrics = metrics or BatchMetrics()
+        self.recorder = FixtureRecorder(record_path) if record_path else None
+        self.allowed_hosts = tuple(allowed_hosts)
+        if extraction not in EXTRACTION_MODES:
+            raise ValueError(
+                f"Modo de extração inválido: {extraction} (use {', '.join(EXTRACTION_MODES)})"
+            )
+        self.extraction = extraction
+        self.page_timeout = page_timeout
+        self.fetch_plan = fetch_plan
         self.date = datetime.now().strftime("%Y-%m-%d")
         self.base_path = "scraped/" + self.date
-        self.output_path = ""  
+        self.output_path = ""
+        self.last_error = None
+        self.capture_seconds = 0
 
-    def scrape_data(self, url, debug = False):
+    def scrape_data(self, url, debug = False, raise_errors = False):
         """
         Realiza o scraping de dados de uma URL do LinkedIn.
 
         Parâmetros:
             url (str): A URL da postagem no LinkedIn.
-            debug (bool, optional): Se True, salva informações coletadas também na pasta last_scraped. Default False.
+            debug (bool, optional): Se True, aponta a pasta last_scrap para o post coletado. Default False.
+            raise_errors (bool, optional): Se True, as falhas são lançadas como ScrapeError (usado pela fila de
+            coleta para decidir novas tentativas) em vez de retornar None. Default False.
 
         Retorna:
-            None: Se não foi possível obter os dados.
+            str: A pasta onde o post foi salvo, ou None se não foi possível obter os dados.
         """
-        self.driver.get(url)
-        self.close_sign_modal()
+        if self.network_capture:
+            self.network_capture.clear()
+        if self.recorder:
+            self.recorder.reset()
+        self.capture_seconds = 0
+
+        try:
+            with self.metrics.timer("navigate"):
+                self.driver.get(url)
+        except TimeoutException as e:
+            return self.scrape_failed(
+                ScrapeError(f"Tempo esgotado ao abrir a página: {e}", timeout=True),
+                raise_errors,
+            )
+
+        try:
+            with self.metrics.timer("waits"):
+                state = self.detect_page_state(self.page_timeout)
+        except WebDriverException as e:
+            return self.scrape_failed(
+                ScrapeError(f"Falha ao verificar a página: {e}"), raise_errors
+            )
 
-        if not self.verify_content():
+        if state == "timeout":
+            return self.scrape_failed(
+                ScrapeError("Tempo esgotado aguardando o artigo", timeout=True), raise_errors
+            )
+        if state != "ready":
             print("Conteúdo indisponível")
-            return None
+            return self.scrape_failed(
+                # post removido ou privado: novas tentativas só gastariam o limite de taxa
+                ScrapeError("Conteúdo indisponível", retryable=False, cause="unavailable"),
+                raise_errors,
+            )
 
         data = self.get_data()
-        if data:
-            self.save_data(data)
+        if not data:
+            return self.scrape_failed(
+                ScrapeError(
+                    f"Falha na extração dos dados: {self.last_error}",
+                    timeout=isinstance(self.last_error, TimeoutException),
+                    cause=(
+                        "timeout"
+                        if isinstance(self.last_error, TimeoutException)
+                        else "extraction"
+                    ),
+                ),
+                raise_errors,
+            )
+
+        data["url"] = url
+        self.save_data(data)
+
+        if self.recorder:
+            print("Fixture gravada em", self.recorder.save(url))
 
         if debug:
             self.debug_data()
 
-    def close_sign_modal(self):
+        self.metrics.count("posts_scraped")
+        return self.output_path
+
+    def scrape_failed(self, error, raise_errors):
         """
-        Fecha o modal de login, se estiver presente.
+        Registra a falha de uma coleta e a lança como ScrapeError se raise_errors for True.
 
         Retorna:
-            bool: True se o modal foi fechado com sucesso, False se não foi possível fechar o modal dentro do tempo limite.
+            None
         """
-        xpath_close_modal = (
-            "//icon[contains(@class, 'contextual-sign-in-modal__modal-dismiss-icon')]"
-        )
-        try:
-            WebDriverWait(self.driver, 3).until(
-                EC.element_to_be_clickable((By.XPATH, xpath_close_modal))
-            ).click()
-            return True
-        except TimeoutException:
-            return False
+        self.last_error = error
+        self.metrics.failure(error.cause)
+        if raise_errors:
+            raise error
+        return None
 
-    def verify_content(self):
+    def detect_page_state(self, timeout=5.0, interval=0.1):
         """
-        Verifica se o conteúdo na página do LinkedIn está disponível.
+        Aguarda a página do post chegar a um estado conhecido, consultando todos os estados de uma vez a cada
+        intervalo: o modal de login é fechado (sem bloquear) enquanto estiver visível, e a espera termina quando o aviso de conteúdo
+        indisponível ou o artigo estiver na página (em vez de esperar sempre pelo modal e pelo aviso).
+
+        Parâmetros:
+            timeout (float, optional): Tempo máximo de espera, em segundos. Default 5.0.
+            interval (float, optional): Intervalo entre as consultas, em segundos. Default 0.1.
 
         Retorna:
-            bool: True se o conteúdo estiver disponível, False se não estiver disponível.
+            str: "ready" (artigo disponível), "unavailable" (conteúdo indisponível ou página fora dos hosts aceitos)
+            ou "timeout".
         """
-        # 1
-        if not "linkedin.com" in self.driver.current_url:
-            return False
+        if not any(host in self.driver.current_url for host in self.allowed_hosts):
+            return "unavailable"
+
+        deadline = monotonic() + timeout
+        while True:
+            state = self.driver.execute_script(PAGE_STATE_SCRIPT)
+            if state["unavailable"]:
+                return "unavailable"
+
+            # uma tentativa por consulta, sem esperar: se o clique falhar, o modal é fechado depois
+            # (get_data tenta de novo antes de expandir os comentários)
+            if state["sign_in_modal"]:
+                self.close_sign_modal()
+            if state["article"]:
+                return "ready"
+
+            if monotonic() >= deadline:
+                return "timeout"
+            sleep(interval)
 
-        # 2
-        try:
-            self.driver.find_element(by=By.TAG_NAME, value="article")
-        except NoSuchElementException:
-            return False
+    def close_sign_modal(self):
+        """
+        Fecha o modal de login, sem esperar por ele.
 
-        # 3
+        Retorna:
+            bool: True se o modal foi fechado, False se ele não estava presente ou não pôde ser clicado.
+        """
         try:
-            xpath_content_unavailable = "//a[@data-tracking-control-name='public_post_content-unavailable-join']"
-            WebDriverWait(self.driver, 1.5).until(
-                EC.element_to_be_clickable((By.XPATH, xpath_content_unavailable))
-            )
-            return False
-        except TimeoutException:
+            self.driver.find_element(by=By.XPATH, value=self.xpath_close_modal).click()
             return True
+        except WebDriverException:
+            # inclui ElementClickInterceptedException, comum enquanto o modal está em animação
+            return False
 
     def get_data(self):
         """
-        Obtém os dados da página.
+        Obtém os dados da página, com a extração por script ou pelo BeautifulSoup (ver o parâmetro extraction).
 
         Retorna:
             dict: Um dicionário contendo os dados obtidos da página.
@@ -147,28 +289,87 @@ class LinkedinScraper:
                 Cada chave está associada aos dados relevantes obtidos da página.
                 Se ocorrer um erro durante a obtenção dos dados, retorna None.
         """
-        data = {}
+        self.last_error = None
         try:
-            for i in range(9):
-                self.driver.execute_script(f"window.scrollTo(0, {300 * i});")
-                sleep(0.5)
-
-            article_element = self.driver.find_element(by=By.TAG_NAME, value="article")
-            soup_article = BeautifulSoup(
-                article_element.get_attribute("outerHTML"), "html.parser"
-            )
-
-            data["author"] = self.get_author(soup_article)
-
-            data["content"] = self.get_content(soup_article)
+            with self.metrics.timer("waits"):
+                for i in range(9):
+                    self.driver.execute_script(f"window.scrollTo(0, {300 * i});")
+                    sleep(0.5)
 
-            data["comments"] = self.get_comments(soup_article)
+                # o modal de login pode aparecer depois do artigo: fecha antes de clicar nos comentários
+                self.close_sign_modal()
+                self.expand_comments()
+
+            if self.recorder:
+                self.recorder.page_html = self.driver.page_source
+
+            with self.metrics.timer("parse"):
+                data = None
+                if self.extraction != "soup":
+                    data = self.get_data_script()
+
+                if data is None or self.extraction == "check":
+                    soup_data = self.get_data_soup()
+                    if data is None:
+                        data = soup_data
+                    else:
+                        differences = diff_data(soup_data, data)
+                        if differences:
+                            self.metrics.count("extraction_mismatches")
+                            print("Extração por script difere do BeautifulSoup:", ", ".join(differences))
+
+            if self.network_capture:
+                # somado ao download em save_data: uma amostra de image_fetch por post
+                start = perf_counter()
+                self.network_capture.collect()
+                self.capture_seconds = perf_counter() - start
 
             return data
         except Exception as e:
             print(e)
+            self.last_error = e
             return None
 
+    def get_data_script(self):
+        """
+        Extrai os dados do artigo dentro do navegador (um execute_script na página e outro no iframe do
+        carrossel de documento, se houver), sem transferir o HTML.
+
+        Retorna:
+            dict: Os dados no formato do data.json, ou None se o script falhar (o BeautifulSoup é usado então).
+        """
+        try:
+            data, document_iframe = extract_post(self.driver, self.max_comments)
+        except WebDriverException as e:
+            print("Extração por script falhou, usando BeautifulSoup:", e)
+            return None
+
+        if document_iframe:
+            media = self.get_media_iframe(use_script=True)
+            if media is not None:
+                content = data["content"]
+                content["imgs_src"], content["type"] = media
+                content["img_filenames"] = [
+                    f"content_img_{index}.png" for index in range(len(content["imgs_src"]))
+                ]
+        return data
+
+    def get_data_soup(self):
+        """
+        Extrai os dados do artigo a partir do seu HTML, com o BeautifulSoup.
+
+        Retorna:
+            dict: Os dados no formato do data.json.
+        """
+        article_element = self.driver.find_element(by=By.TAG_NAME, value="article")
+        soup_article = BeautifulSoup(article_element.get_attribute("outerHTML"), "html.parser")
+
+        return {
+            "author": self.get_author(soup_article),
+            "content": self.get_content(soup_article),
+            "comments": self.get_comments(soup_article),
+        }
+
     def get_author(self, soup_article):
         """
         Obtém informações do autor do artigo.
@@ -304,10 +505,14 @@ class LinkedinScraper:
             print(e)
             return None
     
-    def get_media_iframe(self):
+    def get_media_iframe(self, use_script=False):
         """
         Obtém mídia do tipo iframe.
 
+        Parâmetros:
+            use_script (bool, optional): Se True, as URLs são extraídas com um execute_script dentro do frame, sem
+            transferir o HTML do iframe. Default False.
+
         Retorna:
             tuple or None: Uma tupla contendo as URLs da mídia e o tipo de mídia, se encontradas,
             caso contrário, retorna None.
@@ -315,8 +520,8 @@ class LinkedinScraper:
         try:
             xpath_iframe = "//iframe[@data-id='feed-paginated-document-content']"
             iframe = self.driver.find_element(by=By.XPATH, value=xpath_iframe)
+            iframe_src = iframe.get_attribute("src")
             self.driver.switch_to.frame(iframe)
-            iframe_html = self.driver.page_source
 
             button_next = self.driver.find_elements(
                 by=By.CLASS_NAME, value="ssplayer-carousel-panel"
@@ -334,11 +539,16 @@ class LinkedinScraper:
                 except ElementNotInteractableException:
                     break
 
-            iframe_html = self.driver.page_source
-            soup_iframe = BeautifulSoup(iframe_html, "html.parser")
-            content_img_ul = soup_iframe.find("div", class_="carousel-track-container")
-            content_carrossel_imgs = content_img_ul.find_all("img")
-            content_imgs_src = [img.get("src") for img in content_carrossel_imgs]
+            if self.recorder:
+                self.recorder.add_document(iframe_src, self.driver.page_source)
+
+            if use_script:
+                content_imgs_src = extract_carousel(self.driver)
+            else:
+                soup_iframe = BeautifulSoup(self.driver.page_source, "html.parser")
+                content_img_ul = soup_iframe.find("div", class_="carousel-track-container")
+                content_carrossel_imgs = content_img_ul.find_all("img")
+                content_imgs_src = [img.get("src") for img in content_carrossel_imgs]
             content_type = "image"
 
             print("...iframe media loaded")
@@ -350,8 +560,48 @@ class LinkedinScraper:
             print(e)
             print("...iframe media not loaded")
             return None
+        finally:
+            self.driver.switch_to.default_content()
+
+
+
+    def expand_comments(self, max_rounds=50):
+        """
+        Clica em "carregar mais comentários" e "ver respostas" até não haver mais botões ou até a página
+        ter pelo menos max_comments comentários.
+
+        Parâmetros:
+            max_rounds (int, optional): Limite de rodadas de cliques. Default 50.
 
+        Retorna:
+            int: A quantidade de comentários carregados na página.
+        """
+        count = 0
+        for _ in range(max_rounds):
+            count = len(
+                self.driver.find_elements(by=By.CSS_SELECTOR, value="section.comment")
+            )
+            if self.max_comments is not None and count >= self.max_comments:
+                break
 
+            buttons = self.driver.find_elements(
+                by=By.XPATH, value=self.xpath_load_more_comments
+            ) + self.driver.find_elements(by=By.XPATH, value=self.xpath_load_replies)
+
+            clicked = False
+            for button in buttons:
+                try:
+                    if button.is_displayed():
+                        button.click()
+                        clicked = True
+                except (ElementNotInteractableException, StaleElementReferenceException):
+                    continue
+
+            if not clicked:
+                break
+            sleep(0.5)
+
+        return count
 
     def get_comments(self, soup_article):
         """
@@ -363,10 +613,13 @@ class LinkedinScraper:
         Retorna:
             list: Uma lista de dicionários, cada um representando um comentário. Cada dicionário
                 contém informações sobre o autor do comentário, incluindo nome, headline, idade do comentário,
-                URL do perfil, URL da imagem de perfil, texto do comentário e nome do arquivo da imagem de perfil.
+                URL do perfil, URL da imagem de perfil, texto do comentário, quantidade de reações, se é uma
+                resposta e nome do arquivo da imagem de perfil.
                 Retorna uma lista vazia se não houver comentários.
         """
-        comments_element = soup_article.find_all("section", class_="comment")[:3]
+        comments_element = soup_article.find_all("section", class_="comment")
+        if self.max_comments is not None:
+            comments_element = comments_element[: self.max_comments]
 
         comments = []
         for index, comment in enumerate(comments_element):
@@ -384,6 +637,11 @@ class LinkedinScraper:
             profile_image_src = comment.find("img").get("src")
             comment_text = comment.find(class_="comment__text").text
 
+            reactions_element = comment.find(class_=re.compile("reactions-count"))
+            reactions_digits = (
+                re.sub(r"\D", "", reactions_element.text) if reactions_element else ""
+            )
+
             comments.append(
                 {
                     "author": author,
@@ -392,6 +650,8 @@ class LinkedinScraper:
                     "profile_url": profile_url,
                     "profile_image_src": profile_image_src,
                     "comment_text": comment_text,
+                    "reactions": int(reactions_digits) if reactions_digits else 0,
+                    "is_reply": comment.find_parent("section", class_="comment") is not None,
                     "img_filename": f"comment_profile_photo_{index}.png",
                 }
             )
@@ -400,7 +660,13 @@ class LinkedinScraper:
 
     def save_data(self, data):
         """
-        Salva os dados coletados em um arquivo JSON e as imagens em uma pasta.
+        Salva os dados coletados em um arquivo JSON e as imagens em uma pasta, e registra o post no catálogo.
+        O marcador de conclusão (SCRAPE_COMPLETE) é removido durante a escrita e gravado ao final, para que
+        o modo watch ignore pastas incompletas.
+
+        A pasta é "<base_path>/posts/<id do post>" (ver post_id), então posts diferentes nunca compartilham a
+        pasta; "<base_path>/<autor>/<início do texto>_<id>" é um link legível para ela. O data.json e as
+        imagens são gravados em arquivos temporários e movidos para o nome final.
 
         Parâmetros:
             data (dict): Um dicionário contendo os dados a serem salvos.
@@ -408,26 +674,36 @@ class LinkedinScraper:
         Retorna:
             None
         """
-        folder_name_author = clear_text(data["author"]["name"])
-        folder_name_post = clear_text(data["content"]["text"][:20])
-
-        self.output_path = os.path.join(
-            self.base_path, folder_name_author, folder_name_post
-        )
+        data["post_id"] = post_id(data)
+        self.output_path = os.path.join(self.base_path, POSTS_FOLDER, data["post_id"])
+        os.makedirs(self.output_path, exist_ok=True)
 
-        if not os.path.exists(self.output_path):
-            os.makedirs(self.output_path)
+        remove_marker(self.output_path, SCRAPE_COMPLETE)
 
-        with open(
-            os.path.join(self.output_path, "data.json"), "w", encoding="utf-8"
-        ) as outfile:
-            json.dump(data, outfile, ensure_ascii=False)
+        atomic_write_json(os.path.join(self.output_path, "data.json"), data)
 
+        start = perf_counter()
         self.save_images(data)
+        self.metrics.add("image_fetch", self.capture_seconds + perf_counter() - start)
+
+        folder_name_author, folder_name_post = alias_slugs(data, data["post_id"])
+        swap_symlink(
+            self.output_path, os.path.join(self.base_path, folder_name_author, folder_name_post)
+        )
+
+        if self.catalog:
+            self.catalog.add_post(self.output_path, data)
+
+        write_marker(
+            self.output_path,
+            SCRAPE_COMPLETE,
+            {"url": data.get("url"), "scraped_at": datetime.now().isoformat(timespec="seconds")},
+        )
 
     def save_images(self, data):
         """
-        Salva as imagens relacionadas aos dados coletados em uma pasta.
+        Salva as imagens relacionadas aos dados coletados em uma pasta. Com um plano de download (fetch_plan),
+        as imagens que a renderização não vai usar são ignoradas.
 
         Parâmetros:
             data (dict): Um dicionário contendo os dados que incluem informações sobre as imagens.
@@ -435,54 +711,53 @@ class LinkedinScraper:
         Retorna:
             None
         """
-        self.driver.get(data["author"]["img_src"])
-        sleep(0.5)
+        if self.fetch_plan:
+            images, skipped = self.fetch_plan.images(data)
+            self.metrics.count("images_skipped", skipped)
+        else:
+            images = FetchPlan.all_images(data)
 
-        self.driver.find_element(by=By.TAG_NAME, value="img").screenshot(
-            f"{self.output_path}/{data['author']['img_filename']}"
-        )
+        for url, filename in images:
+            self.save_image(url, f"{self.output_path}/{filename}")
 
-        for index, img in enumerate(data["content"]["imgs_src"]):
-            if "https://" not in img:
-                continue
-            sleep(0.5)
-            self.driver.get(img)
-            self.driver.find_element(by=By.TAG_NAME, value="img").screenshot(
-                f"{self.output_path}/content_img_{index}.png"
-            )
+    def save_image(self, url, path):
+        """
+        Salva uma imagem. Usa o conteúdo capturado pela rede quando disponível; caso contrário,
+        navega até a URL e salva uma captura do elemento img. A imagem é gravada em um arquivo temporário e
+        movida para o destino, para que leitores nunca vejam um arquivo parcial.
 
-        if data["comments"]:
-            for index, comment in enumerate(data["comments"]):
-                if "aero-" in comment["profile_image_src"]:
-                    continue
+        Parâmetros:
+            url (str): A URL da imagem.
+            path (str): O caminho de destino.
 
-                self.driver.get(comment["profile_image_src"])
+        Retorna:
+            None
+        """
+        temp = temp_path(path)
+        try:
+            if not (self.network_capture and self.network_capture.save(url, temp)):
+                self.driver.get(url)
                 sleep(0.5)
+                self.driver.find_element(by=By.TAG_NAME, value="img").screenshot(temp)
+            os.replace(temp, path)
+        finally:
+            if os.path.exists(temp):
+                os.remove(temp)
 
-                image_output_path = f"{self.output_path}/{comment['img_filename']}"
-
-                self.driver.find_element(by=By.TAG_NAME, value="img").screenshot(
-                    image_output_path
-                )
+        if self.recorder:
+            with open(path, "rb") as file:
+                self.recorder.add_resource(url, file.read())
 
     def debug_data(self):
         """
-        Salva os dados coletados em uma pasta de depuração para análise.
+        Aponta a pasta de depuração "last_scrap" para o último post coletado (troca atômica de link simbólico,
+        sem copiar a pasta).
 
         Retorna:
             None
         """
         print("Saving data to debugging folder...")
-
-        # copy to folder
-        input_folder = self.output_path
-        output_folder = "last_scrap"
-
-        # delete old folder
-        if os.path.exists(output_folder):
-            shutil.rmtree(output_folder, ignore_errors=True)
-
-        shutil.copytree(input_folder, output_folder)
+        swap_symlink(self.output_path, "last_scrap")
 
     def close(self):
         """
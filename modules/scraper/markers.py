@@ -0,0 +1,46 @@
+import json
+import os
+
+# gravado pelo scraper depois do data.json e das imagens; pastas sem ele ainda estão sendo escritas
+SCRAPE_COMPLETE = ".scrape_complete"
+# gravado depois da renderização, com o mtime do marcador de coleta renderizado
+RENDER_COMPLETE = ".render_complete"
+
+
+def write_marker(folder, name, content=None) -> None:
+    """
+    Grava um marcador na pasta do post de forma atômica (arquivo temporário e rename).
+
+    Parâmetros:
+        folder (str): A pasta do post.
+        name (str): O nome do marcador (SCRAPE_COMPLETE ou RENDER_COMPLETE).
+        content (dict, opcional): O conteúdo JSON do marcador. O padrão é {}.
+    """
+    path = os.path.join(folder, name)
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(content or {}, file, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+
+def read_marker(folder, name) -> dict:
+    """
+    Lê um marcador da pasta do post.
+
+    Retorna:
+        dict: O conteúdo do marcador, ou None se ele não existir ou estiver inválido.
+    """
+    try:
+        with open(os.path.join(folder, name), "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def remove_marker(folder, name) -> None:
+    """
+    Remove um marcador da pasta do post, se existir.
+    """
+    try:
+        os.remove(os.path.join(folder, name))
+    except FileNotFoundError:
+        pass
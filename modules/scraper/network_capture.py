@@ -0,0 +1,111 @@
+import base64
+import json
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+
+class NetworkCapture:
+    """
+    Captura o conteúdo das imagens baixadas pelo navegador, usando os eventos de rede do
+    Chrome DevTools Protocol (registrados nos logs de performance do ChromeDriver).
+
+    Atributos:
+        driver (WebDriver): O driver do navegador, criado com as opções de chrome_options().
+        bodies (dict): O conteúdo capturado de cada imagem, indexado pela URL.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.bodies = {}
+        self.pending = {}
+
+    @staticmethod
+    def chrome_options() -> webdriver.ChromeOptions:
+        """
+        Retorna as opções do Chrome que habilitam os logs de performance (eventos de rede).
+
+        Retorna:
+            webdriver.ChromeOptions: As opções a serem passadas para webdriver.Chrome.
+        """
+        options = webdriver.ChromeOptions()
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        return options
+
+    def enable(self) -> None:
+        """
+        Habilita o domínio Network do DevTools, com buffers suficientes para manter as imagens da página.
+        """
+        self.driver.execute_cdp_cmd(
+            "Network.enable",
+            {
+                "maxTotalBufferSize": 100 * 1024 * 1024,
+                "maxResourceBufferSize": 20 * 1024 * 1024,
+            },
+        )
+
+    def collect(self) -> int:
+        """
+        Lê os eventos de rede acumulados e guarda o conteúdo das respostas de imagem concluídas.
+        Deve ser chamado antes de navegar para outra página, enquanto o navegador ainda mantém os corpos.
+
+        Retorna:
+            int: A quantidade de imagens capturadas nesta chamada.
+        """
+        captured = 0
+        for entry in self.driver.get_log("performance"):
+            message = json.loads(entry["message"])["message"]
+            params = message.get("params", {})
+
+            if message["method"] == "Network.responseReceived":
+                response = params["response"]
+                if response.get("mimeType", "").startswith("image/"):
+                    self.pending[params["requestId"]] = response["url"]
+
+            elif message["method"] == "Network.loadingFinished":
+                url = self.pending.pop(params["requestId"], None)
+                if url is None or url in self.bodies:
+                    continue
+                try:
+                    body = self.driver.execute_cdp_cmd(
+                        "Network.getResponseBody", {"requestId": params["requestId"]}
+                    )
+                except WebDriverException:
+                    continue
+
+                # corpos em texto (ex.: SVG) não são imagens que o Pillow abre, e a conversão para bytes
+                # pode falhar: essas URLs são baixadas pelo caminho normal (save retorna False)
+                if not body["base64Encoded"]:
+                    continue
+                self.bodies[url] = base64.b64decode(body["body"])
+                captured += 1
+
+        return captured
+
+    def save(self, url, path) -> bool:
+        """
+        Grava a imagem capturada da URL no caminho informado, com os bytes originais da resposta
+        (o formato real, como JPEG, é detectado pelo conteúdo ao abrir a imagem).
+
+        Parâmetros:
+            url (str): A URL da imagem.
+            path (str): O caminho de destino.
+
+        Retorna:
+            bool: True se a imagem havia sido capturada e foi gravada, False caso contrário.
+        """
+        body = self.bodies.get(url)
+        if body is None:
+            return False
+
+        with open(path, "wb") as file:
+            file.write(body)
+        return True
+
+    def clear(self) -> None:
+        """
+        Descarta as imagens capturadas (chamado a cada nova URL de postagem).
+        """
+        self.bodies.clear()
+        self.pending.clear()
+        self.driver.get_log("performance")
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+# as pastas dos posts ficam em "<base>/posts/<id>"; "<base>/<autor>/<início do texto>_<id>" é um link para elas
+POSTS_FOLDER = "posts"
+
+# sem permissão para links simbólicos, o link vira um arquivo de texto "<link>.link.txt" com o destino
+ALIAS_SUFFIX = ".link.txt"
+
+# id numérico da atividade nas URLs de post do LinkedIn (ex.: "...-activity-7187964353617285120-ul4Q",
+# "urn:li:ugcPost:7187964353617285120")
+ACTIVITY_ID = re.compile(r"(?:activity|ugcPost|share)[-:](\d{15,})")
+
+
+def post_id(data, url=None) -> str:
+    """
+    Retorna um identificador estável do post: o id da atividade na URL do LinkedIn ou, se não houver, um hash
+    da URL (sem a query) ou do autor e do texto do post.
+
+    Parâmetros:
+        data (dict): Os dados do post.
+        url (str, opcional): A URL do post. O padrão é data["url"].
+
+    Retorna:
+        str: O identificador (só dígitos e letras minúsculas).
+    """
+    url = url or data.get("url")
+    if url:
+        match = ACTIVITY_ID.search(url)
+        if match:
+            return match.group(1)
+        parts = urlsplit(url.strip())
+        key = parts.netloc + parts.path.rstrip("/")
+    else:
+        key = data["author"]["name"] + "\n" + data["content"]["text"]
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+
+
+def clear_text(text) -> str:
+    """
+    Substitui caracteres não alfanuméricos em uma string por underscores e converte
+    a string para minúsculas.
+
+    Parâmetros:
+        text (str): A string que será limpa.
+
+    Retorna:
+        str: A string limpa, com caracteres não alfanuméricos substituídos por underscores
+        e convertida para minúsculas.
+    """
+    text = re.sub(r"[^a-zA-Z0-9]", "_", text.lower())
+    return text
+
+
+def alias_slugs(data, post_id) -> tuple:
+    """
+    Retorna os nomes do link legível do post, "<autor>/<início do texto>_<id>".
+
+    Parâmetros:
+        data (dict): Os dados do post.
+        post_id (str): O identificador do post (ver post_id).
+
+    Retorna:
+        tuple: O nome da pasta do autor e o nome do link do post.
+    """
+    return (
+        clear_text(data["author"]["name"]),
+        f"{clear_text(data['content']['text'][:20])}_{post_id[-8:]}",
+    )
+
+
+def temp_path(path) -> str:
+    """
+    Retorna um caminho temporário exclusivo na mesma pasta, mantendo a extensão (ex.: "foto.<token>.tmp.png"),
+    para gravar o arquivo e depois movê-lo com os.replace.
+    """
+    root, extension = os.path.splitext(path)
+    token = f"{os.getpid()}-{threading.get_ident()}-{uuid.uuid4().hex[:8]}"
+    return f"{root}.{token}.tmp{extension}"
+
+
+def atomic_write_json(path, data) -> None:
+    """
+    Grava um JSON de forma atômica: leitores veem o arquivo anterior ou o novo, nunca um arquivo parcial.
+
+    Parâmetros:
+        path (str): O caminho do arquivo.
+        data: O conteúdo.
+    """
+    temp = temp_path(path)
+    try:
+        with open(temp, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def swap_symlink(target, link) -> str:
+    """
+    Aponta o link para a pasta de destino de forma atômica (cria um link temporário e o move sobre o
+    anterior). O destino é gravado relativo à pasta do link. Uma pasta comum no lugar do link (formato
+    antigo de "last_scrap") é removida antes.
+
+    Sem permissão para links simbólicos (Windows sem o modo de desenvolvedor, alguns sistemas de arquivos
+    montados), cria uma junção no Windows ou, se nem isso for possível, um arquivo de texto
+    "<link>.link.txt" com o caminho do destino (ver resolve_link).
+
+    Parâmetros:
+        target (str): A pasta de destino.
+        link (str): O caminho do link.
+
+    Retorna:
+        str: "symlink", "junction" ou "alias", conforme o que foi criado.
+    """
+    folder = os.path.dirname(link)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+
+    if os.path.isdir(link) and not os.path.islink(link) and not is_junction(link):
+        shutil.rmtree(link, ignore_errors=True)
+
+    temp = temp_path(link)
+    try:
+        os.symlink(os.path.relpath(target, folder or "."), temp, target_is_directory=True)
+        os.replace(temp, link)
+    except OSError as e:
+        if os.path.lexists(temp):
+            os.remove(temp)
+        if create_junction(target, link):
+            kind = "junction"
+        else:
+            print(f"Não foi possível criar o link {link} ({e}): gravando {link}{ALIAS_SUFFIX}")
+            atomic_write_text(link + ALIAS_SUFFIX, os.path.relpath(target, folder or "."))
+            return "alias"
+    else:
+        kind = "symlink"
+
+    if os.path.exists(link + ALIAS_SUFFIX):
+        os.remove(link + ALIAS_SUFFIX)
+    return kind
+
+
+def is_junction(path) -> bool:
+    """
+    Retorna True se o caminho é uma junção do Windows (os.path.isjunction, disponível a partir do Python 3.12).
+    """
+    return getattr(os.path, "isjunction", lambda path: False)(path)
+
+
+def create_junction(target, link) -> bool:
+    """
+    Aponta o link para a pasta de destino com uma junção do Windows, que não exige permissão de links
+    simbólicos. A junção guarda o caminho absoluto do destino e não pode ser movida sobre outra, então a
+    anterior é removida antes de renomear a nova (a troca não é atômica).
+
+    Retorna:
+        bool: True se a junção foi criada, False fora do Windows ou se a criação falhar.
+    """
+    if os.name != "nt":
+        return False
+    try:
+        import _winapi
+
+        temp = temp_path(link)
+        _winapi.CreateJunction(os.path.abspath(target), temp)
+        if os.path.lexists(link):
+            # os.rmdir remove a junção (ou o link) sem apagar o conteúdo do destino
+            if is_junction(link) or os.path.isdir(link):
+                os.rmdir(link)
+            else:
+                os.remove(link)
+        os.replace(temp, link)
+    except (ImportError, OSError) as e:
+        print(f"Não foi possível criar a junção {link}: {e}")
+        return False
+    return True
+
+
+def atomic_write_text(path, text) -> None:
+    """
+    Grava um arquivo de texto de forma atômica (ver atomic_write_json).
+    """
+    temp = temp_path(path)
+    try:
+        with open(temp, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.remove(temp)
+
+
+def resolve_link(path) -> str:
+    """
+    Resolve um caminho criado por swap_symlink para a pasta real: segue o link simbólico ou o arquivo
+    "<link>.link.txt" gravado quando o sistema não permite links. Outros caminhos são retornados como estão.
+
+    Parâmetros:
+        path (str): O caminho do link.
+
+    Retorna:
+        str: O caminho da pasta de destino.
+    """
+    if os.path.islink(path):
+        return os.path.normpath(os.path.join(os.path.dirname(path), os.readlink(path)))
+    if not os.path.exists(path) and os.path.isfile(path + ALIAS_SUFFIX):
+        with open(path + ALIAS_SUFFIX, encoding="utf-8") as file:
+            return os.path.normpath(os.path.join(os.path.dirname(path), file.read().strip()))
+    return path
@@ -0,0 +1,217 @@
+import asyncio
+import base64
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import yaml
+
+from modules.image_builder.image_builder import ImageBuilder
+from modules.image_builder.image_processor import ImageProcessor
+
+
+class RenderServer:
+    """
+    Serviço local de renderização que mantém fontes, elementos de interface e configurações em memória
+    entre as requisições.
+
+    Rotas (HTTP/1.1, corpo JSON):
+        POST /render: Renderiza um post. Corpo:
+            path (str): Pasta com data.json e as imagens coletadas.
+            data (dict, opcional): Os dados do post; substitui o data.json da pasta.
+            config (dict, opcional): Chaves do config.yaml que substituem as configurações do serviço.
+            output_path (str, opcional): Pasta de saída. O padrão é "<path>/processed_images" (ou uma pasta
+            temporária se path não for informado).
+            return_images (bool, opcional): Se True, retorna também o conteúdo das páginas em base64.
+        GET /status: Retorna o tamanho da fila e as estatísticas do cache de assets.
+
+    Parâmetros:
+        config_path (str, opcional): O arquivo de configuração, recarregado quando o mtime muda. O padrão é "config.yaml".
+        workers (int, opcional): Quantidade de renderizações simultâneas. O padrão é 2.
+        queue_size (int, opcional): Tamanho máximo da fila de requisições; acima disso responde 503. O padrão é 16.
+    """
+
+    def __init__(self, config_path="config.yaml", workers=2, queue_size=16):
+        self.config_path = config_path
+        self.config = {}
+        self.config_mtime = None
+        self.workers = workers
+        self.queue_size = queue_size
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.queue = None
+
+    def load_config(self) -> dict:
+        """
+        Retorna as configurações, relendo o arquivo apenas se ele tiver sido modificado.
+
+        Retorna:
+            dict: As configurações atuais.
+        """
+        mtime = os.stat(self.config_path).st_mtime_ns
+        if mtime != self.config_mtime:
+            with open(self.config_path, "r") as file:
+                self.config = yaml.load(file, Loader=yaml.FullLoader)
+            self.config_mtime = mtime
+            ImageBuilder.configure_process(self.config)
+        return self.config
+
+    def render(self, payload) -> dict:
+        """
+        Renderiza um post (executado em uma thread do pool).
+
+        Parâmetros:
+            payload (dict): O corpo da requisição POST /render.
+
+        Retorna:
+            dict: O caminho de cada página gerada e, opcionalmente, seu conteúdo em base64.
+        """
+        configs = {**self.load_config(), **payload.get("config", {})}
+
+        path = payload.get("path")
+        if path is None and "data" not in payload:
+            raise ValueError("Informe 'path' ou 'data'")
+
+        output_path = payload.get("output_path")
+        if path is None:
+            path = output_path or tempfile.mkdtemp(prefix="postmaker_")
+
+        image_builder = ImageBuilder(
+            path=path, data=payload.get("data"), output_path=output_path
+        )
+        if image_builder.data is None:
+            raise ValueError(f"Não foi possível ler {path}/data.json")
+
+        image_builder.build(**ImageBuilder.build_options(configs))
+
+        response = {"status": "ok", "pages": image_builder.output_files}
+        if payload.get("return_images"):
+            response["images"] = {}
+            for page_path in image_builder.output_files:
+                with open(page_path, "rb") as file:
+                    response["images"][os.path.basename(page_path)] = base64.b64encode(
+                        file.read()
+                    ).decode("ascii")
+        return response
+
+    async def worker(self) -> None:
+        """
+        Consome a fila de requisições, executando cada renderização no pool de threads.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            payload, future = await self.queue.get()
+            try:
+                result = await loop.run_in_executor(self.executor, self.render, payload)
+                future.set_result((200, result))
+            except Exception as e:
+                future.set_result((500, {"status": "error", "error": str(e)}))
+            finally:
+                self.queue.task_done()
+
+    async def handle_request(self, method, route, body) -> tuple:
+        """
+        Trata uma requisição já lida.
+
+        Retorna:
+            tuple: O código de status HTTP e o corpo da resposta.
+        """
+        if method == "GET" and route == "/status":
+            return 200, {
+                "status": "ok",
+                "queue": self.queue.qsize(),
+                "queue_size": self.queue_size,
+                "workers": self.workers,
+                "cache": ImageProcessor.assets.stats(),
+                "tiles": ImageBuilder.tiles.stats(),
+            }
+
+        if method == "POST" and route == "/render":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"status": "error", "error": "JSON inválido"}
+
+            if self.queue.full():
+                return 503, {"status": "error", "error": "Fila cheia"}
+
+            future = asyncio.get_running_loop().create_future()
+            await self.queue.put((payload, future))
+            return await future
+
+        return 404, {"status": "error", "error": "Rota não encontrada"}
+
+    async def handle_connection(self, reader, writer) -> None:
+        """
+        Lê uma requisição HTTP da conexão, responde em JSON e fecha a conexão.
+        """
+        try:
+            request_line = await reader.readline()
+            method, route, _ = request_line.decode("latin-1").split(" ", 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            body = await reader.readexactly(length) if length else b""
+
+            status, response = await self.handle_request(method, route, body)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, response = 400, {"status": "error", "error": "Requisição inválida"}
+
+        content = json.dumps(response, ensure_ascii=False).encode("utf-8")
+        reasons = {
+            200: "OK",
+            400: "Bad Request",
+            404: "Not Found",
+            500: "Internal Server Error",
+            503: "Service Unavailable",
+        }
+        writer.write(
+            f"HTTP/1.1 {status} {reasons[status]}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(content)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1")
+            + content
+        )
+        await writer.drain()
+        writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix_path=None) -> None:
+        """
+        Pré-carrega os assets e atende requisições até o processo ser interrompido.
+
+        Parâmetros:
+            host (str, opcional): O endereço TCP. O padrão é "127.0.0.1".
+            port (int, opcional): A porta TCP. O padrão é 8765.
+            unix_path (str, opcional): Se informado, escuta em um Unix socket em vez de TCP.
+        """
+        self.load_config()
+        ImageProcessor.assets.warm(["assets/img_elements"])
+
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        workers = [asyncio.create_task(self.worker()) for _ in range(self.workers)]
+
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_connection, unix_path)
+            print("Servidor de renderização em", unix_path)
+        else:
+            server = await asyncio.start_server(self.handle_connection, host, port)
+            print(f"Servidor de renderização em http://{host}:{port}")
+
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in workers:
+                task.cancel()
+            self.executor.shutdown(wait=False)
+
+
+if __name__ == "__main__":
+    asyncio.run(RenderServer().serve())
@@ -0,0 +1,402 @@
+import json
+import os
+import socket
+import threading
+import uuid
+import zlib
+from multiprocessing import Process
+
+from modules.scraper.markers import (
+    RENDER_COMPLETE,
+    SCRAPE_COMPLETE,
+    read_marker,
+    write_marker,
+)
+from modules.service.watcher import init_worker, render_folder
+
+# tentativas de renderização de uma mesma coleta antes de desistir (falhas transitórias: memória, fonte
+# ausente...), com espera de retry_delay * 2^(tentativa - 1) segundos entre elas
+MAX_RENDER_ATTEMPTS = 3
+
+RENDER_LOCK = ".render_lock"
+
+
+class FolderClaims:
+    """
+    Reservas de pastas de posts em um sistema de arquivos compartilhado, sem serviço central.
+
+    Cada reserva é um arquivo de trava (RENDER_LOCK) criado na pasta do post com O_CREAT | O_EXCL, que
+    só uma máquina consegue criar. O dono renova a reserva (heartbeat) atualizando o mtime da trava; uma
+    trava sem renovação por mais de `lease` segundos pertence a um worker que morreu e pode ser retomada:
+    ela é primeiro renomeada (só um worker consegue renomeá-la) e depois recriada com O_EXCL.
+
+    O "agora" usado para comparar com o mtime das travas é o mtime de um arquivo de sonda tocado no
+    próprio volume, para que diferenças de relógio entre as máquinas não afetem a expiração.
+
+    Parâmetros:
+        worker_id (str): Identificador do worker (gravado na trava).
+        root (str, opcional): A pasta compartilhada onde fica o arquivo de sonda. O padrão é "scraped".
+        lease (float, opcional): Prazo da reserva sem heartbeat, em segundos. O padrão é 60.
+    """
+
+    def __init__(self, worker_id, root="scraped", lease=60):
+        self.worker_id = worker_id
+        self.probe = os.path.join(root, f".clock_{worker_id}")
+        self.lease = lease
+        self.held = {}  # pasta -> token da trava
+        self.lost = set()  # pastas cuja reserva foi retomada por outro worker
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def lock_path(folder) -> str:
+        return os.path.join(folder, RENDER_LOCK)
+
+    def volume_now(self) -> float:
+        """
+        Retorna o instante atual segundo o volume compartilhado (mtime do arquivo de sonda).
+        """
+        with open(self.probe, "a"):
+            pass
+        os.utime(self.probe, None)
+        return os.stat(self.probe).st_mtime
+
+    def close(self) -> None:
+        """
+        Libera todas as reservas deste worker e remove o arquivo de sonda.
+        """
+        for folder in list(self.held):
+            self.release(folder)
+        try:
+            os.remove(self.probe)
+        except FileNotFoundError:
+            pass
+
+    def read_token(self, path) -> str:
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                return json.load(file).get("token")
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self, folder) -> bool:
+        """
+        Tenta reservar a pasta, retomando uma trava expirada se necessário.
+
+        Parâmetros:
+            folder (str): A pasta do post.
+
+        Retorna:
+            bool: True se a reserva foi obtida.
+        """
+        path = self.lock_path(folder)
+        token = uuid.uuid4().hex
+        for _ in range(2):
+            try:
+                descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self.reclaim(folder):
+                    return False
+                continue
+
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "token": token,
+                        "worker": self.worker_id,
+                        "host": socket.gethostname(),
+                        "pid": os.getpid(),
+                    },
+                    file,
+                )
+            with self.lock:
+                self.held[folder] = token
+                self.lost.discard(folder)
+            return True
+        return False
+
+    def reclaim(self, folder) -> bool:
+        """
+        Remove a trava da pasta se ela estiver expirada.
+
+        Retorna:
+            bool: True se a trava expirada foi removida (a reserva pode ser tentada de novo).
+        """
+        path = self.lock_path(folder)
+        try:
+            if self.volume_now() - os.stat(path).st_mtime < self.lease:
+                return False
+        except FileNotFoundError:
+            return True
+
+        stale_token = self.read_token(path)
+        stale_path = f"{path}.{self.worker_id}.stale"
+        try:
+            os.rename(path, stale_path)
+        except FileNotFoundError:
+            return True  # outro worker retomou antes
+
+        if self.read_token(stale_path) != stale_token:
+            # entre a leitura e o rename outro worker retomou e criou uma trava nova: devolve-a
+            try:
+                os.link(stale_path, path)
+            except FileExistsError:
+                pass
+            os.remove(stale_path)
+            return False
+
+        os.remove(stale_path)
+        print(f"Reserva expirada retomada: {folder}")
+        return True
+
+    def owns(self, folder) -> bool:
+        """
+        Indica se a trava da pasta ainda é deste worker.
+        """
+        with self.lock:
+            token = self.held.get(folder)
+        return token is not None and self.read_token(self.lock_path(folder)) == token
+
+    def heartbeat(self) -> None:
+        """
+        Renova todas as reservas deste worker; reservas perdidas são registradas em self.lost.
+        """
+        with self.lock:
+            held = list(self.held)
+        for folder in held:
+            if self.owns(folder):
+                try:
+                    os.utime(self.lock_path(folder), None)
+                    continue
+                except FileNotFoundError:
+                    pass
+            with self.lock:
+                self.held.pop(folder, None)
+                self.lost.add(folder)
+
+    def release(self, folder) -> None:
+        """
+        Libera a reserva da pasta, se ainda for deste worker.
+        """
+        if self.owns(folder):
+            try:
+                os.remove(self.lock_path(folder))
+            except FileNotFoundError:
+                pass
+        with self.lock:
+            self.held.pop(folder, None)
+
+
+class ShardWorker:
+    """
+    Worker de renderização distribuída: várias máquinas (ou processos) que montam o mesmo `scraped/`
+    dividem as pastas pendentes reservando-as com FolderClaims, sem coordenador central.
+
+    Parâmetros:
+        root (str, opcional): A pasta dos posts coletados. O padrão é "scraped".
+        config_path (str, opcional): O arquivo de configuração. O padrão é "config.yaml".
+        lease (float, opcional): Prazo da reserva sem heartbeat, em segundos. O padrão é 60.
+        include_unmarked (bool, opcional): Se True, renderiza também pastas sem o marcador de conclusão
+        (coletas anteriores a ele), usando o mtime do data.json. O padrão é False.
+        worker_id (str, opcional): Identificador do worker. O padrão é "<host>-<pid>".
+        max_attempts (int, opcional): Tentativas de renderização de uma coleta com falha. O padrão é 3.
+        retry_delay (float, opcional): Espera antes da segunda tentativa, em segundos (dobra a cada falha). O
+        padrão é 60.
+    """
+
+    def __init__(
+        self,
+        root="scraped",
+        config_path="config.yaml",
+        lease=60,
+        include_unmarked=False,
+        worker_id=None,
+        max_attempts=MAX_RENDER_ATTEMPTS,
+        retry_delay=60,
+    ):
+        self.root = root
+        self.config_path = config_path
+        self.include_unmarked = include_unmarked
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.claims = FolderClaims(self.worker_id, root=root, lease=lease)
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stopping = threading.Event()
+        self.rendered = 0
+
+    def scrape_version(self, folder, filenames) -> int:
+        """
+        Retorna a versão da coleta da pasta (mtime do marcador de conclusão), ou None se ela não estiver pronta.
+        """
+        if SCRAPE_COMPLETE in filenames:
+            name = SCRAPE_COMPLETE
+        elif self.include_unmarked:
+            name = "data.json"
+        else:
+            return None
+        try:
+            return os.stat(os.path.join(folder, name)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def settled(self, marker, version, now) -> bool:
+        """
+        Indica se a coleta não precisa (ou não deve) ser renderizada agora: já foi renderizada, ou falhou e
+        esgotou as tentativas ou ainda está no intervalo de espera antes da próxima tentativa.
+
+        Parâmetros:
+            marker (dict): O marcador RENDER_COMPLETE da pasta (ou None).
+            version (int): A versão da coleta.
+            now (float): O instante atual segundo o volume compartilhado.
+        """
+        if not marker or marker.get("scrape_mtime") != version:
+            return False
+        if "error" not in marker:
+            return True
+        return (
+            marker.get("attempts", 1) >= self.max_attempts
+            or now < marker.get("retry_at", 0)
+        )
+
+    def pending(self) -> list:
+        """
+        Lista as pastas prontas e ainda não renderizadas, em uma ordem própria deste worker (para que
+        workers diferentes comecem por pastas diferentes).
+
+        Retorna:
+            list: Pares (pasta, versão da coleta).
+        """
+        found = []
+        now = self.claims.volume_now()
+        for folder, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [name for name in dirnames if name != "processed_images"]
+            if "data.json" not in filenames:
+                continue
+            version = self.scrape_version(folder, filenames)
+            if version is None:
+                continue
+            if self.settled(read_marker(folder, RENDER_COMPLETE), version, now):
+                continue
+            found.append((folder, version))
+
+        found.sort(key=lambda item: zlib.crc32(f"{self.worker_id}:{item[0]}".encode()))
+        return found
+
+    def heartbeat_loop(self) -> None:
+        while not self.stopping.wait(self.claims.lease / 3):
+            self.claims.heartbeat()
+
+    def render(self, folder, version) -> None:
+        """
+        Renderiza uma pasta já reservada. A renderização é interrompida se a reserva for perdida (o worker
+        que a retomou grava o marcador). Falhas são registradas no marcador RENDER_COMPLETE com a quantidade
+        de tentativas: a coleta é renderizada de novo depois de uma espera crescente, até max_attempts.
+        """
+        from modules.image_builder.image_builder import RenderCancelled
+
+        marker = read_marker(folder, RENDER_COMPLETE)
+        if self.settled(marker, version, self.claims.volume_now()):
+            return  # renderizada por outro worker entre a varredura e a reserva
+
+        def lost():
+            return folder in self.claims.lost or not self.claims.owns(folder)
+
+        try:
+            files = render_folder(folder, self.config_path, version, cancelled=lost)
+            self.rendered += 1
+            print(f"[{self.worker_id}] Renderizado:", folder, f"({len(files)} arquivos)")
+        except RenderCancelled:
+            print(f"[{self.worker_id}] Reserva perdida, renderização interrompida:", folder)
+        except Exception as e:
+            print(f"[{self.worker_id}] Falha ao renderizar", folder + ":", e)
+            if lost():
+                return
+            attempts = 1
+            if marker and marker.get("scrape_mtime") == version and "error" in marker:
+                attempts = marker.get("attempts", 1) + 1
+            write_marker(
+                folder,
+                RENDER_COMPLETE,
+                {
+                    "scrape_mtime": version,
+                    "error": str(e),
+                    "attempts": attempts,
+                    "retry_at": self.claims.volume_now()
+                    + self.retry_delay * 2 ** (attempts - 1),
+                },
+            )
+
+    def run(self, until_empty=True, interval=5.0) -> int:
+        """
+        Reserva e renderiza pastas pendentes até não haver mais nenhuma (until_empty) ou até Ctrl+C.
+
+        Retorna:
+            int: A quantidade de pastas renderizadas por este worker.
+        """
+        init_worker(self.config_path)
+        heartbeat = threading.Thread(target=self.heartbeat_loop, daemon=True)
+        heartbeat.start()
+        try:
+            while not self.stopping.is_set():
+                pending = self.pending()
+                if not pending and until_empty:
+                    break
+
+                progressed = False
+                for folder, version in pending:
+                    if self.stopping.is_set():
+                        break
+                    if not self.claims.acquire(folder):
+                        continue
+                    progressed = True
+                    try:
+                        self.render(folder, version)
+                    finally:
+                        self.claims.release(folder)
+
+                if not progressed:
+                    # pastas restantes reservadas por outros workers (ou nada a fazer): aguarda
+                    self.stopping.wait(min(interval, self.claims.lease / 3))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stopping.set()
+            self.claims.close()
+        return self.rendered
+
+
+def run_worker(root, config_path, lease, include_unmarked, until_empty) -> None:
+    ShardWorker(
+        root=root, config_path=config_path, lease=lease, include_unmarked=include_unmarked
+    ).run(until_empty=until_empty)
+
+
+def run_local(
+    processes,
+    root="scraped",
+    config_path="config.yaml",
+    lease=60,
+    include_unmarked=False,
+    until_empty=True,
+) -> None:
+    """
+    Executa vários workers como processos nesta máquina (o mesmo protocolo usado entre máquinas).
+
+    Parâmetros:
+        processes (int): A quantidade de processos.
+        Os demais parâmetros são os do ShardWorker e de ShardWorker.run.
+    """
+    workers = [
+        Process(
+            target=run_worker,
+            args=(root, config_path, lease, include_unmarked, until_empty),
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,209 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+from modules.scraper.markers import (
+    RENDER_COMPLETE,
+    SCRAPE_COMPLETE,
+    read_marker,
+    write_marker,
+)
+
+
+def init_worker(config_path) -> None:
+    """
+    Inicializa um processo do pool: importa o ImageBuilder e aplica as configurações do processo uma única vez.
+    """
+    from modules.image_builder.image_builder import ImageBuilder
+
+    with open(config_path, "r") as file:
+        ImageBuilder.configure_process(yaml.load(file, Loader=yaml.FullLoader))
+
+
+def render_folder(path, config_path, scrape_mtime, cancelled=None) -> list:
+    """
+    Renderiza uma pasta coletada (executado em um processo do pool) e grava o marcador RENDER_COMPLETE.
+
+    Parâmetros:
+        path (str): A pasta do post.
+        config_path (str): O arquivo de configuração, relido a cada post.
+        scrape_mtime (int): O mtime do marcador SCRAPE_COMPLETE que disparou a renderização.
+        cancelled (callable, opcional): Consultado antes de cada página e antes de gravar o marcador; se
+        retornar True, a renderização é interrompida com RenderCancelled, sem marcador. O padrão é None.
+
+    Retorna:
+        list: Os arquivos gerados.
+    """
+    from modules.image_builder.image_builder import ImageBuilder, RenderCancelled
+
+    with open(config_path, "r") as file:
+        configs = yaml.load(file, Loader=yaml.FullLoader)
+
+    catalog = None
+    if configs.get("catalog_path"):
+        from modules.catalog.catalog import Catalog
+
+        catalog = Catalog(configs["catalog_path"])
+
+    image_builder = ImageBuilder(path=path, cancelled=cancelled)
+    try:
+        image_builder.build(**ImageBuilder.build_options(configs))
+    except RenderCancelled:
+        raise
+    except Exception as e:
+        if catalog:
+            catalog.set_render_status(path, "failed", error=str(e))
+        raise
+
+    if cancelled is not None and cancelled():
+        raise RenderCancelled(f"Renderização cancelada: {path}")
+
+    if catalog:
+        catalog.set_render_status(path, "rendered", output_files=image_builder.output_files)
+
+    write_marker(
+        path,
+        RENDER_COMPLETE,
+        {"scrape_mtime": scrape_mtime, "files": image_builder.output_files},
+    )
+    return image_builder.output_files
+
+
+class FolderWatcher:
+    """
+    Modo watch: monitora a pasta de posts coletados (por varredura periódica, que também funciona em
+    volumes compartilhados entre máquinas) e renderiza cada pasta nova assim que o scraper grava o
+    marcador de conclusão (SCRAPE_COMPLETE).
+
+    Uma pasta só é enviada ao pool depois que o marcador fica inalterado por `debounce` segundos, e
+    nunca é enviada de novo enquanto estiver na fila ou se o marcador RENDER_COMPLETE indicar que aquela
+    coleta já foi renderizada. Uma nova coleta da mesma pasta (novo marcador) é renderizada novamente.
+
+    Parâmetros:
+        root (str, opcional): A pasta monitorada. O padrão é "scraped".
+        config_path (str, opcional): O arquivo de configuração. O padrão é "config.yaml".
+        workers (int, opcional): Quantidade de processos de renderização. O padrão é 2.
+        interval (float, opcional): Intervalo entre varreduras, em segundos. O padrão é 1.0.
+        debounce (float, opcional): Tempo mínimo de estabilidade do marcador, em segundos. O padrão é 2.0.
+    """
+
+    def __init__(
+        self, root="scraped", config_path="config.yaml", workers=2, interval=1.0, debounce=2.0
+    ):
+        self.root = root
+        self.config_path = config_path
+        self.workers = workers
+        self.interval = interval
+        self.debounce = debounce
+        self.pending = {}  # pasta -> (mtime do marcador, instante em que esse mtime foi visto)
+        self.in_flight = {}  # pasta -> (mtime do marcador, future)
+        self.done = {}  # pasta -> mtime do marcador já renderizado
+        self.executor = None
+
+    def scan(self) -> dict:
+        """
+        Varre a pasta monitorada atrás de pastas com o marcador de conclusão.
+
+        Retorna:
+            dict: O mtime (ns) do marcador de cada pasta concluída.
+        """
+        completed = {}
+        for folder, dirnames, filenames in os.walk(self.root):
+            # as saídas da renderização não contêm coletas
+            dirnames[:] = [name for name in dirnames if name != "processed_images"]
+            if SCRAPE_COMPLETE in filenames and "data.json" in filenames:
+                try:
+                    completed[folder] = os.stat(
+                        os.path.join(folder, SCRAPE_COMPLETE)
+                    ).st_mtime_ns
+                except FileNotFoundError:
+                    continue
+        return completed
+
+    def already_rendered(self, folder, mtime) -> bool:
+        """
+        Indica se a coleta atual da pasta já foi renderizada (por este ou por outro processo).
+        """
+        if self.done.get(folder) == mtime:
+            return True
+
+        marker = read_marker(folder, RENDER_COMPLETE)
+        if marker and marker.get("scrape_mtime") == mtime:
+            self.done[folder] = mtime
+            return True
+        return False
+
+    def poll(self, now=None) -> list:
+        """
+        Executa uma varredura: recolhe renderizações concluídas e envia ao pool as pastas estáveis.
+
+        Parâmetros:
+            now (float, opcional): O instante atual (time.monotonic). O padrão é o instante da chamada.
+
+        Retorna:
+            list: As pastas enviadas ao pool nesta varredura.
+        """
+        now = time.monotonic() if now is None else now
+        self.collect()
+
+        submitted = []
+        for folder, mtime in self.scan().items():
+            if folder in self.in_flight or self.already_rendered(folder, mtime):
+                self.pending.pop(folder, None)
+                continue
+
+            seen = self.pending.get(folder)
+            if seen is None or seen[0] != mtime:
+                self.pending[folder] = (mtime, now)
+                if self.debounce > 0:
+                    continue
+                seen = self.pending[folder]
+
+            if now - seen[1] < self.debounce:
+                continue
+
+            del self.pending[folder]
+            future = self.executor.submit(render_folder, folder, self.config_path, mtime)
+            self.in_flight[folder] = (mtime, future)
+            submitted.append(folder)
+            print("Na fila:", folder)
+
+        return submitted
+
+    def collect(self) -> None:
+        """
+        Recolhe as renderizações concluídas, registrando sucessos e falhas.
+        """
+        for folder, (mtime, future) in list(self.in_flight.items()):
+            if not future.done():
+                continue
+            del self.in_flight[folder]
+
+            error = future.exception()
+            if error is None:
+                self.done[folder] = mtime
+                print("Renderizado:", folder, f"({len(future.result())} arquivos)")
+            else:
+                # não tenta de novo até uma nova coleta da pasta
+                self.done[folder] = mtime
+                print("Falha ao renderizar", folder + ":", error)
+
+    def run(self) -> None:
+        """
+        Monitora a pasta até ser interrompido (Ctrl+C).
+        """
+        print(f"Monitorando {self.root} ({self.workers} workers)...")
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=init_worker, initargs=(self.config_path,)
+        )
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("Encerrando...")
+        finally:
+            self.executor.shutdown(wait=True)
+            self.collect()